@@ -1,60 +1,113 @@
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
-from flask_migrate import Migrate
 from flask_jwt_extended import JWTManager
 from flask_socketio import SocketIO
 from config import config
 from app.models import *
-from flask_cors import CORS
 from datetime import timedelta
 
 
-migrate = Migrate()
 jwt = JWTManager()
 socketio = SocketIO(cors_allowed_origins=[
     "http://localhost:5173", 
     "http://127.0.0.1:5173",
     "http://localhost:58705",
     "http://127.0.0.1:58705",
-    ],
-    engineio_logger=True,  # Untuk debugging
-    logger=True
-    )
+    ])
 
-def create_app(config_name='development'):
+def create_app(config_name='development', light=False):
+    """App factory. light=True untuk CLI/batch (mis. create_admin.py): hanya database, JWT,
+    session hook dan command CLI, tanpa Socket.IO/Redis, CORS, Flask-Migrate dan route HTTP.
+    Event yang di-enqueue ke outbox tetap dikirim oleh dispatcher di proses web.
+    """
     app = Flask(__name__)
     app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(hours=1)
     app.config.from_object(config[config_name])
     
-    # Enable CORS
-    CORS(app, resources={
-        r"/api/*": {
-            "origins": ["http://localhost:5173", "http://127.0.0.1:5173", "http://localhost:58705", "http://127.0.0.1:58705"],
-            "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-            "allow_headers": ["Content-Type", "Authorization"]
-        }
-    })
+    # Di belakang load balancer (deploy/nginx.conf) IP client ada di X-Forwarded-For
+    if app.config.get('PROXY_FIX_X_FOR'):
+        from werkzeug.middleware.proxy_fix import ProxyFix
+        hops = app.config['PROXY_FIX_X_FOR']
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=hops, x_proto=hops, x_host=hops)
+    
+    # JSON encoder berbasis orjson (fallback ke json bawaan kalau tidak terpasang)
+    from .json_provider import init_json_provider
+    init_json_provider(app)
     
     # Initialize extensions
-    migrate.init_app(app, db)
     jwt.init_app(app)
-    # Inisialisasi SocketIO dengan CORS
-    socketio.init_app(app, 
-                    cors_allowed_origins=["http://localhost:5173"],
-                    message_queue=app.config['SOCKETIO_MESSAGE_QUEUE'])
+    if not light:
+        # Import di sini: flask_cors dan flask_migrate (alembic) tidak dibutuhkan mode light
+        from flask_cors import CORS
+        from flask_migrate import Migrate
+        
+        # Enable CORS
+        CORS(app, resources={
+            r"/api/*": {
+                "origins": ["http://localhost:5173", "http://127.0.0.1:5173", "http://localhost:58705", "http://127.0.0.1:58705"],
+                "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
+                "allow_headers": ["Content-Type", "Authorization"]
+            }
+        })
+        
+        Migrate(app, db)
+        # Inisialisasi SocketIO dengan CORS; log per paket hanya kalau diaktifkan di config
+        socketio.init_app(app, 
+                        cors_allowed_origins=["http://localhost:5173"],
+                        message_queue=app.config['SOCKETIO_MESSAGE_QUEUE'],
+                        logger=app.config['SOCKETIO_LOGGER'],
+                        engineio_logger=app.config['SOCKETIO_ENGINEIO_LOGGER'])
+        
+        # Register blueprints
+        from .routes import admin_bp, reseller_bp
+        app.register_blueprint(admin_bp, url_prefix='/api/admin')
+        app.register_blueprint(reseller_bp, url_prefix='/api/reseller')
+
+    # CLI: `flask analytics rebuild` (cron malam hari)
+    from .analytics import analytics_cli
+    app.cli.add_command(analytics_cli)
+    
+    # CLI: `flask ledger reconcile` (cron, cocokkan saldo stok dengan ledger)
+    from .ledger import ledger_cli
+    app.cli.add_command(ledger_cli)
+    
+    # CLI: `flask search rebuild` (index FTS5 untuk SQLite)
+    from .search import search_cli
+    app.cli.add_command(search_cli)
+    
+    # CLI: `flask reservations sweep|reconcile` (sweeper juga jalan di background, lihat manage.py)
+    from .reservations import reservations_cli
+    app.cli.add_command(reservations_cli)
     
-    # Register blueprints
-    from .routes import admin_bp, reseller_bp
-    app.register_blueprint(admin_bp, url_prefix='/api/admin')
-    app.register_blueprint(reseller_bp, url_prefix='/api/reseller')
+    # CLI: `flask availability rebuild|refresh|flush` (alert juga dikirim di background, lihat manage.py)
+    from .availability import availability_cli
+    app.cli.add_command(availability_cli)
+    
+    # Outbox event Socket.IO (`flask outbox run` untuk dispatcher terpisah)
+    from .outbox import init_outbox
+    init_outbox(app)
+    
+    # Job background (`flask jobs run` untuk worker terpisah)
+    from .jobs import init_jobs
+    init_jobs(app)
+    
+    # Cache listing stok reseller, diinvalidasi setelah commit yang mengubah stoknya
+    from .inventory import init_inventory
+    init_inventory(app)
     
     # Import models
     from .models import admin, reseller, product, stock, order, return_request, shipping
     
     # Import socket events
-    from .controllers.socket_events import register_socket_events
-    register_socket_events(socketio)
+    if not light:
+        from .controllers.socket_events import register_socket_events
+        register_socket_events(socketio)
     
     db.init_app(app)
     
+    # Instrumentasi (hanya kalau INSTRUMENTATION=1), setelah engine database dibuat
+    if not light:
+        from .instrumentation import init_instrumentation
+        init_instrumentation(app)
+    
     return app
\ No newline at end of file
@@ -0,0 +1,245 @@
+# Ringkasan KPI dashboard admin yang dipelihara secara inkremental: setiap transisi
+# order/shipping/retur mengubah counter di analytics_counters dalam transaksi yang sama,
+# jadi /api/admin/stats cukup membaca beberapa baris kecil. `flask analytics rebuild`
+# (cron malam hari) menghitung ulang semuanya dari order_details untuk mengoreksi drift.
+import random
+from datetime import date, timedelta
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy.dialects import mysql, sqlite, postgresql
+from .models import db, AnalyticsCounter, OrderRequest, OrderDetail, ReturnRequest, Stock
+
+DAILY_WINDOW = 30
+TOP_N = 10
+_upsert_dialects = {'mysql': mysql, 'mariadb': mysql, 'sqlite': sqlite, 'postgresql': postgresql}
+# Counter yang disentuh hampir setiap order (bukan per produk/reseller) dipecah ke beberapa
+# baris shard supaya order yang bersamaan tidak antre di satu row lock; dibaca dengan SUM
+SHARDED = ('orders_status', 'returns_status', 'units_sold', 'returned_units', 'stock_outs', 'revenue_daily')
+
+
+def increment(changes):
+    """changes: {(metric, bucket): delta}; upsert value = value + delta."""
+    shard = random.randrange(current_app.config.get('ANALYTICS_COUNTER_SHARDS', 8))
+    rows = [{'metric': metric, 'bucket': str(bucket), 'shard': shard if metric in SHARDED else 0, 'value': delta}
+            for (metric, bucket), delta in changes.items() if delta]
+    if not rows:
+        return
+
+    # Satu INSERT multi-row, diurutkan supaya row lock diambil dengan urutan yang sama
+    # di setiap transaksi
+    table = AnalyticsCounter.__table__
+    dialect = _upsert_dialects[db.session.get_bind().dialect.name]
+    stmt = dialect.insert(table).values(sorted(rows, key=lambda r: (r['metric'], r['bucket'], r['shard'])))
+    if dialect is mysql:
+        stmt = stmt.on_duplicate_key_update(value=table.c.value + stmt.inserted.value, updated_at=db.func.now())
+    else:
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['metric', 'bucket', 'shard'],
+            set_={'value': table.c.value + stmt.excluded.value, 'updated_at': db.func.now()}
+        )
+    db.session.execute(stmt)
+
+
+def _sales_changes(order, details, sign=1):
+    day = (order.order_date or date.today()).strftime('%Y-%m-%d')
+    changes = {}
+    for detail in details:
+        for key, delta in (
+            (('revenue_daily', day), detail['subtotal']),
+            (('revenue_product', detail['product_id']), detail['subtotal']),
+            (('revenue_reseller', order.reseller_id), detail['subtotal']),
+            (('units_sold', ''), detail['quantity']),
+        ):
+            changes[key] = changes.get(key, 0) + sign * delta
+    return changes
+
+
+def _detail_dicts(order):
+    return [{'product_id': d.product_id, 'quantity': d.quantity, 'subtotal': d.subtotal}
+            for d in order.order_details]
+
+
+def record_order_placed(order, details, stock_outs=0):
+    changes = _sales_changes(order, details)
+    changes[('orders_status', order.status or 'pending')] = 1
+    changes[('stock_outs', '')] = stock_outs
+    increment(changes)
+
+
+def _status_changes(changes, order, old_status, new_status, details):
+    changes[('orders_status', old_status)] = changes.get(('orders_status', old_status), 0) - 1
+    changes[('orders_status', new_status)] = changes.get(('orders_status', new_status), 0) + 1
+
+    # Order yang ditolak tidak dihitung sebagai penjualan
+    sign = -1 if new_status == 'rejected' else 1 if old_status == 'rejected' else 0
+    if sign:
+        for key, delta in _sales_changes(order, details(), sign).items():
+            changes[key] = changes.get(key, 0) + delta
+
+
+def record_order_status(order, old_status):
+    if old_status == order.status:
+        return
+    changes = {}
+    _status_changes(changes, order, old_status, order.status, lambda: _detail_dicts(order))
+    increment(changes)
+
+
+def record_orders_status(orders, new_status, details):
+    """Versi batch: orders = baris (id, reseller_id, status lama, order_date), details = {order_id: [dict]}."""
+    changes = {}
+    for order in orders:
+        if order.status != new_status:
+            _status_changes(changes, order, order.status, new_status, lambda: details.get(order.id, []))
+    increment(changes)
+
+
+def record_return_created(return_req):
+    increment({('returns_status', return_req.status or 'pending'): 1})
+
+
+def record_return_status(return_req, old_status):
+    if old_status == return_req.status:
+        return
+    changes = {('returns_status', old_status): -1, ('returns_status', return_req.status): 1}
+    if return_req.status == 'approved':
+        changes[('returned_units', '')] = return_req.quantity
+    elif old_status == 'approved':
+        changes[('returned_units', '')] = -return_req.quantity
+    increment(changes)
+
+
+def record_stock_level(old_quantity, new_quantity):
+    # Hitung transisi stok habis <-> tersedia
+    was_out = old_quantity is not None and old_quantity <= 0
+    is_out = new_quantity is not None and new_quantity <= 0
+    if was_out != is_out:
+        increment({('stock_outs', ''): 1 if is_out else -1})
+
+
+def refresh_stock_outs():
+    # Dipakai oleh jalur bulk, lebih murah daripada melacak transisi per baris
+    count = db.session.scalar(db.select(db.func.count(Stock.id)).where(Stock.quantity <= 0))
+    # Satu upsert Core (value diganti, bukan ditambah): tidak bentrok dengan baris counter
+    # yang sudah ada di identity map seperti delete + session.add
+    table = AnalyticsCounter.__table__
+    dialect = _upsert_dialects[db.session.get_bind().dialect.name]
+    stmt = dialect.insert(table).values(metric='stock_outs', bucket='', shard=0, value=count)
+    if dialect is mysql:
+        stmt = stmt.on_duplicate_key_update(value=stmt.inserted.value, updated_at=db.func.now())
+    else:
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['metric', 'bucket', 'shard'],
+            set_={'value': stmt.excluded.value, 'updated_at': db.func.now()}
+        )
+    db.session.execute(stmt)
+    # Total ada di shard 0; shard lain dinolkan (setelah shard 0, urutan lock sama dengan increment)
+    db.session.execute(
+        db.update(table).where(table.c.metric == 'stock_outs', table.c.shard != 0, table.c.value != 0)
+        .values(value=0, updated_at=db.func.now())
+    )
+
+
+def get_stats():
+    since = (date.today() - timedelta(days=DAILY_WINDOW - 1)).strftime('%Y-%m-%d')
+    counters = AnalyticsCounter.__table__.c
+
+    # Counter global tersebar di beberapa shard: dijumlahkan per bucket
+    scalars = db.session.execute(
+        db.select(counters.metric, counters.bucket, db.func.sum(counters.value))
+        .where(counters.metric.in_(['orders_status', 'returns_status', 'units_sold', 'returned_units', 'stock_outs']))
+        .group_by(counters.metric, counters.bucket)
+    ).all()
+    daily = db.session.execute(
+        db.select(counters.bucket, db.func.sum(counters.value))
+        .where(counters.metric == 'revenue_daily', counters.bucket >= since)
+        .group_by(counters.bucket)
+        .order_by(counters.bucket)
+    ).all()
+
+    def top(metric):
+        rows = db.session.execute(
+            db.select(counters.bucket, counters.value)
+            .where(counters.metric == metric)
+            .order_by(counters.value.desc())
+            .limit(TOP_N)
+        ).all()
+        return [{'id': int(bucket), 'revenue': value} for bucket, value in rows]
+
+    by_metric = {}
+    for metric, bucket, value in scalars:
+        by_metric.setdefault(metric, {})[bucket] = value
+
+    units_sold = by_metric.get('units_sold', {}).get('', 0)
+    returned_units = by_metric.get('returned_units', {}).get('', 0)
+    return {
+        'revenue': {
+            'daily': [{'date': bucket, 'revenue': value} for bucket, value in daily],
+            'top_products': top('revenue_product'),
+            'top_resellers': top('revenue_reseller')
+        },
+        'orders_by_status': {k: int(v) for k, v in by_metric.get('orders_status', {}).items() if v},
+        'returns_by_status': {k: int(v) for k, v in by_metric.get('returns_status', {}).items() if v},
+        'stock_outs': int(by_metric.get('stock_outs', {}).get('', 0)),
+        'units_sold': int(units_sold),
+        'returned_units': int(returned_units),
+        'return_rate': returned_units / units_sold if units_sold else 0.0
+    }
+
+
+def rebuild():
+    """Hitung ulang semua counter dari order_details, order, retur dan stok."""
+    day = db.func.date(OrderRequest.order_date)
+    sold = db.select(OrderDetail.product_id, OrderDetail.quantity, OrderDetail.subtotal,
+                     OrderRequest.reseller_id, day.label('day')) \
+        .join(OrderRequest, OrderRequest.id == OrderDetail.order_id) \
+        .where(db.or_(OrderRequest.status.is_(None), OrderRequest.status != 'rejected')) \
+        .subquery()
+
+    aggregates = [
+        ('revenue_daily', sold.c.day, db.func.sum(sold.c.subtotal)),
+        ('revenue_product', sold.c.product_id, db.func.sum(sold.c.subtotal)),
+        ('revenue_reseller', sold.c.reseller_id, db.func.sum(sold.c.subtotal)),
+        ('units_sold', None, db.func.sum(sold.c.quantity)),
+    ]
+
+    counters = {}
+    for metric, bucket, value in aggregates:
+        query = db.select(bucket, value).group_by(bucket) if bucket is not None else db.select(db.literal(''), value)
+        for key, total in db.session.execute(query):
+            if total is not None:
+                counters[(metric, str(key))] = float(total)
+
+    for status, count in db.session.execute(
+            db.select(OrderRequest.status, db.func.count(OrderRequest.id)).group_by(OrderRequest.status)):
+        counters[('orders_status', status or 'pending')] = count
+    for status, count in db.session.execute(
+            db.select(ReturnRequest.status, db.func.count(ReturnRequest.id)).group_by(ReturnRequest.status)):
+        counters[('returns_status', status or 'pending')] = count
+    counters[('returned_units', '')] = db.session.scalar(
+        db.select(db.func.coalesce(db.func.sum(ReturnRequest.quantity), 0)).where(ReturnRequest.status == 'approved'))
+    counters[('stock_outs', '')] = db.session.scalar(
+        db.select(db.func.count(Stock.id)).where(Stock.quantity <= 0))
+
+    # Ganti seluruh isi tabel dalam satu transaksi
+    db.session.execute(db.delete(AnalyticsCounter))
+    if counters:
+        db.session.execute(db.insert(AnalyticsCounter), [
+            {'metric': metric, 'bucket': bucket, 'value': value}
+            for (metric, bucket), value in counters.items()
+        ])
+    db.session.commit()
+    return len(counters)
+
+
+@click.group('analytics')
+def analytics_cli():
+    """Perintah pemeliharaan ringkasan dashboard."""
+
+
+@analytics_cli.command('rebuild')
+@with_appcontext
+def rebuild_command():
+    count = rebuild()
+    click.echo(f'Rebuilt {count} analytics counters')
@@ -0,0 +1,106 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app, request, jsonify, has_app_context
+from werkzeug.security import generate_password_hash, check_password_hash
+from .cache import get_redis, redis
+
+_executor = None
+_executor_lock = threading.Lock()
+_local_hits = {}
+
+
+def _thread_pool():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=current_app.config.get('PASSWORD_HASH_WORKERS', 4),
+                thread_name_prefix='password-hash'
+            )
+    return _executor
+
+
+def run_blocking(fn, *args):
+    """Jalankan fungsi CPU-bound (hash password) di thread pool terbatas.
+
+    Di server eventlet/gevent, pbkdf2 yang dijalankan langsung di green thread
+    menahan seluruh event loop, termasuk traffic Socket.IO. hashlib melepas GIL
+    saat pbkdf2, jadi thread OS sungguhan bisa jalan paralel.
+    """
+    if not has_app_context() or not current_app.config.get('PASSWORD_HASH_OFFLOAD', True):
+        return fn(*args)
+
+    socketio = current_app.extensions.get('socketio')
+    async_mode = socketio.server.eio.async_mode if socketio and socketio.server else 'threading'
+
+    if async_mode == 'eventlet':
+        from eventlet import tpool
+        return tpool.execute(fn, *args)
+    if async_mode.startswith('gevent'):
+        import gevent
+        return gevent.get_hub().threadpool.apply(fn, args)
+    return _thread_pool().submit(fn, *args).result()
+
+
+def hash_password(password):
+    return run_blocking(generate_password_hash, password, 'pbkdf2:sha256')
+
+
+def verify_password(password_hash, password):
+    if not password_hash or not isinstance(password, str):
+        return False
+    return run_blocking(check_password_hash, password_hash, password)
+
+
+def _hit(key, window):
+    # Fixed window counter: INCR + EXPIRE di Redis, fallback ke dict in-process
+    client = get_redis()
+    if client is not None:
+        try:
+            count = client.incr(key)
+            if count == 1:
+                client.expire(key, window)
+            return count
+        except redis.RedisError as e:
+            current_app.logger.warning('Rate limiter Redis failed: %s', e)
+
+    now = time.monotonic()
+    if len(_local_hits) > 10000:
+        for stale in [k for k, (_, reset_at) in _local_hits.items() if reset_at <= now]:
+            _local_hits.pop(stale, None)
+    count, reset_at = _local_hits.get(key, (0, now + window))
+    if reset_at <= now:
+        count, reset_at = 0, now + window
+    _local_hits[key] = (count + 1, reset_at)
+    return count + 1
+
+
+def _reset(key):
+    _local_hits.pop(key, None)
+    client = get_redis()
+    if client is not None:
+        try:
+            client.delete(key)
+        except redis.RedisError:
+            pass
+
+
+def login_rate_limited(role, account):
+    """Kembalikan response 429 kalau batas percobaan login per akun/IP terlampaui."""
+    window = current_app.config.get('LOGIN_RATE_LIMIT_WINDOW', 60)
+    limits = [
+        (f'login:{role}:ip:{request.remote_addr}', current_app.config.get('LOGIN_RATE_LIMIT_IP', 50)),
+        (f'login:{role}:account:{str(account).lower()}', current_app.config.get('LOGIN_RATE_LIMIT_ACCOUNT', 10)),
+    ]
+    for key, limit in limits:
+        if _hit(key, window) > limit:
+            response = jsonify({'msg': 'Too many login attempts, try again later'})
+            response.headers['Retry-After'] = str(window)
+            return response, 429
+    return None
+
+
+def login_succeeded(role, account):
+    # Login berhasil menghapus counter akun (counter IP tetap berjalan)
+    _reset(f'login:{role}:account:{str(account).lower()}')
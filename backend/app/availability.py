@@ -0,0 +1,296 @@
+# Ringkasan stok gudang per produk (product_availability): on hand, reserved, tersedia,
+# terjual 30 hari terakhir dan days of cover. Diperbarui di transaksi yang sama dengan
+# setiap perubahan stocks (ledger.move_many, reservasi), jadi listing produk admin cukup
+# membaca satu tabel. Penjualan per hari disimpan di product_sales_daily; jendela 30 hari
+# digeser sekali sehari (refresh_window). Produk yang baru masuk low stock ditandai
+# alert_pending dan dikirim ke /admin sebagai satu event stock_alert per batch (flush_alerts).
+import time
+from datetime import datetime, timedelta
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy.dialects import mysql, sqlite, postgresql
+from sqlalchemy.exc import SQLAlchemyError
+from . import socketio
+from .models import db, Product, Stock, StockMovement, ProductAvailability, ProductSalesDaily
+from .realtime import notify_admins
+
+# Movement gudang yang dihitung sebagai penjualan: potongan order (negatif) dikurangi stok
+# yang dikembalikan saat order lama di-reject (positif)
+SALE_REASONS = ('order', 'release')
+WINDOW_DAYS = 30
+REBUILD_BATCH = 500
+ALERT_BATCH = 200
+_upsert_dialects = {'mysql': mysql, 'mariadb': mysql, 'sqlite': sqlite, 'postgresql': postgresql}
+
+
+def _dialect():
+    return _upsert_dialects[db.session.get_bind().dialect.name]
+
+
+def _window_start(now=None):
+    return (now or datetime.utcnow()).date() - timedelta(days=WINDOW_DAYS - 1)
+
+
+def _add_sales(sold, day):
+    table = ProductSalesDaily.__table__
+    dialect = _dialect()
+    stmt = dialect.insert(table)
+    if dialect is mysql:
+        stmt = stmt.on_duplicate_key_update(quantity=table.c.quantity + stmt.inserted.quantity)
+    else:
+        stmt = stmt.on_conflict_do_update(index_elements=['product_id', 'day'],
+                                          set_={'quantity': table.c.quantity + stmt.excluded.quantity})
+    db.session.execute(stmt, [{'product_id': pid, 'day': day, 'quantity': quantity}
+                              for pid, quantity in sorted(sold.items())])
+
+
+def _row(product_id, on_hand, reserved, sold_30d, was_low, was_pending, now):
+    config = current_app.config
+    available = on_hand - reserved
+    days_of_cover = round(available / (sold_30d / WINDOW_DAYS), 2) if sold_30d > 0 else None
+    low_stock = available <= config.get('STOCK_ALERT_THRESHOLD', 5) or (
+        days_of_cover is not None and days_of_cover <= config.get('STOCK_ALERT_COVER_DAYS', 7))
+    return {
+        'product_id': product_id, 'on_hand': on_hand, 'reserved': reserved, 'available': available,
+        'sold_30d': sold_30d, 'days_of_cover': days_of_cover, 'low_stock': low_stock,
+        # Alert hanya saat produk baru masuk low stock; yang sudah pulih sebelum flush batal
+        'alert_pending': low_stock and (not was_low or bool(was_pending)),
+        'updated_at': now
+    }
+
+
+def _write(rows):
+    if not rows:
+        return
+    table = ProductAvailability.__table__
+    dialect = _dialect()
+    stmt = dialect.insert(table)
+    columns = [c.key for c in table.columns if c.key != 'product_id']
+    if dialect is mysql:
+        stmt = stmt.on_duplicate_key_update({key: stmt.inserted[key] for key in columns})
+    else:
+        stmt = stmt.on_conflict_do_update(index_elements=['product_id'],
+                                          set_={key: stmt.excluded[key] for key in columns})
+    db.session.execute(stmt, rows)
+
+
+def record(product_ids, sold=None):
+    """Perbarui ringkasan produk setelah stocks berubah di transaksi ini.
+
+    sold: {product_id: unit terjual} yang ditambahkan ke penjualan hari ini (boleh negatif).
+    Baris stocks produk ini sudah dikunci oleh UPDATE pemanggil, jadi update ringkasan
+    untuk produk yang sama ikut berurutan.
+    """
+    product_ids = sorted(set(product_ids))
+    if not product_ids:
+        return
+    now = datetime.utcnow()
+    sold = {pid: quantity for pid, quantity in (sold or {}).items() if quantity}
+    if sold:
+        _add_sales(sold, now.date())
+
+    view = ProductAvailability.__table__
+    rows = db.session.execute(
+        db.select(Stock.product_id, Stock.quantity, Stock.reserved, view.c.sold_30d, view.c.low_stock,
+                  view.c.alert_pending)
+        .outerjoin(view, view.c.product_id == Stock.product_id)
+        .where(Stock.product_id.in_(product_ids))
+    ).all()
+    _write([_row(pid, quantity, reserved, max((sold_30d or 0) + sold.get(pid, 0), 0), low_stock, pending, now)
+            for pid, quantity, reserved, sold_30d, low_stock, pending in rows])
+
+
+def _batches(batch_size):
+    # Produk yang punya baris stocks, per rentang product_id
+    last = 0
+    while True:
+        product_ids = db.session.scalars(
+            db.select(Stock.product_id).where(Stock.product_id > last)
+            .order_by(Stock.product_id).limit(batch_size)
+        ).all()
+        if not product_ids:
+            return
+        yield product_ids[0], product_ids[-1]
+        last = product_ids[-1]
+
+
+def _locked(low, high):
+    # Kunci saldo dulu supaya tidak ada record() yang berjalan bersamaan di rentang ini
+    stocks = db.session.execute(
+        db.select(Stock.product_id, Stock.quantity, Stock.reserved)
+        .where(Stock.product_id.between(low, high)).with_for_update()
+    ).all()
+    view = ProductAvailability.__table__
+    cached = {r.product_id: r for r in db.session.execute(
+        db.select(view).where(view.c.product_id.between(low, high)))}
+    return stocks, cached
+
+
+def refresh_window(batch_size=REBUILD_BATCH, now=None):
+    """Geser jendela sold_30d ke hari ini dari product_sales_daily; mengembalikan jumlah produk."""
+    now = now or datetime.utcnow()
+    start = _window_start(now)
+    sales = ProductSalesDaily.__table__
+    db.session.execute(sales.delete().where(sales.c.day < start))
+    db.session.commit()
+
+    refreshed = 0
+    for low, high in _batches(batch_size):
+        stocks, cached = _locked(low, high)
+        sold = {pid: int(total) for pid, total in db.session.execute(
+            db.select(sales.c.product_id, db.func.sum(sales.c.quantity))
+            .where(sales.c.product_id.between(low, high), sales.c.day >= start)
+            .group_by(sales.c.product_id)
+        )}
+        rows = []
+        for pid, quantity, reserved in stocks:
+            old = cached.get(pid)
+            rows.append(_row(pid, quantity, reserved, max(sold.get(pid, 0), 0),
+                             old.low_stock if old else False, old.alert_pending if old else False, now))
+        _write(rows)
+        db.session.commit()
+        refreshed += len(rows)
+    return refreshed
+
+
+def rebuild(batch_size=REBUILD_BATCH, fix=True, now=None):
+    """Hitung ulang ringkasan dari stocks dan ledger (stock_movements); kembalikan daftar drift.
+
+    Dengan fix, baris ringkasan dan penjualan harian produk yang drift ditulis ulang.
+    """
+    now = now or datetime.utcnow()
+    start = _window_start(now)
+    since = datetime.combine(start, datetime.min.time())
+    movements = StockMovement.__table__.c
+    sales = ProductSalesDaily.__table__
+    drift = []
+    for low, high in _batches(batch_size):
+        stocks, cached = _locked(low, high)
+        daily = {}
+        for pid, created_at, delta in db.session.execute(
+            db.select(movements.product_id, movements.created_at, movements.delta)
+            .where(movements.product_id.between(low, high), movements.reseller_id.is_(None),
+                   movements.reason.in_(SALE_REASONS), movements.created_at >= since)
+        ):
+            key = (pid, created_at.date())
+            daily[key] = daily.get(key, 0) - delta
+        sold = {}
+        for (pid, _), quantity in daily.items():
+            sold[pid] = sold.get(pid, 0) + quantity
+
+        rows, drifted = [], []
+        for pid, quantity, reserved in stocks:
+            old = cached.get(pid)
+            expected = (quantity, reserved, max(sold.get(pid, 0), 0))
+            actual = (old.on_hand, old.reserved, old.sold_30d) if old else None
+            if actual != expected:
+                drift.append({'product_id': pid, 'cached': actual, 'expected': expected})
+                drifted.append(pid)
+                rows.append(_row(pid, *expected, old.low_stock if old else False,
+                                 old.alert_pending if old else False, now))
+        if fix and drifted:
+            db.session.execute(sales.delete().where(sales.c.product_id.in_(drifted)))
+            buckets = [{'product_id': pid, 'day': day, 'quantity': quantity}
+                       for (pid, day), quantity in sorted(daily.items()) if pid in drifted and quantity]
+            if buckets:
+                db.session.execute(db.insert(ProductSalesDaily), buckets)
+            _write(rows)
+        db.session.commit()
+    return drift
+
+
+def flush_alerts(batch_size=ALERT_BATCH):
+    """Kirim produk alert_pending sebagai event stock_alert per batch; mengembalikan jumlah produk."""
+    view = ProductAvailability.__table__
+    sent = 0
+    while True:
+        query = db.select(view.c.product_id, Product.name, view.c.on_hand, view.c.reserved, view.c.available,
+                          view.c.sold_30d, view.c.days_of_cover) \
+            .join(Product, Product.id == view.c.product_id) \
+            .where(view.c.alert_pending.is_(True)) \
+            .order_by(view.c.product_id).limit(batch_size)
+        if current_app.config.get('OUTBOX_LOCK_ROWS', True):
+            # Beberapa instance bisa menjalankan flusher tanpa mengirim alert yang sama dua kali
+            query = query.with_for_update(skip_locked=True)
+        alerts = [dict(r._mapping) for r in db.session.execute(query)]
+        if not alerts:
+            db.session.rollback()
+            return sent
+        notify_admins('stock_alert', {
+            'alerts': alerts,
+            'threshold': current_app.config.get('STOCK_ALERT_THRESHOLD', 5),
+            'cover_days': current_app.config.get('STOCK_ALERT_COVER_DAYS', 7)
+        })
+        db.session.execute(view.update().where(view.c.product_id.in_([a['product_id'] for a in alerts]))
+                           .values(alert_pending=False))
+        db.session.commit()
+        sent += len(alerts)
+        if len(alerts) < batch_size:
+            return sent
+
+
+def stock_view(availability):
+    # Bentuk 'stock' di listing produk admin; frontend membaca stock.quantity (saldo gudang)
+    if availability is None:
+        return None
+    return {**availability.to_dict(), 'quantity': availability.on_hand}
+
+
+def run_alerts(app, stop=None):
+    interval = app.config.get('STOCK_ALERT_INTERVAL', 60)
+    batch_size = app.config.get('STOCK_ALERT_BATCH', ALERT_BATCH)
+    refreshed_on = None
+    while not (stop and stop()):
+        with app.app_context():
+            try:
+                # Jendela 30 hari digeser saat start dan setiap ganti hari (UTC)
+                today = datetime.utcnow().date()
+                if refreshed_on != today:
+                    refresh_window()
+                    refreshed_on = today
+                flush_alerts(batch_size)
+            except SQLAlchemyError as e:
+                db.session.rollback()
+                app.logger.error('Stock alert flush failed: %s', e)
+            finally:
+                db.session.remove()
+        deadline = time.monotonic() + interval
+        while time.monotonic() < deadline and not (stop and stop()):
+            socketio.sleep(min(1, interval))
+
+
+def start_stock_alerts(app):
+    if not app.config.get('STOCK_ALERTS', True) or 'stock_alerts' in app.extensions:
+        return None
+    app.extensions['stock_alerts'] = socketio.start_background_task(run_alerts, app)
+    return app.extensions['stock_alerts']
+
+
+@click.group('availability')
+def availability_cli():
+    """Ringkasan stok per produk (product_availability) dan alert low stock."""
+
+
+@availability_cli.command('rebuild')
+@click.option('--dry-run', is_flag=True, help='Hanya laporkan drift, jangan tulis ulang ringkasan')
+@click.option('--batch-size', type=int, default=REBUILD_BATCH)
+@with_appcontext
+def rebuild_command(dry_run, batch_size):
+    drift = rebuild(batch_size, fix=not dry_run)
+    for d in drift:
+        click.echo(f'product {d["product_id"]}: cached={d["cached"]} expected={d["expected"]}')
+    click.echo(f'{len(drift)} drifted products{" (dry run)" if dry_run else " fixed"}')
+
+
+@availability_cli.command('refresh')
+@with_appcontext
+def refresh_command():
+    click.echo(f'Refreshed 30-day sales for {refresh_window()} products')
+
+
+@availability_cli.command('flush')
+@click.option('--batch-size', type=int, default=ALERT_BATCH)
+@with_appcontext
+def flush_command(batch_size):
+    click.echo(f'Sent stock alerts for {flush_alerts(batch_size)} products')
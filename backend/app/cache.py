@@ -0,0 +1,58 @@
+import threading
+from collections import OrderedDict
+from flask import current_app
+
+try:
+    import redis
+except ImportError:  # redis opsional; tanpa redis cache hanya in-process
+    redis = None
+
+
+def get_redis():
+    # Satu client per app, memakai Redis yang sama dengan SOCKETIO_MESSAGE_QUEUE
+    # kecuali CACHE_REDIS_URL di-set sendiri
+    app = current_app._get_current_object()
+    if 'redis' not in app.extensions:
+        url = app.config.get('CACHE_REDIS_URL')
+        client = None
+        if url and redis is not None:
+            client = redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        app.extensions['redis'] = client
+    return app.extensions['redis']
+
+
+def redis_call(method, *args, **kwargs):
+    # Redis yang down tidak boleh menjatuhkan request; None artinya cache miss
+    client = get_redis()
+    if client is None:
+        return None
+    try:
+        return getattr(client, method)(*args, **kwargs)
+    except redis.RedisError as e:
+        current_app.logger.warning('Redis %s failed: %s', method, e)
+        return None
+
+
+class LRUCache:
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._data:
+                return None
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
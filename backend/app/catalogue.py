@@ -0,0 +1,63 @@
+import hashlib
+from flask import current_app
+from sqlalchemy.orm import contains_eager
+from .models import Product, Stock
+from .models.routing import use_primary
+from .cache import LRUCache, redis_call
+
+VERSION_KEY = 'catalogue:version'
+SNAPSHOT_KEY = 'catalogue:snapshot:{}'
+SNAPSHOT_TTL = 24 * 3600
+
+# Snapshot terbaru per versi di depan Redis; versi lokal dipakai kalau Redis tidak ada
+_snapshots = LRUCache(maxsize=4)
+_local_version = [1]
+
+
+def current_version():
+    version = redis_call('get', VERSION_KEY)
+    if version is None:
+        redis_call('set', VERSION_KEY, 1, nx=True)
+        version = redis_call('get', VERSION_KEY)
+    if version is None:
+        return f'local-{_local_version[0]}'
+    return version.decode()
+
+
+def invalidate_catalogue():
+    # Dipanggil setelah commit yang mengubah produk atau stok gudang
+    _local_version[0] += 1
+    redis_call('incr', VERSION_KEY)
+
+
+def build_catalogue():
+    # Snapshot disimpan per versi sampai 24 jam: dibangun dari primary, bukan replica yang
+    # bisa tertinggal dari commit yang baru menaikkan versi
+    use_primary()
+    # Stok yang ditahan reservasi order pending tidak ditawarkan lagi
+    products = Product.query.join(Stock) \
+        .filter(Stock.quantity - Stock.reserved > 0) \
+        .options(contains_eager(Product.stocks)) \
+        .order_by(Product.id) \
+        .all()
+    return [{
+        'product': p.to_dict(),
+        'stock': p.stocks[0].quantity - p.stocks[0].reserved if p.stocks else 0
+    } for p in products]
+
+
+def get_catalogue():
+    """Kembalikan (etag, body JSON) dari snapshot katalog versi terkini."""
+    version = current_version()
+    snapshot = _snapshots.get(version)
+    if snapshot:
+        return snapshot
+
+    body = redis_call('get', SNAPSHOT_KEY.format(version))
+    if body is None:
+        body = current_app.json.dumps(build_catalogue()).encode()
+        redis_call('set', SNAPSHOT_KEY.format(version), body, ex=SNAPSHOT_TTL, nx=True)
+
+    snapshot = (f'{version}-{hashlib.sha1(body).hexdigest()[:16]}', body)
+    _snapshots.set(version, snapshot)
+    return snapshot
@@ -1,15 +1,35 @@
-from operator import or_
 from flask import request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity, create_access_token, get_jwt
-from ..models import Admin, Product, Stock, OrderRequest, OrderDetail, ReturnRequest, ShippingInfo, db, ResellerStock
-from .. import socketio
+from sqlalchemy.orm import joinedload, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
+from ..models import Admin, Product, Stock, OrderRequest, OrderDetail, ReturnRequest, ShippingInfo, ProductAvailability, db
+from ..realtime import notify_admins, notify_reseller, order_delta
+from ..serializers import order_query, serialize_orders
+from ..pagination import wants_cursor, cursor_page, requested_total
+from ..catalogue import invalidate_catalogue
+from ..filters import filter_products, filter_orders, filter_shipments, filter_returns
+from ..auth import login_rate_limited, login_succeeded
+from ..analytics import get_stats, record_return_status, record_stock_level
+from .. import ledger
+from ..outbox import outbox_metrics
+from ..jobs import job_metrics
+from ..reservations import reservation_metrics
+from .. import lifecycle
+from .. import availability
 from datetime import datetime
 
 def admin_login():
     data = request.get_json()
+    
+    limited = login_rate_limited('admin', data.get('email'))
+    if limited:
+        return limited
+    
+    # Satu query lewat unique index email; verifikasi hash jalan di thread pool
     admin = Admin.query.filter_by(email=data.get('email')).first()
     
     if admin and admin.check_password(data.get('password')):
+        login_succeeded('admin', data.get('email'))
         access_token = create_access_token(identity=str(admin.id), additional_claims={'role': "admin"})
         return jsonify(access_token=access_token), 200
     
@@ -24,23 +44,36 @@ def product_management(product_id=None):
         return jsonify({'message': 'Unauthorized'}), 403
     
     if request.method == 'GET':
+        # Stok dibaca dari ringkasan product_availability (app/availability.py)
         if product_id:
-            product = Product.query.get_or_404(product_id)
-            stock = Stock.query.filter_by(product_id=product_id).first()
+            product = Product.query.options(joinedload(Product.availability)).get_or_404(product_id)
             return jsonify({
                 'product': product.to_dict(),
-                'stock': stock.to_dict() if stock else None
+                'stock': availability.stock_view(product.availability)
             })
         else:
             page = request.args.get('page', default=1, type=int)
             limit = request.args.get('limit', default=10, type=int)
-            search = request.args.get('search', type=str)
 
-            query = Product.query
-
-            if search:
-                search_term = f"%{search.lower()}%"
-                query = query.filter(Product.name.ilike(search_term))
+            # Ringkasan satu halaman diambil dengan satu query IN, bukan per produk
+            query = filter_products(Product.query, request.args, ranked=True) \
+                .options(selectinload(Product.availability))
+
+            if wants_cursor():
+                try:
+                    products, next_cursor = cursor_page(query, Product.id, limit, request.args.get('cursor'))
+                except ValueError:
+                    return jsonify({'message': 'Invalid cursor'}), 400
+                return jsonify({
+                    'products': [
+                        {
+                            **p.to_dict(),
+                            'stock': availability.stock_view(p.availability)
+                        } for p in products
+                    ],
+                    'next_cursor': next_cursor,
+                    'total': requested_total(query)
+                })
 
             total = query.count()
 
@@ -53,7 +86,7 @@ def product_management(product_id=None):
                 'products': [
                     {
                         **p.to_dict(),
-                        'stock': p.stocks[0].to_dict() if p.stocks else None
+                        'stock': availability.stock_view(p.availability)
                     } for p in products
                 ],
                 'total': total
@@ -75,15 +108,16 @@ def product_management(product_id=None):
         db.session.add(product)
         db.session.commit()
         
-        # Add stock
-        stock = Stock(
-            product_id=product.id,
-            quantity=data.get('stock', {}).get('quantity', 0),
-            last_restocked=datetime.utcnow()
-        )
-
-        db.session.add(stock)
+        # Add stock (baris saldo + movement awal di ledger)
+        db.session.add(Stock(product_id=product.id, quantity=0, last_restocked=datetime.utcnow()))
+        db.session.flush()
+        record_stock_level(None, 0)
+        ledger.move(product.id, data.get('stock', {}).get('quantity', 0), 'initial',
+                    reference=f'product:{product.id}')
+        # Stok awal nol tidak lewat move_many, ringkasannya dibuat di sini
+        availability.record([product.id])
         db.session.commit()
+        invalidate_catalogue()
         
         return jsonify(product.to_dict()), 201
     
@@ -101,20 +135,22 @@ def product_management(product_id=None):
 
         # Sinkronisasi update stock
         stock_data = data.get('stock')
-        if stock_data and isinstance(stock_data, dict):
-            stock = Stock.query.filter_by(product_id=product_id).first()
-            if stock:
-                stock.quantity = stock_data.get('quantity', stock.quantity)
-                stock.last_restocked = datetime.utcnow()
-            else:
-                stock = Stock(
-                    product_id=product_id,
-                    quantity=stock_data.get('quantity', 0),
-                    last_restocked=datetime.utcnow()
-                )
-                db.session.add(stock)
+        if stock_data and isinstance(stock_data, dict) and 'quantity' in stock_data:
+            # Stock opname: saldo absolut dicatat sebagai selisih terhadap saldo yang dikunci
+            try:
+                ledger.set_levels({product_id: stock_data['quantity']}, 'adjustment',
+                                  reference=f'product:{product_id}', key=ledger.request_key())
+            except ledger.DuplicateMovement:
+                # Retry dengan Idempotency-Key yang sama: request pertama sudah diterapkan
+                db.session.rollback()
+                return jsonify(Product.query.get_or_404(product_id).to_dict())
+            except ledger.InsufficientStock:
+                # Stok yang ditahan order pending tidak bisa di-opname ke bawah
+                db.session.rollback()
+                return jsonify({'message': 'Quantity is below stock reserved for pending orders'}), 409
 
         db.session.commit()
+        invalidate_catalogue()
         return jsonify(product.to_dict())
 
     
@@ -126,13 +162,16 @@ def product_management(product_id=None):
         if order_refs:
             return jsonify({'message': 'Cannot delete product. It is referenced in order details.'}), 400
 
-        # Hapus stok terkait produk
+        # Hapus stok terkait produk; ledger ditutup ke nol dulu
         stock = Stock.query.filter_by(product_id=product_id).first()
         if stock:
+            ledger.set_levels({product_id: 0}, 'delete', reference=f'product:{product_id}')
+            record_stock_level(0, None)
             db.session.delete(stock)
 
         db.session.delete(product)
         db.session.commit()
+        invalidate_catalogue()
         return jsonify({'message': 'Product deleted'}), 200
 
 
@@ -147,30 +186,35 @@ def order_management(order_id=None):
     
     if request.method == 'GET':
         if order_id:
-            order = OrderRequest.query.get_or_404(order_id)
-            details = OrderDetail.query.filter_by(order_id=order_id).all()
+            order = order_query().get_or_404(order_id)
             return jsonify({
                 'order': order.to_dict(),
             })
         else:
-            status = request.args.get('status', 'pending')
             page = int(request.args.get('page', 1))
             limit = int(request.args.get('limit', 10))
-            search = request.args.get('search', '')
-
-            query = OrderRequest.query
 
-            if status:
-                query = query.filter_by(status=status)
-
-            if search:
-                query = query.filter(OrderRequest.notes.ilike(f'%{search}%'))
+            query = filter_orders(order_query(), request.args, ranked=True)
+
+            if wants_cursor():
+                try:
+                    orders, next_cursor = cursor_page(query, OrderRequest.id, limit, request.args.get('cursor'))
+                except ValueError:
+                    return jsonify({'message': 'Invalid cursor'}), 400
+                return jsonify({
+                    'data': serialize_orders(orders),
+                    'meta': {
+                        'next_cursor': next_cursor,
+                        'total': requested_total(query),
+                        'limit': limit
+                    }
+                })
 
             total = query.count()
             orders = query.offset((page - 1) * limit).limit(limit).all()
 
             return jsonify({
-                'data': [o.to_dict() for o in orders],
+                'data': serialize_orders(orders),
                 'meta': {
                     'total': total,
                     'page': page,
@@ -180,21 +224,26 @@ def order_management(order_id=None):
 
     
     elif request.method == 'PUT':
-        order = OrderRequest.query.get_or_404(order_id)
+        order = order_query().get_or_404(order_id)
         data = request.get_json()
         
         if 'status' in data:
-            order.status = data['status']
-            
-            # Emit socket event when order status changes
-            if data['status'] in ['approved', 'rejected']:
-                socketio.emit('order_updated', {
-                    'order_id': order.id,
-                    'status': order.status,
-                    'reseller_id': order.reseller_id
-                }, namespace='/admin')
+            # Transisi divalidasi lifecycle; efek samping (stok, shipping, event) di transaksi ini
+            try:
+                lifecycle.transition(order, data['status'])
+            except ValueError as e:
+                return jsonify({'message': str(e)}), 400
+            except (lifecycle.InvalidTransition, lifecycle.TransitionConflict) as e:
+                db.session.rollback()
+                return jsonify({'message': str(e)}), 409
+            except ledger.InsufficientStock as e:
+                # Stok opname menurunkan stok di bawah reservasi order ini
+                db.session.rollback()
+                return jsonify({'message': f'Insufficient stock for product {e.product_id}'}), 409
         
         db.session.commit()
+        if order.status == 'rejected':
+            invalidate_catalogue()
         return jsonify(order.to_dict())
 
 @jwt_required()
@@ -208,22 +257,20 @@ def shipping_management():
     if request.method == 'GET':
         page = request.args.get('page', 1, type=int)
         limit = request.args.get('limit', 10, type=int)
-        search = request.args.get('search', '')
-        status = request.args.get('status', 'all')
 
-        query = ShippingInfo.query
-        
-        if status != 'all':
-            query = query.filter_by(status=status)
+        query = filter_shipments(ShippingInfo.query, request.args, ranked=True)
             
-        if search:
-            query = query.filter(
-                or_(
-                    ShippingInfo.tracking_number.ilike(f'%{search}%'),
-                    ShippingInfo.order_id.ilike(f'%{search}%'),
-                    ShippingInfo.carrier.ilike(f'%{search}%')
-                )
-            )
+        if wants_cursor():
+            try:
+                shipments, next_cursor = cursor_page(query, ShippingInfo.id, limit, request.args.get('cursor'))
+            except ValueError:
+                return jsonify({'message': 'Invalid cursor'}), 400
+            return jsonify({
+                'shipments': [s.to_dict() for s in shipments],
+                'next_cursor': next_cursor,
+                'total': requested_total(query),
+                'per_page': limit
+            })
             
         paginated = query.paginate(page=page, per_page=limit, error_out=False)
         
@@ -252,8 +299,14 @@ def shipping_management():
             # Handle khusus status delivered
             if data['status'] == 'delivered':
                 shipping.actual_delivery = datetime.utcnow()
-                if shipping.order:
-                    shipping.order.status = 'delivered'
+            # Order ikut maju (approved -> shipped -> delivered) lewat lifecycle; kredit
+            # stok reseller saat delivered dikerjakan worker setelah commit
+            if shipping.order and data['status'] in lifecycle.SHIPMENT_ORDER_STATUS:
+                try:
+                    lifecycle.advance(shipping.order, lifecycle.SHIPMENT_ORDER_STATUS[data['status']], notify=False)
+                except (lifecycle.InvalidTransition, lifecycle.TransitionConflict) as e:
+                    db.session.rollback()
+                    return jsonify({'message': str(e)}), 409
         
         # Update field shipping info
         if 'tracking_number' in data:
@@ -270,16 +323,25 @@ def shipping_management():
             except (ValueError, TypeError):
                 return jsonify({'message': 'Invalid estimated_delivery format'}), 400
 
-        db.session.commit()
+        # Flush dulu supaya updated_at terisi, lalu event ditulis ke outbox di transaksi yang sama
+        db.session.flush()
         
-        # Emit socket event
-        socketio.emit('shipping_update', {
+        # Emit socket event ke admin dan ke reseller pemilik shipment saja
+        payload = {
             'shipping_id': shipping.id,
             'order_id': shipping.order_id,
             'status': shipping.status,
             'reseller_id': shipping.reseller_id,
             'updated_at': shipping.updated_at.isoformat()
-        }, namespace='/admin')
+        }
+        notify_admins('shipping_update', payload)
+        notify_reseller(shipping.reseller_id, 'shipping_update', payload)
+        
+        changes = {'shipping': shipping.to_dict()}
+        if shipping.order and shipping.status in lifecycle.SHIPMENT_ORDER_STATUS:
+            changes['status'] = shipping.order.status
+        order_delta(shipping.order_id, changes)
+        db.session.commit()
         
         return jsonify(shipping.to_dict())
 
@@ -295,25 +357,22 @@ def return_management():
         # Get pagination parameters with defaults
         page = request.args.get('page', default=1, type=int)
         limit = request.args.get('limit', default=10, type=int)
-        status = request.args.get('status', default=None)
-        search = request.args.get('search', default=None)
         
-        # Base query
-        query = ReturnRequest.query
+        # Base query + filters (status, search)
+        query = filter_returns(ReturnRequest.query, request.args, ranked=True)
         
-        # Apply filters if provided
-        if status:
-            query = query.filter_by(status=status)
-            
-        if search:
-            query = query.join(Product).filter(
-                or_(
-                    ReturnRequest.id.ilike(f'%{search}%'),
-                    ReturnRequest.order_id.ilike(f'%{search}%'),
-                    Product.name.ilike(f'%{search}%'),
-                    ReturnRequest.reason.ilike(f'%{search}%')
-                )
-            )
+        # Keyset pagination (opt-in lewat ?cursor=)
+        if wants_cursor():
+            try:
+                returns, next_cursor = cursor_page(query, ReturnRequest.id, limit, request.args.get('cursor'))
+            except ValueError:
+                return jsonify({'message': 'Invalid cursor'}), 400
+            return jsonify({
+                'returns': [r.to_dict() for r in returns],
+                'next_cursor': next_cursor,
+                'total': requested_total(query),
+                'limit': limit
+            })
         
         # Apply pagination
         paginated_returns = query.paginate(
@@ -339,32 +398,102 @@ def return_management():
         return_req = ReturnRequest.query.get_or_404(return_id)
         
         if 'status' in data:
-            return_req.status = data['status']
-            return_req.processed_date = datetime.utcnow()
+            old_status = return_req.status
+            processed_date = datetime.utcnow()
+            # Compare-and-set: dua admin yang memproses return yang sama bersamaan tidak bisa
+            # sama-sama melihat status lama lalu mengembalikan stok dua kali
+            result = db.session.execute(
+                db.update(ReturnRequest)
+                .where(ReturnRequest.id == return_req.id, ReturnRequest.status == old_status)
+                .values(status=data['status'], processed_date=processed_date)
+                .execution_options(synchronize_session=False)
+            )
+            if result.rowcount != 1:
+                db.session.rollback()
+                return jsonify({'message': f'Return request {return_id} was changed concurrently'}), 409
+            set_committed_value(return_req, 'status', data['status'])
+            set_committed_value(return_req, 'processed_date', processed_date)
+            record_return_status(return_req, old_status)
             
-            if data['status'] == 'approved':
-                # Deduct from reseller stock
-                reseller_stock = ResellerStock.query.filter_by(
-                    reseller_id=return_req.reseller_id,
-                    product_id=return_req.product_id
-                ).first()
-                
-                if reseller_stock:
-                    reseller_stock.quantity -= return_req.quantity
-                    if reseller_stock.quantity < 0:
-                        reseller_stock.quantity = 0
-                
-                # Add back to warehouse stock
-                warehouse_stock = Stock.query.filter_by(product_id=return_req.product_id).first()
-                if warehouse_stock:
-                    warehouse_stock.quantity += return_req.quantity
+            if data['status'] == 'approved' and old_status != 'approved':
+                # Key tetap per return: stok hanya dikembalikan sekali, juga tanpa header
+                # Idempotency-Key atau kalau return di-approve ulang
+                key = f'return-approve:{return_req.id}'
+                reference = f'return:{return_req.id}'
+                try:
+                    # Deduct from reseller stock (maksimal sebanyak yang dipegang reseller)
+                    held = ledger.balances([return_req.product_id], return_req.reseller_id, lock=True) \
+                        .get(return_req.product_id, 0)
+                    ledger.move(return_req.product_id, -min(held, return_req.quantity), 'return',
+                                reseller_id=return_req.reseller_id, reference=reference, key=key)
+                    
+                    # Add back to warehouse stock
+                    ledger.move(return_req.product_id, return_req.quantity, 'return', reference=reference, key=key)
+                except ledger.DuplicateMovement:
+                    db.session.rollback()
+                    return jsonify(ReturnRequest.query.get_or_404(return_id).to_dict())
             
             # Emit socket event
-            socketio.emit('return_status', {
+            notify_reseller(return_req.reseller_id, 'return_status', {
                 'return_id': return_req.id,
                 'status': return_req.status,
                 'reseller_id': return_req.reseller_id
-            }, namespace='/reseller')
+            })
         
         db.session.commit()
-        return jsonify(return_req.to_dict())
\ No newline at end of file
+        if return_req.status == 'approved':
+            invalidate_catalogue()
+        return jsonify(return_req.to_dict())
+
+
+@jwt_required()
+def dashboard_stats():
+    claims = get_jwt()
+    if claims.get('role') != 'admin':
+        return jsonify({'message': 'Unauthorized'}), 403
+
+    # Dibaca dari tabel analytics_counters, bukan agregasi ulang order_details
+    return jsonify(get_stats())
+
+
+@jwt_required()
+def outbox_status():
+    claims = get_jwt()
+    if claims.get('role') != 'admin':
+        return jsonify({'message': 'Unauthorized'}), 403
+
+    return jsonify(outbox_metrics())
+
+
+@jwt_required()
+def job_status():
+    claims = get_jwt()
+    if claims.get('role') != 'admin':
+        return jsonify({'message': 'Unauthorized'}), 403
+
+    return jsonify(job_metrics())
+
+@jwt_required()
+def reservation_status():
+    claims = get_jwt()
+    if claims.get('role') != 'admin':
+        return jsonify({'message': 'Unauthorized'}), 403
+
+    return jsonify(reservation_metrics())
+
+@jwt_required()
+def stock_alerts():
+    claims = get_jwt()
+    if claims.get('role') != 'admin':
+        return jsonify({'message': 'Unauthorized'}), 403
+
+    # Produk low stock saat ini, yang paling cepat habis dulu
+    limit = request.args.get('limit', default=50, type=int)
+    rows = ProductAvailability.query.options(joinedload(ProductAvailability.product)) \
+        .filter(ProductAvailability.low_stock.is_(True)) \
+        .order_by(ProductAvailability.available, ProductAvailability.product_id) \
+        .limit(limit).all()
+    return jsonify({
+        'products': [{**availability.stock_view(row), 'name': row.product.name} for row in rows],
+        'total': ProductAvailability.query.filter(ProductAvailability.low_stock.is_(True)).count()
+    })
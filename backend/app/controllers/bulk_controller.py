@@ -0,0 +1,366 @@
+import csv
+import io
+from flask import request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt
+from sqlalchemy.exc import SQLAlchemyError
+from ..models import Product, Stock, db
+from ..catalogue import invalidate_catalogue
+from ..analytics import refresh_stock_outs
+from .. import ledger, lifecycle, reservations
+from datetime import datetime
+
+CHUNK_SIZE = 1000
+PRODUCT_FIELDS = ('name', 'description', 'category', 'brand', 'model', 'price', 'image_url')
+REQUIRED_FIELDS = ('name', 'category', 'brand', 'price')
+
+
+def _read_rows(key):
+    # Terima JSON ({key: [...]} atau list langsung), file CSV (multipart "file"), atau body text/csv
+    if 'file' in request.files:
+        text = request.files['file'].read().decode('utf-8-sig')
+        return list(csv.DictReader(io.StringIO(text)))
+    if request.mimetype == 'text/csv':
+        return list(csv.DictReader(io.StringIO(request.get_data(as_text=True))))
+
+    data = request.get_json(silent=True)
+    if isinstance(data, dict):
+        data = data.get(key)
+    return data if isinstance(data, list) else None
+
+
+def _blank(value):
+    return value is None or value == ''
+
+
+def _to_int(value):
+    # Nilai dari CSV selalu string
+    if isinstance(value, bool):
+        raise ValueError
+    if isinstance(value, float) and not value.is_integer():
+        raise ValueError
+    return int(value)
+
+
+def _validate_product(raw):
+    errors = []
+    row = {field: raw[field] for field in PRODUCT_FIELDS if field in raw and not _blank(raw[field])}
+
+    product_id = raw.get('id')
+    if not _blank(product_id):
+        try:
+            row['id'] = _to_int(product_id)
+        except (TypeError, ValueError):
+            errors.append('id must be an integer')
+    else:
+        errors += [f'{field} is required' for field in REQUIRED_FIELDS if field not in row]
+
+    if 'price' in row:
+        try:
+            row['price'] = float(row['price'])
+            if row['price'] < 0:
+                errors.append('price must not be negative')
+        except (TypeError, ValueError):
+            errors.append('price must be a number')
+
+    quantity = raw.get('stock', raw.get('quantity'))
+    if isinstance(quantity, dict):
+        quantity = quantity.get('quantity')
+    if not _blank(quantity):
+        try:
+            quantity = _to_int(quantity)
+            if quantity < 0:
+                errors.append('stock quantity must not be negative')
+        except (TypeError, ValueError):
+            errors.append('stock quantity must be an integer')
+    else:
+        quantity = None
+
+    return row, quantity, errors
+
+
+def _reserved(product_ids):
+    # Stok gudang yang ditahan reservasi order pending; saldo baru tidak boleh di bawahnya
+    return dict(db.session.execute(
+        db.select(Stock.product_id, Stock.reserved)
+        .where(Stock.product_id.in_(product_ids), Stock.reserved > 0)
+    ).all())
+
+
+def _below_reserved(i, reserved):
+    return {'row': i, 'status': 'error', 'errors': [f'Quantity below stock reserved for pending orders ({reserved})']}
+
+
+def _import_products_chunk(chunk, results):
+    now = datetime.utcnow()
+    updates = [(i, row, quantity) for i, row, quantity in chunk if 'id' in row]
+    inserts = [(i, row, quantity) for i, row, quantity in chunk if 'id' not in row]
+
+    # Satu query IN untuk memastikan produk yang di-update memang ada
+    existing = set()
+    if updates:
+        ids = [row['id'] for _, row, _ in updates]
+        existing = set(db.session.scalars(db.select(Product.id).where(Product.id.in_(ids))))
+    for i, row, _ in updates:
+        if row['id'] not in existing:
+            results[i] = {'row': i, 'status': 'error', 'errors': [f'Product {row["id"]} not found']}
+    updates = [u for u in updates if u[1]['id'] in existing]
+
+    reserved = _reserved([row['id'] for _, row, quantity in updates if quantity is not None])
+    for i, row, quantity in updates:
+        if quantity is not None and quantity < reserved.get(row['id'], 0):
+            results[i] = _below_reserved(i, reserved[row['id']])
+    updates = [u for u in updates if u[2] is None or u[2] >= reserved.get(u[1]['id'], 0)]
+
+    try:
+        # Update per primary key dieksekusi sebagai executemany
+        update_rows = [{**row, 'updated_at': now} for _, row, _ in updates]
+        if update_rows:
+            db.session.execute(db.update(Product), update_rows)
+
+        # Insert lewat flush ORM: batch INSERT (insertmanyvalues) dan tetap dapat id-nya
+        products = [Product(**row) for _, row, _ in inserts]
+        db.session.add_all(products)
+        db.session.flush()
+        # Ambil id sebelum commit; setelah commit objek ter-expire dan id memicu SELECT per baris
+        created_ids = [product.id for product in products]
+
+        stock_rows = [{
+            'product_id': product_id,
+            'quantity': quantity or 0,
+            'last_restocked': now
+        } for product_id, (_, _, quantity) in zip(created_ids, inserts)]
+        if stock_rows:
+            db.session.execute(db.insert(Stock), stock_rows)
+            ledger.opened([(r['product_id'], r['quantity']) for r in stock_rows], 'initial')
+
+        # Stok produk yang di-update di-set lewat ledger (selisih terhadap saldo yang dikunci)
+        levels = {row['id']: quantity for _, row, quantity in updates if quantity is not None}
+        ledger.set_levels(levels, 'bulk', track_stock_outs=False)
+
+        db.session.commit()
+    except (SQLAlchemyError, ledger.InsufficientStock) as e:
+        db.session.rollback()
+        for i, _, _ in updates + inserts:
+            results[i] = {'row': i, 'status': 'error', 'errors': [str(e.orig if hasattr(e, 'orig') else e)]}
+        return
+
+    for i, row, _ in updates:
+        results[i] = {'row': i, 'status': 'updated', 'id': row['id']}
+    for product_id, (i, _, _) in zip(created_ids, inserts):
+        results[i] = {'row': i, 'status': 'created', 'id': product_id}
+
+
+@jwt_required()
+def bulk_product_import():
+    if get_jwt().get('role') != 'admin':
+        return jsonify({'message': 'Unauthorized'}), 403
+
+    rows = _read_rows('products')
+    if rows is None:
+        return jsonify({'message': 'Expected a list of products (JSON) or a CSV file'}), 400
+
+    results = [None] * len(rows)
+    valid = []
+    for i, raw in enumerate(rows):
+        if not isinstance(raw, dict):
+            results[i] = {'row': i, 'status': 'error', 'errors': ['Row must be an object']}
+            continue
+        row, quantity, errors = _validate_product(raw)
+        if errors:
+            results[i] = {'row': i, 'status': 'error', 'errors': errors}
+        else:
+            valid.append((i, row, quantity))
+
+    # Satu transaksi per chunk; chunk yang gagal tidak membatalkan chunk lain
+    for start in range(0, len(valid), CHUNK_SIZE):
+        _import_products_chunk(valid[start:start + CHUNK_SIZE], results)
+
+    # Counter stok habis dihitung ulang sekali untuk seluruh batch
+    refresh_stock_outs()
+    db.session.commit()
+    invalidate_catalogue()
+    return jsonify(_summary(results)), 200
+
+
+def _validate_adjustment(raw):
+    errors = []
+    try:
+        product_id = _to_int(raw.get('product_id'))
+    except (TypeError, ValueError):
+        return None, ['product_id must be an integer']
+
+    has_delta = not _blank(raw.get('delta'))
+    has_quantity = not _blank(raw.get('quantity'))
+    if has_delta == has_quantity:
+        return None, ['Exactly one of delta or quantity is required']
+
+    try:
+        value = _to_int(raw['delta'] if has_delta else raw['quantity'])
+    except (TypeError, ValueError):
+        return None, ['delta/quantity must be an integer']
+    if has_quantity and value < 0:
+        errors.append('quantity must not be negative')
+
+    return {'product_id': product_id, 'delta' if has_delta else 'quantity': value}, errors
+
+
+def _adjust_stock_chunk(chunk, results, key=None):
+    product_ids = {row['product_id'] for _, row in chunk}
+    known_products = set(db.session.scalars(db.select(Product.id).where(Product.id.in_(product_ids))))
+    # Retry request bulk dengan Idempotency-Key yang sama: tiap chunk hanya diterapkan sekali
+    chunk_key = f'{key}#{chunk[0][0]}' if key and chunk else None
+
+    reserved = _reserved([row['product_id'] for _, row in chunk if 'quantity' in row])
+    pending = []
+    for i, row in chunk:
+        if row['product_id'] not in known_products:
+            results[i] = {'row': i, 'status': 'error', 'errors': [f'Product {row["product_id"]} not found']}
+        elif 'quantity' in row and row['quantity'] < reserved.get(row['product_id'], 0):
+            results[i] = _below_reserved(i, reserved[row['product_id']])
+        else:
+            pending.append((i, row))
+
+    while pending:
+        levels = {row['product_id']: row['quantity'] for _, row in pending if 'quantity' in row}
+        deltas = {}
+        for _, row in pending:
+            if 'delta' in row:
+                deltas[row['product_id']] = deltas.get(row['product_id'], 0) + row['delta']
+
+        try:
+            # Lewat ledger: saldo absolut jadi selisih terhadap saldo yang dikunci,
+            # delta jadi quantity = quantity + :delta atomik; baris stocks dibuat kalau belum ada
+            ledger.set_levels(levels, 'bulk', key=chunk_key and f'{chunk_key}=', track_stock_outs=False)
+            new_balances = ledger.move_many(deltas, 'bulk', key=chunk_key and f'{chunk_key}+',
+                                            allow_negative=True, track_stock_outs=False)
+
+            # Hanya produk dengan delta negatif yang bisa jadi minus; stok yang ditahan
+            # reservasi tidak boleh ikut terpakai (quantity - reserved < 0)
+            decreased = {row['product_id'] for _, row in pending if row.get('delta', 0) < 0}
+            available = reservations.available(decreased) if decreased else {}
+            negative = {pid for pid in decreased if available.get(pid, new_balances.get(pid, 0)) < 0}
+        except ledger.InsufficientStock as e:
+            # Saldo absolut di bawah reserved (reservasi baru masuk setelah dicek di atas)
+            db.session.rollback()
+            remaining = []
+            for i, row in pending:
+                if row['product_id'] == e.product_id and 'quantity' in row:
+                    results[i] = _below_reserved(i, 'changed concurrently')
+                else:
+                    remaining.append((i, row))
+            pending = remaining
+            continue
+        except ledger.DuplicateMovement:
+            db.session.rollback()
+            for i, row in pending:
+                results[i] = {'row': i, 'status': 'duplicate', 'product_id': row['product_id']}
+            return
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            for i, _ in pending:
+                results[i] = {'row': i, 'status': 'error', 'errors': [str(e.orig if hasattr(e, 'orig') else e)]}
+            return
+
+        if not negative:
+            db.session.commit()
+            for i, row in pending:
+                results[i] = {'row': i, 'status': 'applied', 'product_id': row['product_id']}
+            return
+
+        # Stok akan minus: batalkan chunk, tolak pengurangan untuk produk itu, ulangi sisanya
+        db.session.rollback()
+        remaining = []
+        for i, row in pending:
+            if row['product_id'] in negative and row.get('delta', 0) < 0:
+                results[i] = {'row': i, 'status': 'error', 'errors': ['Insufficient stock']}
+            else:
+                remaining.append((i, row))
+        pending = remaining
+
+
+@jwt_required()
+def bulk_stock_adjustment():
+    if get_jwt().get('role') != 'admin':
+        return jsonify({'message': 'Unauthorized'}), 403
+
+    rows = _read_rows('adjustments')
+    if rows is None:
+        return jsonify({'message': 'Expected a list of stock adjustments (JSON) or a CSV file'}), 400
+
+    results = [None] * len(rows)
+    valid = []
+    for i, raw in enumerate(rows):
+        if not isinstance(raw, dict):
+            results[i] = {'row': i, 'status': 'error', 'errors': ['Row must be an object']}
+            continue
+        row, errors = _validate_adjustment(raw)
+        if errors:
+            results[i] = {'row': i, 'status': 'error', 'errors': errors}
+        else:
+            valid.append((i, row))
+
+    key = ledger.request_key()
+    for start in range(0, len(valid), CHUNK_SIZE):
+        _adjust_stock_chunk(valid[start:start + CHUNK_SIZE], results, key)
+
+    # Counter stok habis dihitung ulang sekali untuk seluruh batch
+    refresh_stock_outs()
+    db.session.commit()
+    invalidate_catalogue()
+    return jsonify(_summary(results)), 200
+
+
+@jwt_required()
+def bulk_order_status():
+    if get_jwt().get('role') != 'admin':
+        return jsonify({'message': 'Unauthorized'}), 403
+
+    data = request.get_json(silent=True) or {}
+    status = data.get('status')
+    if status not in lifecycle.BULK_STATUSES:
+        return jsonify({'message': f'status must be one of {", ".join(lifecycle.BULK_STATUSES)}'}), 400
+    if not isinstance(data.get('order_ids'), list) or not data['order_ids']:
+        return jsonify({'message': 'order_ids must be a non-empty list'}), 400
+    try:
+        order_ids = list(dict.fromkeys(_to_int(i) for i in data['order_ids']))
+    except (TypeError, ValueError):
+        return jsonify({'message': 'order_ids must be integers'}), 400
+
+    # Satu UPDATE set-based per chunk, masing-masing satu transaksi
+    results = {}
+    for start in range(0, len(order_ids), CHUNK_SIZE):
+        chunk = order_ids[start:start + CHUNK_SIZE]
+        try:
+            moved, skipped = lifecycle.bulk_transition(chunk, status)
+            db.session.commit()
+        except (lifecycle.TransitionConflict, ledger.InsufficientStock, SQLAlchemyError) as e:
+            db.session.rollback()
+            for order_id in chunk:
+                results[order_id] = {'order_id': order_id, 'status': 'error',
+                                     'errors': [str(getattr(e, 'orig', None) or e)]}
+            continue
+
+        for order_id in moved:
+            results[order_id] = {'order_id': order_id, 'status': 'updated'}
+        for order_id, current in skipped.items():
+            if current == status:
+                results[order_id] = {'order_id': order_id, 'status': 'unchanged'}
+            elif current is None:
+                results[order_id] = {'order_id': order_id, 'status': 'error', 'errors': ['Order not found']}
+            else:
+                results[order_id] = {'order_id': order_id, 'status': 'error',
+                                     'errors': [f'Cannot go from {current} to {status}']}
+
+    if status == 'rejected':
+        invalidate_catalogue()
+    return jsonify(_summary([results[order_id] for order_id in order_ids])), 200
+
+
+def _summary(results):
+    failed = sum(1 for r in results if r['status'] == 'error')
+    return {
+        'total': len(results),
+        'succeeded': len(results) - failed,
+        'failed': failed,
+        'results': results
+    }
@@ -0,0 +1,126 @@
+import csv
+import io
+from flask import request, jsonify, current_app, Response, stream_with_context
+from flask_jwt_extended import jwt_required, get_jwt
+from ..models import OrderRequest, ReturnRequest, ShippingInfo, db
+from ..serializers import order_query
+from ..filters import filter_orders, filter_shipments, filter_returns
+
+YIELD_PER = 500
+FLUSH_BYTES = 64 * 1024
+FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv'
+}
+
+
+def _iter_rows(query):
+    # yield_per memakai server-side cursor (stream_results) dan membuang objek
+    # per batch, jadi memori tetap konstan berapa pun jumlah barisnya. Hanya untuk
+    # query tanpa eager load: di MySQL cursor-nya unbuffered, dan SELECT lain di
+    # koneksi yang sama (selectinload) membuang sisa barisnya
+    statement = query.statement.execution_options(yield_per=YIELD_PER)
+    for row in db.session.execute(statement).scalars():
+        yield row.to_dict()
+
+
+def _iter_pages(query, model):
+    # Keyset per halaman (id > :last ORDER BY id LIMIT n) dengan query buffered biasa,
+    # jadi selectinload order_details/shipping jalan per halaman
+    last = 0
+    while True:
+        page = query.filter(model.id > last).order_by(model.id).limit(YIELD_PER).all()
+        if not page:
+            return
+        for row in page:
+            yield row.to_dict()
+        last = page[-1].id
+        # Lepas objek halaman ini dari session supaya memori tetap konstan
+        db.session.expunge_all()
+
+
+def _ndjson(rows):
+    dumps = current_app.json.dumps
+    chunk = []
+    size = 0
+    for row in rows:
+        line = dumps(row) + '\n'
+        chunk.append(line)
+        size += len(line)
+        if size >= FLUSH_BYTES:
+            yield ''.join(chunk)
+            chunk, size = [], 0
+    if chunk:
+        yield ''.join(chunk)
+
+
+def _csv(rows, fieldnames):
+    # Kolom bertingkat (order_details, shipping) tidak ikut di CSV
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fieldnames, extrasaction='ignore')
+    writer.writeheader()
+    for row in rows:
+        writer.writerow(row)
+        if buffer.tell() >= FLUSH_BYTES:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def _export(query, model, name, eager=False):
+    fmt = request.args.get('format', 'ndjson')
+    if fmt not in FORMATS:
+        return jsonify({'message': f'Unsupported format {fmt}'}), 400
+
+    rows = _iter_pages(query, model) if eager else _iter_rows(query.order_by(model.id))
+    body = _csv(rows, model.__table__.columns.keys()) if fmt == 'csv' else _ndjson(rows)
+    return Response(
+        stream_with_context(body),
+        mimetype=FORMATS[fmt],
+        headers={'Content-Disposition': f'attachment; filename={name}.{fmt}'}
+    )
+
+
+@jwt_required()
+def admin_order_export():
+    if get_jwt().get('role') != 'admin':
+        return jsonify({'message': 'Unauthorized'}), 403
+
+    return _export(filter_orders(order_query(), request.args), OrderRequest, 'orders', eager=True)
+
+
+@jwt_required()
+def admin_shipping_export():
+    if get_jwt().get('role') != 'admin':
+        return jsonify({'message': 'Unauthorized'}), 403
+
+    return _export(filter_shipments(ShippingInfo.query, request.args), ShippingInfo, 'shipments')
+
+
+@jwt_required()
+def admin_return_export():
+    if get_jwt().get('role') != 'admin':
+        return jsonify({'message': 'Unauthorized'}), 403
+
+    return _export(filter_returns(ReturnRequest.query, request.args), ReturnRequest, 'returns')
+
+
+@jwt_required()
+def reseller_order_export():
+    claims = get_jwt()
+    if claims.get('role') != 'reseller':
+        return jsonify({'message': 'Unauthorized'}), 403
+
+    query = order_query().filter_by(reseller_id=claims.get('sub'))
+    return _export(query, OrderRequest, 'orders', eager=True)
+
+
+@jwt_required()
+def reseller_return_export():
+    claims = get_jwt()
+    if claims.get('role') != 'reseller':
+        return jsonify({'message': 'Unauthorized'}), 403
+
+    query = ReturnRequest.query.filter_by(reseller_id=claims.get('sub'))
+    return _export(query, ReturnRequest, 'returns')
@@ -1,14 +1,28 @@
-from flask import request, jsonify
+from flask import request, jsonify, make_response
 from flask_jwt_extended import jwt_required, get_jwt_identity, create_access_token, get_jwt
-from ..models import Reseller, Product, Stock, OrderRequest, OrderDetail, ReturnRequest, ShippingInfo, ResellerStock, db
-from .. import socketio
+from ..models import Reseller, Product, OrderRequest, OrderDetail, ReturnRequest, ShippingInfo, ResellerStock, db
+from ..realtime import notify_admins
+from ..serializers import order_query, serialize_orders
+from ..catalogue import get_catalogue, invalidate_catalogue
+from ..inventory import get_page, get_delta
+from ..auth import login_rate_limited, login_succeeded
+from ..analytics import record_order_placed, record_return_created
+from .. import ledger, reservations, lifecycle
+from sqlalchemy import or_
 from datetime import datetime
 
 def reseller_login():
     data = request.get_json()
+    
+    limited = login_rate_limited('reseller', data.get('email'))
+    if limited:
+        return limited
+    
+    # Satu query lewat unique index email; verifikasi hash jalan di thread pool
     reseller = Reseller.query.filter_by(email=data.get('email')).first()
     
     if reseller and reseller.check_password(data.get('password')):
+        login_succeeded('reseller', data.get('email'))
         access_token = create_access_token(
             identity=str(reseller.id),
             additional_claims={'role': "reseller"}  # Optional: bisa disesuaikan
@@ -24,10 +38,14 @@ def reseller_register():
     if not all(k in data for k in ("username", "password", "name", "email", "phone", "address")):
         return jsonify({"msg": "Missing required fields"}), 400
 
-    if Reseller.query.filter_by(email=data["email"]).first():
+    # Cek email dan username dalam satu query
+    existing = Reseller.query.filter(
+        or_(Reseller.email == data["email"], Reseller.username == data["username"])
+    ).all()
+    if any(r.email == data["email"] for r in existing):
         return jsonify({"msg": "Email already registered"}), 409
     
-    if Reseller.query.filter_by(username=data["username"]).first():
+    if existing:
         return jsonify({"msg": "Username already taken"}), 409
 
     # Buat user baru
@@ -55,11 +73,26 @@ def product_listing():
     if claims.get('role') != 'reseller':
         return jsonify({'message': 'Unauthorized'}), 403
 
-    products = Product.query.join(Stock).filter(Stock.quantity > 0).all()
-    return jsonify([{
-        'product': p.to_dict(),
-        'stock': p.stocks[0].quantity if p.stocks else 0
-    } for p in products])
+    # Snapshot katalog di-cache (LRU in-process + Redis), invalidasi saat produk/stok berubah
+    etag, body = get_catalogue()
+    if request.if_none_match.contains(etag):
+        response = make_response('', 304)
+    else:
+        response = make_response(body)
+        response.mimetype = 'application/json'
+    response.set_etag(etag)
+    return response
+
+def _replayed_order(key, reseller_id):
+    order_id = reservations.replay(key)
+    if order_id is None:
+        # Order lama memotong stok langsung lewat ledger
+        reference = ledger.replay(key)
+        if not reference or not reference.startswith('order:'):
+            return None
+        order_id = int(reference.split(':')[1])
+    order = order_query().filter_by(id=order_id, reseller_id=reseller_id).first()
+    return (jsonify(order.to_dict()), 200) if order else None
 
 @jwt_required()
 def order_operations(order_id=None):
@@ -70,15 +103,14 @@ def order_operations(order_id=None):
     
     if request.method == 'GET':
         if order_id:
-            order = OrderRequest.query.filter_by(id=order_id, reseller_id=claims.get('sub')).first_or_404()
-            details = OrderDetail.query.filter_by(order_id=order_id).all()
+            order = order_query().filter_by(id=order_id, reseller_id=claims.get('sub')).first_or_404()
             return jsonify({
                 'order': order.to_dict(),
-                'details': [d.to_dict() for d in details]
+                'details': [d.to_dict() for d in order.order_details]
             })
         else:
-            orders = OrderRequest.query.filter_by(reseller_id=claims.get('sub')).all()
-            return jsonify([o.to_dict() for o in orders])
+            orders = order_query().filter_by(reseller_id=claims.get('sub')).all()
+            return jsonify(serialize_orders(orders))
     
     elif request.method == 'POST':
         data = request.get_json()
@@ -87,66 +119,150 @@ def order_operations(order_id=None):
         if not products:
             return jsonify({'message': 'No products in order'}), 400
         
-        # Calculate total amount
-        total_amount = 0
-        order_details = []
+        # Retry dengan Idempotency-Key yang sama mengembalikan order yang sudah dibuat
+        key = ledger.request_key()
+        replayed = _replayed_order(key, claims.get('sub'))
+        if replayed:
+            return replayed
         
+        # Gabungkan baris dengan product_id yang sama
+        quantities = {}
         for item in products:
-            product = Product.query.get(item['product_id'])
-            if not product:
-                return jsonify({'message': f'Product {item["product_id"]} not found'}), 404
-            
-            stock = Stock.query.filter_by(product_id=item['product_id']).first()
-            if not stock or stock.quantity < item['quantity']:
-                return jsonify({'message': f'Insufficient stock for product {product.name}'}), 400
-            
-            subtotal = product.price * item['quantity']
-            total_amount += subtotal
-            
-            order_details.append({
-                'product_id': product.id,
-                'quantity': item['quantity'],
-                'unit_price': product.price,
-                'subtotal': subtotal
-            })
+            if not isinstance(item, dict):
+                return jsonify({'message': 'Each product must be an object'}), 400
+            # product_id string ("5") tetap diterima seperti sebelumnya
+            try:
+                product_id = int(item.get('product_id'))
+            except (TypeError, ValueError):
+                return jsonify({'message': f'Invalid product_id {item.get("product_id")!r}'}), 400
+            quantity = item.get('quantity')
+            if not isinstance(quantity, int) or isinstance(quantity, bool) or quantity <= 0:
+                return jsonify({'message': f'Invalid quantity for product {product_id}'}), 400
+            quantities[product_id] = quantities.get(product_id, 0) + quantity
+        
+        # Satu query IN untuk semua produk
+        product_map = {p.id: p for p in Product.query.filter(Product.id.in_(quantities)).all()}
+        for product_id in quantities:
+            if product_id not in product_map:
+                return jsonify({'message': f'Product {product_id} not found'}), 404
+        
+        order_details = [{
+            'product_id': product_id,
+            'quantity': quantity,
+            'unit_price': product_map[product_id].price,
+            'subtotal': product_map[product_id].price * quantity
+        } for product_id, quantity in quantities.items()]
         
         # Create order
         order = OrderRequest(
             reseller_id=claims.get('sub'),
-            total_amount=total_amount,
+            total_amount=sum(d['subtotal'] for d in order_details),
             notes=data.get('notes')
         )
         db.session.add(order)
-        db.session.commit()
+        db.session.flush()
         
-        # Create order details and update stock
-        for detail in order_details:
-            od = OrderDetail(
-                order_id=order.id,
-                product_id=detail['product_id'],
-                quantity=detail['quantity'],
-                unit_price=detail['unit_price'],
-                subtotal=detail['subtotal']
-            )
-            db.session.add(od)
-            
-            # Deduct from stock (will be added back if order is rejected)
-            stock = Stock.query.filter_by(product_id=detail['product_id']).first()
-            stock.quantity -= detail['quantity']
+        # Tahan stok gudang sampai order di-approve (dipotong) atau di-reject/kedaluwarsa (dilepas)
+        # UPDATE kondisional di reservasi atomik, jadi order yang bersamaan tidak bisa oversell
+        try:
+            reservations.reserve(order.id, quantities, key=key)
+        except ledger.InsufficientStock as e:
+            db.session.rollback()
+            return jsonify({'message': f'Insufficient stock for product {product_map[e.product_id].name}'}), 400
+        except ledger.DuplicateMovement:
+            # Retry yang bersamaan dengan request aslinya
+            db.session.rollback()
+            return _replayed_order(key, claims.get('sub')) or (jsonify({'message': 'Duplicate request'}), 409)
         
-        db.session.commit()
+        # Bulk insert order details, lalu satu commit untuk semuanya
+        db.session.execute(db.insert(OrderDetail), [
+            {**detail, 'order_id': order.id} for detail in order_details
+        ])
+        record_order_placed(order, order_details)
         
-        # Emit socket event for new order
-        socketio.emit('new_order', {
+        # Emit socket event for new order (lewat outbox, ikut commit yang sama)
+        notify_admins('new_order', {
             'order_id': order.id,
             'reseller_id': order.reseller_id,
             'reseller_name': order.reseller.name,
             'total_amount': order.total_amount,
             'order_date': order.order_date.isoformat()
-        }, namespace='/admin')
+        })
+        db.session.commit()
+        invalidate_catalogue()
         
         return jsonify(order.to_dict()), 201
 
+def _returnable_orders(reseller_id, args):
+    """Order delivered milik reseller beserta produk yang masih bisa diretur.
+
+    Satu query: halaman order id (derived table, newest first) di-join ke
+    order_details, reseller_stocks (quantity > 0) dan products, jadi jumlah
+    query tidak bergantung pada jumlah order maupun jumlah baris detail.
+    """
+    page = max(args.get('page', 1, type=int), 1)
+    limit = min(max(args.get('limit', 50, type=int), 1), 200)
+
+    returnable = db.select(OrderRequest.id, OrderRequest.order_date) \
+        .join(OrderDetail, OrderDetail.order_id == OrderRequest.id) \
+        .join(ResellerStock, db.and_(
+            ResellerStock.reseller_id == OrderRequest.reseller_id,
+            ResellerStock.product_id == OrderDetail.product_id,
+            ResellerStock.quantity > 0
+        )) \
+        .where(OrderRequest.reseller_id == reseller_id, OrderRequest.status == 'delivered')
+
+    # Filter rentang tanggal order (ISO date/datetime)
+    if args.get('from'):
+        returnable = returnable.where(OrderRequest.order_date >= datetime.fromisoformat(args['from']))
+    if args.get('to'):
+        returnable = returnable.where(OrderRequest.order_date < datetime.fromisoformat(args['to']))
+
+    # Ambil satu order lebih untuk tahu apakah masih ada halaman berikutnya
+    page_ids = returnable.distinct() \
+        .order_by(OrderRequest.order_date.desc(), OrderRequest.id.desc()) \
+        .limit(limit + 1).offset((page - 1) * limit) \
+        .subquery()
+
+    rows = db.session.execute(
+        db.select(
+            OrderRequest.id, OrderRequest.order_date, OrderRequest.status,
+            OrderDetail.product_id, OrderDetail.quantity,
+            Product.name.label('product_name'),
+            ResellerStock.quantity.label('available_quantity')
+        )
+        .join(page_ids, page_ids.c.id == OrderRequest.id)
+        .join(OrderDetail, OrderDetail.order_id == OrderRequest.id)
+        .join(ResellerStock, db.and_(
+            ResellerStock.reseller_id == OrderRequest.reseller_id,
+            ResellerStock.product_id == OrderDetail.product_id,
+            ResellerStock.quantity > 0
+        ))
+        .outerjoin(Product, Product.id == OrderDetail.product_id)
+        .order_by(OrderRequest.order_date.desc(), OrderRequest.id.desc(), OrderDetail.id)
+    ).all()
+
+    orders = {}
+    for row in rows:
+        order = orders.get(row.id)
+        if order is None:
+            order = orders[row.id] = {
+                'id': row.id,
+                'order_date': row.order_date.isoformat() if row.order_date else None,
+                'status': row.status,
+                'order_details': []
+            }
+        order['order_details'].append({
+            'product_id': row.product_id,
+            'product_name': row.product_name or f'Product {row.product_id}',
+            'quantity': row.quantity,
+            'available_quantity': row.available_quantity
+        })
+
+    result = list(orders.values())
+    return result[:limit], len(result) > limit
+
+
 @jwt_required()
 def return_operations(return_id=None):
     claims = get_jwt()
@@ -156,46 +272,15 @@ def return_operations(return_id=None):
     if request.method == 'GET':
         # Jika endpoint adalah /returns/returnable-orders
         if request.endpoint == 'reseller.return_operations' and 'returnable-orders' in request.path:
-            # Get delivered orders for this reseller
-            delivered_orders = OrderRequest.query.filter_by(
-                reseller_id=claims.get("sub"),
-                status='delivered'
-            ).all()
+            try:
+                returnable_orders, has_more = _returnable_orders(claims.get("sub"), request.args)
+            except ValueError:
+                return jsonify({'message': 'Invalid from/to date'}), 400
             
-            returnable_orders = []
-            for order in delivered_orders:
-                order_data = {
-                    'id': order.id,
-                    'order_date': order.order_date.isoformat(),
-                    'status': order.status,
-                    'order_details': []
-                }
-                
-                # Get order details with reseller stock info
-                for detail in order.order_details:
-                    # Get current reseller stock for this product
-                    reseller_stock = ResellerStock.query.filter_by(
-                        reseller_id=claims.get("sub"),
-                        product_id=detail.product_id
-                    ).first()
-                    
-                    # Get product info
-                    product = Product.query.get(detail.product_id)
-                    
-                    # Only include products that have stock available for return
-                    if reseller_stock and reseller_stock.quantity > 0:
-                        order_data['order_details'].append({
-                            'product_id': detail.product_id,
-                            'product_name': product.name if product else f'Product {detail.product_id}',
-                            'quantity': detail.quantity,
-                            'available_quantity': reseller_stock.quantity
-                        })
-                
-                # Only include orders that have returnable products
-                if order_data['order_details']:
-                    returnable_orders.append(order_data)
-            
-            return jsonify(returnable_orders)
+            response = jsonify(returnable_orders)
+            if has_more:
+                response.headers['X-Next-Page'] = str(request.args.get('page', 1, type=int) + 1)
+            return response
         
         # Original get returns functionality
         if return_id:
@@ -242,65 +327,75 @@ def return_operations(return_id=None):
             reason=data['reason']
         )
         db.session.add(return_req)
+        db.session.flush()
+        record_return_created(return_req)
         db.session.commit()
         
         return jsonify(return_req.to_dict()), 201
 
 @jwt_required()
 def stock_management():
-    # Get current user identity (usually user_id)
-    current_user_id = get_jwt_identity()
-    
-    # Get additional JWT claims
     claims = get_jwt()
     
     # Check if user has reseller role
     if claims.get('role') != 'reseller':
         return jsonify({'message': 'Unauthorized'}), 403
     
-    # Use current_user_id instead of claims.get("sub")
-    # "sub" is usually the same as get_jwt_identity()
-    reseller_id = current_user_id
-    print(reseller_id)
+    reseller_id = int(get_jwt_identity())
     
-    # Query stocks for the reseller
-    stocks = ResellerStock.query.filter_by(reseller_id=reseller_id).all()
+    # Mode delta untuk sync inkremental aplikasi mobile: ?since=<watermark>
+    if 'since' in request.args:
+        try:
+            return jsonify(get_delta(reseller_id, request.args))
+        except ValueError:
+            return jsonify({'message': 'Invalid since watermark'}), 400
     
-    # Return the stock data
-    return jsonify([{
-        'product': s.product.to_dict(),
-        'quantity': s.quantity
-    } for s in stocks])
+    # Halaman stok di-cache per reseller, invalidasi saat ledger mengubah stoknya
+    etag, body, headers = get_page(reseller_id, request.args)
+    if request.if_none_match.contains(etag):
+        response = make_response('', 304)
+    else:
+        response = make_response(body)
+        response.mimetype = 'application/json'
+    response.headers.update(headers)
+    response.set_etag(etag)
+    return response
 
 @jwt_required()
 def shipping_tracking(shipping_id=None):
-    current_user = get_jwt_identity()
-    if current_user['role'] != 'reseller':
+    claims = get_jwt()
+    if claims.get('role') != 'reseller':
         return jsonify({'message': 'Unauthorized'}), 403
+    reseller_id = int(get_jwt_identity())
     
     if request.method == 'GET':
         if shipping_id:
             shipping = ShippingInfo.query.filter_by(
                 id=shipping_id,
-                reseller_id=current_user['id']
+                reseller_id=reseller_id
             ).first_or_404()
             return jsonify(shipping.to_dict())
         else:
-            shippings = ShippingInfo.query.filter_by(reseller_id=current_user['id']).all()
+            shippings = ShippingInfo.query.filter_by(reseller_id=reseller_id).all()
             return jsonify([s.to_dict() for s in shippings])
     
     elif request.method == 'PUT':
         shipping = ShippingInfo.query.filter_by(
             id=shipping_id,
-            reseller_id=current_user['id']
+            reseller_id=reseller_id
         ).first_or_404()
         
         if shipping.status != 'delivered':
             return jsonify({'message': 'Shipping not yet delivered'}), 400
         
-        # Validate delivery
-        shipping.order.status = 'completed'
-        shipping.actual_delivery = datetime.utcnow()
+        # Validate delivery: lewat lifecycle (transisi yang sah, compare-and-set, event);
+        # konfirmasi ulang untuk order yang sudah completed tidak mengubah apa-apa
+        try:
+            if lifecycle.transition(shipping.order, 'completed'):
+                shipping.actual_delivery = datetime.utcnow()
+        except (lifecycle.InvalidTransition, lifecycle.TransitionConflict) as e:
+            db.session.rollback()
+            return jsonify({'message': str(e)}), 409
         db.session.commit()
         
         return jsonify(shipping.to_dict())
\ No newline at end of file
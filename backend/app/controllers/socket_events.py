@@ -1,46 +1,85 @@
-from flask_socketio import Namespace, emit
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask import session, current_app
+from flask_socketio import Namespace, emit, join_room
+from flask_jwt_extended import decode_token
+from jwt.exceptions import PyJWTError
+from flask_jwt_extended.exceptions import JWTExtendedException
+from ..models import OrderRequest
+from ..serializers import order_query
+from ..realtime import ADMIN_ROOM, reseller_room, order_room
 
 def register_socket_events(socketio):
     socketio.on_namespace(AdminNamespace('/admin'))
     socketio.on_namespace(ResellerNamespace('/reseller'))
 
+def _authenticate(auth, role):
+    # Token dikirim lewat auth={'token': ...} saat connect (socket.io-client),
+    # atau di payload event join untuk client lama
+    token = (auth or {}).get('token') if isinstance(auth, dict) else None
+    if not token:
+        return None
+    try:
+        claims = decode_token(token)
+    except (PyJWTError, JWTExtendedException):
+        return None
+    if claims.get('role') != role:
+        return None
+    session['socket_user'] = {'id': claims['sub'], 'role': role}
+    return session['socket_user']
+
+def _current_user(role, data=None):
+    user = session.get('socket_user')
+    if user and user['role'] == role:
+        return user
+    return _authenticate(data, role)
+
 class AdminNamespace(Namespace):
-    def on_connect(self):
-        print('Admin connected to socket')
+    def on_connect(self, auth=None):
+        user = _authenticate(auth, 'admin')
+        if user:
+            join_room(ADMIN_ROOM)
+            current_app.logger.debug('Admin %s connected to socket', user['id'])
     
-    def on_disconnect(self):
-        print('Admin disconnected from socket')
+    def on_disconnect(self, *args):
+        current_app.logger.debug('Admin disconnected from socket')
     
-    @jwt_required()
-    def on_join(self, data):
-        identity = get_jwt_identity()
-        if identity['role'] == 'admin':
-            print(f'Admin {identity["id"]} joined admin namespace')
-        else:
+    def on_join(self, data=None):
+        user = _current_user('admin', data)
+        if not user:
             self.disconnect()
+            return
+        join_room(ADMIN_ROOM)
 
 class ResellerNamespace(Namespace):
-    def on_connect(self):
-        print('Reseller connected to socket')
+    def on_connect(self, auth=None):
+        user = _authenticate(auth, 'reseller')
+        if user:
+            join_room(reseller_room(user['id']))
+            current_app.logger.debug('Reseller %s connected to socket', user['id'])
     
-    def on_disconnect(self):
-        print('Reseller disconnected from socket')
+    def on_disconnect(self, *args):
+        current_app.logger.debug('Reseller disconnected from socket')
     
-    @jwt_required()
-    def on_join(self, data):
-        identity = get_jwt_identity()
-        if identity['role'] == 'reseller':
-            print(f'Reseller {identity["id"]} joined reseller namespace')
-        else:
+    def on_join(self, data=None):
+        user = _current_user('reseller', data)
+        if not user:
             self.disconnect()
+            return
+        join_room(reseller_room(user['id']))
     
-    @jwt_required()
     def on_track_order(self, data):
-        identity = get_jwt_identity()
-        if identity['role'] != 'reseller':
+        user = _current_user('reseller', data)
+        if not user or not isinstance(data, dict):
+            return
+        
+        order = order_query().filter(
+            OrderRequest.id == data.get('order_id'),
+            OrderRequest.reseller_id == user['id']
+        ).first()
+        if not order:
+            emit('order_error', {'order_id': data.get('order_id'), 'message': 'Order not found'})
             return
         
-        # Send current order status to reseller
-        order_id = data.get('order_id')
-        # Implementation to fetch and send order status
\ No newline at end of file
+        # Join room order dulu baru kirim snapshot, supaya tidak ada delta yang terlewat;
+        # perubahan selanjutnya datang sebagai event order_delta
+        join_room(order_room(order.id))
+        emit('order_snapshot', order.to_dict())
@@ -0,0 +1,75 @@
+from sqlalchemy import or_, select
+from .models import db, OrderRequest, ShippingInfo, ReturnRequest, Product
+from .search import apply, match, numeric_id, looks_like_tracking
+
+# Filter listing admin dipakai bersama oleh endpoint listing dan endpoint export,
+# supaya hasil export selalu sama dengan yang tampil di dashboard.
+# ranked=True (listing) mengurutkan hasil search berdasarkan relevansi.
+
+
+def filter_products(query, args, ranked=False):
+    search = args.get('search', '')
+
+    if search:
+        query = apply(query, Product, search, ranked)
+
+    return query
+
+
+def filter_orders(query, args, ranked=False):
+    status = args.get('status', 'pending')
+    search = args.get('search', '')
+
+    if status:
+        query = query.filter_by(status=status)
+
+    if search:
+        # Angka saja = nomor order, langsung lewat primary key
+        order_id = numeric_id(search)
+        if order_id is not None:
+            query = query.filter(OrderRequest.id == order_id)
+        else:
+            query = apply(query, OrderRequest, search, ranked)
+
+    return query
+
+
+def filter_shipments(query, args, ranked=False):
+    status = args.get('status', 'all')
+    search = args.get('search', '')
+
+    if status != 'all':
+        query = query.filter_by(status=status)
+
+    if search:
+        order_id = numeric_id(search)
+        tracking = search.strip().upper()
+        if order_id is not None:
+            query = query.filter(ShippingInfo.order_id == order_id)
+        elif looks_like_tracking(search) and db.session.query(ShippingInfo.id) \
+                .filter(ShippingInfo.tracking_number == tracking).first():
+            # Nomor resi lengkap: satu probe ke index tracking_number; resi parsial lewat full-text
+            query = query.filter(ShippingInfo.tracking_number == tracking)
+        else:
+            query = apply(query, ShippingInfo, search, ranked)
+
+    return query
+
+
+def filter_returns(query, args, ranked=False):
+    status = args.get('status', default=None)
+    search = args.get('search', default=None)
+
+    if status:
+        query = query.filter_by(status=status)
+
+    if search:
+        number = numeric_id(search)
+        if number is not None:
+            query = query.filter(or_(ReturnRequest.id == number, ReturnRequest.order_id == number))
+        else:
+            reason, _ = match(ReturnRequest, search)
+            product, _ = match(Product, search)
+            query = query.filter(or_(reason, ReturnRequest.product_id.in_(select(Product.id).where(product))))
+
+    return query
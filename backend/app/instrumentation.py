@@ -0,0 +1,356 @@
+import sys
+import threading
+import time
+from collections import Counter
+from flask import Response, current_app, g, has_request_context, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Instrumentasi opt-in (INSTRUMENTATION=1): histogram latency per endpoint, jumlah dan
+# durasi query SQL per request, log slow query, /metrics format Prometheus, dan
+# sampling profiler per endpoint yang menghasilkan stack "folded" (flamegraph.pl / speedscope)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 250, 1000)
+
+
+class Histogram:
+    def __init__(self, name, help_text, buckets, labels):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self.labels = labels
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            items = sorted(self._series.items())
+            for label_values, (counts, total, count) in items:
+                labels = _labels(self.labels, label_values)
+                for bound, bucket_count in zip(self.buckets, counts):
+                    lines.append(f'{self.name}_bucket{{{labels},le="{bound}"}} {bucket_count}')
+                lines.append(f'{self.name}_bucket{{{labels},le="+Inf"}} {count}')
+                lines.append(f'{self.name}_sum{{{labels}}} {total}')
+                lines.append(f'{self.name}_count{{{labels}}} {count}')
+        return lines
+
+
+class CounterMetric:
+    def __init__(self, name, help_text, labels):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self._values = Counter()
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] += amount
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} counter']
+        with self._lock:
+            for label_values, value in sorted(self._values.items()):
+                lines.append(f'{self.name}{{{_labels(self.labels, label_values)}}} {value}')
+        return lines
+
+
+def _labels(names, values):
+    escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for v in values)
+    return ','.join(f'{name}="{value}"' for name, value in zip(names, escaped))
+
+
+class Instrumentation:
+    def __init__(self, app):
+        self.slow_query_seconds = app.config.get('SLOW_QUERY_MS', 200) / 1000
+        self.request_latency = Histogram(
+            'http_request_duration_seconds', 'HTTP request latency', LATENCY_BUCKETS, ('endpoint', 'method'))
+        self.requests = CounterMetric(
+            'http_requests_total', 'HTTP requests by status', ('endpoint', 'method', 'status'))
+        self.queries_per_request = Histogram(
+            'db_queries_per_request', 'SQL statements executed per request', QUERY_COUNT_BUCKETS, ('endpoint',))
+        self.query_time = Histogram(
+            'db_query_duration_seconds_per_request', 'Total SQL time per request', LATENCY_BUCKETS, ('endpoint',))
+        self.slow_queries = CounterMetric(
+            'db_slow_queries_total', 'SQL statements slower than SLOW_QUERY_MS', ('endpoint',))
+        self.profiler = SamplingProfiler(app.config.get('PROFILE_INTERVAL', 0.005))
+
+    def render(self):
+        lines = []
+        for metric in (self.request_latency, self.requests, self.queries_per_request,
+                       self.query_time, self.slow_queries):
+            lines += metric.render()
+        lines += _pool_lines()
+        lines += _outbox_lines()
+        return '\n'.join(lines) + '\n'
+
+
+_pool_events = Counter()
+
+
+def _pool_counter(bind, name):
+    def listener(*args):
+        _pool_events[(bind, name)] += 1
+    return listener
+
+
+def _pool_lines():
+    from .models import db
+    lines = []
+    gauges = {
+        'db_pool_size': 'size', 'db_pool_checked_out': 'checkedout',
+        'db_pool_checked_in': 'checkedin', 'db_pool_overflow': 'overflow',
+    }
+    pools = {key or 'default': engine.pool for key, engine in db.engines.items()}
+    for metric, method in gauges.items():
+        lines.append(f'# TYPE {metric} gauge')
+        for bind, pool in pools.items():
+            # StaticPool/SingletonThreadPool (SQLite) tidak punya statistik ini
+            if hasattr(pool, method):
+                lines.append(f'{metric}{{bind="{bind}"}} {getattr(pool, method)()}')
+    for event_name in ('connect', 'checkout', 'invalidate'):
+        lines.append(f'# TYPE db_pool_{event_name}_total counter')
+        for bind in pools:
+            lines.append(f'db_pool_{event_name}_total{{bind="{bind}"}} {_pool_events[(bind, event_name)]}')
+    return lines
+
+
+def _outbox_lines():
+    from .outbox import _metrics
+    return [
+        '# TYPE outbox_published_total counter', f'outbox_published_total {_metrics["published_total"]}',
+        '# TYPE outbox_failed_total counter', f'outbox_failed_total {_metrics["failed_total"]}',
+        '# TYPE outbox_dead_letter_total counter', f'outbox_dead_letter_total {_metrics["dead_letter_total"]}',
+    ]
+
+
+def _real_threading():
+    # Sampler harus thread OS sungguhan: di eventlet/gevent threading di-monkeypatch
+    # jadi green thread, yang tidak akan jalan selama request sedang memakai CPU
+    try:
+        from eventlet import patcher
+        if patcher.is_monkey_patched('thread'):
+            return patcher.original('threading').Thread, patcher.original('time').sleep
+    except ImportError:
+        pass
+    try:
+        from gevent import monkey
+        if monkey.is_module_patched('threading'):
+            return monkey.get_original('threading', ['Thread'])[0], monkey.get_original('time', 'sleep')
+    except ImportError:
+        pass
+    return threading.Thread, time.sleep
+
+
+class SamplingProfiler:
+    """Sample stack semua thread secara berkala, hanya yang sedang menjalankan view target.
+
+    Di eventlet/gevent semua green thread berbagi satu thread OS, jadi sample diambil dari
+    frame yang sedang jalan di thread itu dan difilter berdasarkan code object view-nya.
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.endpoint = None
+        self.samples = Counter()
+        self.started_at = None
+        self._target = None
+        self._active = 0
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self, endpoint, view):
+        with self._lock:
+            self.endpoint = endpoint
+            self._target = getattr(view, '__wrapped__', view).__code__
+            self.samples = Counter()
+            self.started_at = time.time()
+            if self._thread is None:
+                thread_cls, self._sleep = _real_threading()
+                self._thread = thread_cls(target=self._run, name='sampling-profiler', daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        with self._lock:
+            self.endpoint = None
+            self._target = None
+
+    def request_started(self):
+        self._active += 1
+
+    def request_finished(self):
+        self._active = max(self._active - 1, 0)
+
+    def _run(self):
+        while True:
+            self._sleep(self.interval)
+            target = self._target
+            if target is None or not self._active:
+                continue
+            for frame in sys._current_frames().values():
+                stack = []
+                matched = False
+                while frame is not None:
+                    code = frame.f_code
+                    matched = matched or code is target
+                    stack.append(f'{code.co_name} ({code.co_filename.rsplit("/", 1)[-1]}:{code.co_firstlineno})')
+                    frame = frame.f_back
+                if matched:
+                    self.samples[';'.join(reversed(stack))] += 1
+
+    def folded(self):
+        # Format "frame;frame;frame count" per baris, input flamegraph.pl / speedscope
+        return ''.join(f'{stack} {count}\n' for stack, count in self.samples.most_common())
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get('query_start')
+    if not starts:
+        return
+    started = starts.pop()
+    if not has_request_context() or 'instrumentation' not in g:
+        return
+    elapsed = time.perf_counter() - started
+    stats = g.instrumentation
+    stats['queries'] += 1
+    stats['sql_time'] += elapsed
+
+    instrumentation = current_app.extensions['instrumentation']
+    if elapsed >= instrumentation.slow_query_seconds:
+        instrumentation.slow_queries.inc(request.endpoint or 'unknown')
+        current_app.logger.warning('Slow query (%.1f ms) on %s: %s',
+                                   elapsed * 1000, request.endpoint, statement)
+
+
+def _before_request():
+    g.instrumentation = {'start': time.perf_counter(), 'queries': 0, 'sql_time': 0.0, 'recorded': False}
+    profiler = current_app.extensions['instrumentation'].profiler
+    if profiler.endpoint and request.endpoint == profiler.endpoint:
+        g.instrumentation['profiled'] = True
+        profiler.request_started()
+
+
+def _record(status):
+    stats = g.get('instrumentation')
+    if stats is None or stats['recorded']:
+        return None
+    stats['recorded'] = True
+    instrumentation = current_app.extensions['instrumentation']
+    endpoint = request.endpoint or 'unknown'
+    elapsed = time.perf_counter() - stats['start']
+
+    instrumentation.request_latency.observe(elapsed, endpoint, request.method)
+    instrumentation.requests.inc(endpoint, request.method, status)
+    instrumentation.queries_per_request.observe(stats['queries'], endpoint)
+    instrumentation.query_time.observe(stats['sql_time'], endpoint)
+    if stats.get('profiled'):
+        instrumentation.profiler.request_finished()
+    return stats, elapsed
+
+
+def _after_request(response):
+    recorded = _record(response.status_code)
+    if recorded:
+        stats, elapsed = recorded
+        response.headers['Server-Timing'] = (
+            f'app;dur={elapsed * 1000:.1f}, db;dur={stats["sql_time"] * 1000:.1f};desc="{stats["queries"]} queries"'
+        )
+    return response
+
+
+def _teardown_request(exc):
+    if exc is not None:
+        _record(500)
+
+
+_LOOPBACK = ('127.0.0.1', '::1')
+
+
+def _metrics_allowed():
+    token = current_app.config.get('METRICS_TOKEN')
+    if token:
+        return request.headers.get('Authorization') == f'Bearer {token}'
+    # Tanpa token hanya scraper lokal; request yang lewat reverse proxy di host yang sama
+    # (ada X-Forwarded-For) tetap ditolak
+    return request.remote_addr in _LOOPBACK and 'X-Forwarded-For' not in request.headers
+
+
+def metrics_endpoint():
+    if not _metrics_allowed():
+        return Response('Unauthorized\n', status=401, mimetype='text/plain')
+    return Response(current_app.extensions['instrumentation'].render(),
+                    mimetype='text/plain; version=0.0.4')
+
+
+@jwt_required()
+def profiler_control():
+    claims = get_jwt()
+    if claims.get('role') != 'admin':
+        return jsonify({'message': 'Unauthorized'}), 403
+
+    instrumentation = current_app.extensions.get('instrumentation')
+    if instrumentation is None:
+        return jsonify({'message': 'Instrumentation is disabled'}), 404
+    profiler = instrumentation.profiler
+
+    if request.method == 'GET':
+        # Stack folded untuk endpoint yang sedang/terakhir diprofile
+        return Response(profiler.folded(), mimetype='text/plain')
+
+    data = request.get_json(silent=True) or {}
+    endpoint = data.get('endpoint')
+    if not endpoint:
+        profiler.stop()
+        return jsonify({'profiling': None, 'samples': sum(profiler.samples.values())})
+    if endpoint not in current_app.view_functions:
+        return jsonify({'message': f'Unknown endpoint {endpoint}'}), 400
+    profiler.start(endpoint, current_app.view_functions[endpoint])
+    return jsonify({'profiling': endpoint, 'interval': profiler.interval})
+
+
+def init_instrumentation(app):
+    if not app.config.get('INSTRUMENTATION'):
+        return
+    instrumentation = app.extensions['instrumentation'] = Instrumentation(app)
+
+    # Listener di class Engine mencakup semua engine (termasuk bind tambahan)
+    if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+
+    # Statistik pool per bind (default + replica); db.init_app sudah membuat engine-nya
+    from .models import db
+    with app.app_context():
+        for key, engine in db.engines.items():
+            for event_name in ('connect', 'checkout', 'invalidate'):
+                event.listen(engine.pool, event_name, _pool_counter(key or 'default', event_name))
+
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    app.teardown_request(_teardown_request)
+    app.add_url_rule('/metrics', 'metrics', metrics_endpoint)
+    app.add_url_rule('/api/admin/profiler', 'profiler', profiler_control, methods=['GET', 'POST'])
+
+    # Profiler bisa langsung aktif dari config, atau dinyalakan lewat POST /api/admin/profiler
+    endpoint = app.config.get('PROFILE_ENDPOINT')
+    if endpoint in app.view_functions:
+        instrumentation.profiler.start(endpoint, app.view_functions[endpoint])
+    return instrumentation
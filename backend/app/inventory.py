@@ -0,0 +1,169 @@
+# Listing stok reseller (GET /api/reseller/stock). Halaman di-cache per reseller
+# (LRU in-process + Redis) dengan versi yang dinaikkan setelah commit yang mengubah
+# reseller_stocks (semua lewat app/ledger.py), ditambah versi katalog karena response
+# ikut memuat data produk. Mode delta (?since=) untuk sync inkremental tidak di-cache.
+import hashlib
+from datetime import datetime, timedelta, timezone
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.orm import contains_eager
+from .models import db, Product, ResellerStock
+from .models.routing import use_primary
+from .cache import LRUCache, redis_call
+from .catalogue import current_version
+from . import search
+
+VERSION_KEY = 'reseller_stock:{}:version'
+# Nilai: '<total>\n<array JSON>'
+PAGE_KEY = 'reseller_stock:page:{}:{}:{}'
+PAGE_TTL = 300
+MAX_LIMIT = 500
+
+_pages = LRUCache(maxsize=256)
+_local_versions = {}
+
+
+def stock_changed(reseller_id):
+    # Dicatat di session, versi baru dinaikkan setelah commit (hilang kalau rollback)
+    db.session.info.setdefault('reseller_stock_changed', set()).add(reseller_id)
+
+
+def invalidate_reseller_stock(reseller_ids):
+    for reseller_id in reseller_ids:
+        _local_versions[reseller_id] = _local_versions.get(reseller_id, 0) + 1
+        redis_call('incr', VERSION_KEY.format(reseller_id))
+
+
+def _on_commit(session):
+    changed = session.info.pop('reseller_stock_changed', None)
+    if changed:
+        invalidate_reseller_stock(changed)
+
+
+def _on_rollback(session):
+    session.info.pop('reseller_stock_changed', None)
+
+
+def init_inventory(app):
+    if not event.contains(db.session, 'after_commit', _on_commit):
+        event.listen(db.session, 'after_commit', _on_commit)
+        event.listen(db.session, 'after_rollback', _on_rollback)
+
+
+def _serialize(stocks):
+    return [{
+        'product': s.product.to_dict(),
+        'quantity': s.quantity,
+        'last_updated': s.last_updated.isoformat() if s.last_updated else None
+    } for s in stocks]
+
+
+def _query(reseller_id):
+    # Satu query dengan join produk, bukan lazy load s.product per baris
+    return ResellerStock.query.join(Product, Product.id == ResellerStock.product_id) \
+        .options(contains_eager(ResellerStock.product)) \
+        .filter(ResellerStock.reseller_id == reseller_id)
+
+
+def _limit(args):
+    return min(max(args.get('limit', 50, type=int), 1), MAX_LIMIT)
+
+
+def _params(args):
+    low_stock = args.get('low_stock', '').lower() in ('1', 'true', 'yes')
+    threshold = args.get('threshold', current_app.config.get('LOW_STOCK_THRESHOLD', 5), type=int)
+    return {
+        'page': max(args.get('page', 1, type=int), 1),
+        'limit': _limit(args),
+        'threshold': threshold if low_stock else None,
+        'category': args.get('category', ''),
+        'search': args.get('search', '').strip()
+    }
+
+
+def build_page(reseller_id, params):
+    # Halaman di-cache di bawah versi yang baru dinaikkan commit: dibaca dari primary
+    use_primary()
+    query = _query(reseller_id)
+    if params['threshold'] is not None:
+        query = query.filter(ResellerStock.quantity <= params['threshold'])
+    if params['category']:
+        query = query.filter(Product.category == params['category'])
+    if params['search']:
+        query = search.apply(query, Product, params['search'])
+    paginated = query.order_by(ResellerStock.product_id) \
+        .paginate(page=params['page'], per_page=params['limit'], error_out=False)
+    return _serialize(paginated.items), paginated.total
+
+
+def get_page(reseller_id, args):
+    """Kembalikan (etag, body JSON array, headers paging) satu halaman stok reseller dari cache.
+
+    Body tetap array seperti sebelum ada paging (client mobile membaca list); total dan
+    halaman berikutnya lewat header X-Total-Count / X-Next-Page.
+    """
+    params = _params(args)
+    version = redis_call('get', VERSION_KEY.format(reseller_id))
+    version = f'{version.decode() if version else 0}-{current_version()}'
+    key = hashlib.sha1(repr(sorted(params.items())).encode()).hexdigest()[:16]
+
+    local_key = (reseller_id, _local_versions.get(reseller_id, 0), version, key)
+    snapshot = _pages.get(local_key)
+    if snapshot:
+        return snapshot
+
+    redis_key = PAGE_KEY.format(reseller_id, version, key)
+    cached = redis_call('get', redis_key)
+    if cached is None:
+        stocks, total = build_page(reseller_id, params)
+        body = current_app.json.dumps(stocks).encode()
+        redis_call('set', redis_key, b'%d\n' % total + body, ex=PAGE_TTL)
+    else:
+        total, body = cached.split(b'\n', 1)
+        total = int(total)
+
+    headers = {'X-Total-Count': str(total)}
+    if params['page'] * params['limit'] < total:
+        headers['X-Next-Page'] = str(params['page'] + 1)
+    snapshot = (f'{version}-{hashlib.sha1(body).hexdigest()[:16]}', body, headers)
+    _pages.set(local_key, snapshot)
+    return snapshot
+
+
+def parse_watermark(value):
+    since = datetime.fromisoformat(value)
+    if since.tzinfo is not None:
+        since = since.astimezone(timezone.utc).replace(tzinfo=None)
+    return since
+
+
+def get_delta(reseller_id, args):
+    """Baris yang berubah sejak watermark `since`, urut (last_updated, id).
+
+    Halaman berikutnya lewat `since` + `after_id` dari `next`; setelah halaman terakhir
+    client menyimpan `watermark` untuk sync berikutnya. Filter low_stock/search tidak
+    dipakai di sini supaya baris yang keluar dari filter tetap terkirim.
+    """
+    since = parse_watermark(args['since'])
+    after_id = args.get('after_id', type=int)
+    limit = _limit(args)
+    started = datetime.utcnow()
+
+    column = ResellerStock.last_updated
+    query = _query(reseller_id)
+    if after_id is None:
+        # Transaksi yang commit belakangan bisa membawa last_updated sedikit lebih lama
+        # (dan replica bisa tertinggal), jadi awal sync diulang sedikit ke belakang
+        overlap = timedelta(seconds=current_app.config.get('RESELLER_STOCK_DELTA_OVERLAP', 30))
+        query = query.filter(column >= since - overlap)
+    else:
+        query = query.filter(db.or_(column > since, db.and_(column == since, ResellerStock.id > after_id)))
+    stocks = query.order_by(column, ResellerStock.id).limit(limit + 1).all()
+
+    result = {'stocks': _serialize(stocks[:limit]), 'next': None, 'watermark': None}
+    if len(stocks) > limit:
+        last = stocks[limit - 1]
+        result['next'] = {'since': last.last_updated.isoformat(), 'after_id': last.id}
+    else:
+        result['watermark'] = started.isoformat()
+    return result
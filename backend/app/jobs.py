@@ -0,0 +1,342 @@
+# Antrian job background: pekerjaan berat dari request (mis. kredit stok reseller saat
+# delivered) ditulis ke tabel outbox di transaksi yang sedang berjalan, dikirim ke Redis oleh
+# dispatcher outbox, lalu dikerjakan worker pool lokal (`start_workers`, atau `flask jobs run`
+# sebagai proses terpisah). Job bisa terkirim lebih dari sekali (retry, worker mati), jadi
+# handler harus idempoten. Tanpa Redis (atau saat Redis putus) job hanya masuk antrian
+# in-process di proses yang menjalankan worker; proses lain membiarkannya di outbox.
+import json
+import queue
+import threading
+import time
+import uuid
+from collections import deque
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from . import socketio
+from .cache import redis
+from .models import db, OrderRequest, OrderDetail
+from .realtime import notify_reseller, enqueue
+from . import ledger
+
+# Baris outbox dengan namespace ini berisi job, bukan event Socket.IO
+OUTBOX_NAMESPACE = 'jobs'
+
+_handlers = {}
+_local = queue.Queue()
+_running = [0]  # worker yang sedang berjalan di proses ini
+_metrics = {
+    'enqueued_total': 0,
+    'processed_total': 0,
+    'failed_total': 0,
+    'dead_letter_total': 0,
+    'local_fallback_total': 0,
+    'last_processed_at': None
+}
+_latencies = deque(maxlen=2000)
+_metrics_lock = threading.Lock()
+
+
+def job(name):
+    """Daftarkan fungsi sebagai handler job `name`; argumennya harus bisa di-JSON-kan."""
+    def decorator(fn):
+        _handlers[name] = fn
+        return fn
+    return decorator
+
+
+def _keys(app):
+    prefix = app.config.get('JOBS_QUEUE', 'jobs')
+    return {k: f'{prefix}:{k}' for k in ('pending', 'processing', 'started', 'dead')}
+
+
+def _client(app, blocking=False):
+    # Client terpisah untuk BRPOPLPUSH: socket_timeout harus lebih lama dari timeout blok
+    name = 'jobs_redis_blocking' if blocking else 'jobs_redis'
+    if name not in app.extensions:
+        url = app.config.get('JOBS_REDIS_URL')
+        client = None
+        if url and redis is not None:
+            timeout = app.config.get('JOBS_POLL_TIMEOUT', 1) + 5 if blocking else 0.5
+            client = redis.Redis.from_url(url, socket_timeout=timeout, socket_connect_timeout=0.5)
+        app.extensions[name] = client
+    return app.extensions[name]
+
+
+def enqueue_job(name, **kwargs):
+    # Ditulis ke outbox: ikut hilang kalau transaksi di-rollback, tetap terkirim kalau
+    # proses mati setelah commit
+    if name not in _handlers:
+        raise KeyError(f'Unknown job {name}')
+    enqueue(OUTBOX_NAMESPACE, None, name, {
+        'id': uuid.uuid4().hex,
+        'name': name,
+        'kwargs': kwargs,
+        'attempts': 0,
+        'enqueued_at': time.time()
+    })
+
+
+def can_push(app):
+    """Dispatcher proses ini bisa mengirim job: ada Redis, atau ada worker lokal yang mengerjakannya."""
+    return _client(app) is not None or _running[0] > 0
+
+
+def push_job(app, payload):
+    """Kirim job dari outbox ke antrian; False kalau belum bisa (baris outbox dicoba lagi)."""
+    raw = json.dumps(payload)
+    client = _client(app)
+    local = client is None
+    if client is not None:
+        try:
+            client.lpush(_keys(app)['pending'], raw)
+        except redis.RedisError as e:
+            app.logger.warning('Job queue unavailable: %s', e)
+            local = True
+    if local:
+        # Antrian in-process hanya kalau ada worker di proses ini yang mengosongkannya
+        if not _running[0]:
+            return False
+        _local.put(raw)
+    with _metrics_lock:
+        _metrics['enqueued_total'] += 1
+        _metrics['local_fallback_total'] += local
+    return True
+
+
+def init_jobs(app):
+    app.cli.add_command(jobs_cli)
+
+
+def _take(app, client, keys, timeout):
+    # Job lokal (fallback) dulu, lalu Redis; di Redis job dipindah ke list processing
+    # sampai selesai supaya tidak hilang kalau worker mati di tengah jalan
+    try:
+        return (_local.get_nowait() if client is not None else _local.get(timeout=timeout)), False
+    except queue.Empty:
+        if client is None:
+            return None, False
+    try:
+        raw = client.brpoplpush(keys['pending'], keys['processing'], timeout=timeout)
+    except redis.RedisError as e:
+        app.logger.error('Job queue read failed: %s', e)
+        socketio.sleep(timeout)
+        return None, False
+    if raw is None:
+        return None, False
+    try:
+        client.hset(keys['started'], json.loads(raw)['id'], time.time())
+    except redis.RedisError as e:
+        # Job sudah di processing; reaper mulai menghitung timeout-nya sendiri (HSETNX)
+        app.logger.error('Job start mark failed: %s', e)
+    return raw.decode(), True
+
+
+def _finish(client, keys, raw, job_id, requeue=None):
+    pipe = client.pipeline()
+    pipe.lrem(keys['processing'], 1, raw)
+    pipe.hdel(keys['started'], job_id)
+    if requeue:
+        pipe.lpush(*requeue)
+    pipe.execute()
+
+
+def _try_finish(app, client, keys, raw, job_id, requeue=None):
+    # Gagal di sini tidak menghentikan worker: job tertinggal di processing, reaper yang
+    # mengembalikannya (handler idempoten, jadi dikerjakan ulang aman)
+    try:
+        _finish(client, keys, raw, job_id, requeue)
+    except redis.RedisError as e:
+        app.logger.error('Job %s finish failed, left for the reaper: %s', job_id, e)
+
+
+def _retry_later(app, raw, payload, delay, from_redis):
+    # Di Redis job tetap di processing selama menunggu; kalau proses mati, reaper yang mengembalikan
+    socketio.sleep(delay)
+    if not from_redis:
+        _local.put(json.dumps(payload))
+        return
+    keys = _keys(app)
+    _try_finish(app, _client(app), keys, raw, payload['id'], requeue=(keys['pending'], json.dumps(payload)))
+
+
+def process(app, raw, from_redis=False):
+    """Jalankan satu job; gagal di-retry dengan backoff, sampai JOBS_MAX_ATTEMPTS lalu dead letter."""
+    client = _client(app) if from_redis else None
+    keys = _keys(app)
+    payload = json.loads(raw)
+    handler = _handlers.get(payload['name'])
+    error = None
+    with app.app_context():
+        try:
+            if handler is None:
+                raise KeyError(f'Unknown job {payload["name"]}')
+            handler(**payload['kwargs'])
+        except Exception as e:
+            db.session.rollback()
+            error = e
+        finally:
+            db.session.remove()
+
+    if error is None:
+        if client is not None:
+            _try_finish(app, client, keys, raw, payload['id'])
+        with _metrics_lock:
+            _metrics['processed_total'] += 1
+            _metrics['last_processed_at'] = time.time()
+            _latencies.append(time.time() - payload['enqueued_at'])
+        return True
+
+    payload['attempts'] += 1
+    payload['last_error'] = str(error)[:255]
+    dead = payload['attempts'] >= app.config.get('JOBS_MAX_ATTEMPTS', 5)
+    app.logger.warning('Job %s (%s) failed, attempt %d: %s', payload['name'], payload['id'],
+                       payload['attempts'], error)
+    if dead:
+        if client is not None:
+            _try_finish(app, client, keys, raw, payload['id'], requeue=(keys['dead'], json.dumps(payload)))
+    else:
+        backoff = min(app.config.get('JOBS_RETRY_BASE', 1.0) * 2 ** (payload['attempts'] - 1), 60)
+        socketio.start_background_task(_retry_later, app, raw, payload, backoff, from_redis)
+    with _metrics_lock:
+        _metrics['failed_total'] += 1
+        _metrics['dead_letter_total'] += dead
+    return False
+
+
+def requeue_stale(app):
+    """Kembalikan job yang terlalu lama di processing (worker mati) ke pending."""
+    client = _client(app)
+    if client is None:
+        return 0
+    keys = _keys(app)
+    cutoff = time.time() - app.config.get('JOBS_VISIBILITY_TIMEOUT', 300)
+    started = client.hgetall(keys['started'])
+    requeued = 0
+    for raw in client.lrange(keys['processing'], 0, -1):
+        job_id = json.loads(raw)['id'].encode()
+        if job_id not in started:
+            # Baru diambil worker (BRPOPLPUSH sebelum HSET): mulai hitung dari sekarang
+            client.hsetnx(keys['started'], job_id, time.time())
+            continue
+        if float(started[job_id]) > cutoff:
+            continue
+        # LREM atomik: kalau beberapa worker me-reap bersamaan hanya satu yang menang
+        if client.lrem(keys['processing'], 1, raw):
+            client.hdel(keys['started'], job_id)
+            client.lpush(keys['pending'], raw)
+            requeued += 1
+    return requeued
+
+
+def _run_loop(app, client, keys, timeout, stop, reaper):
+    last_reap = 0
+    while not (stop and stop()):
+        if reaper and client is not None and time.monotonic() - last_reap > 60:
+            last_reap = time.monotonic()
+            try:
+                requeue_stale(app)
+            except redis.RedisError as e:
+                app.logger.error('Job reaper failed: %s', e)
+        try:
+            raw, from_redis = _take(app, client, keys, timeout)
+            if raw is not None:
+                process(app, raw, from_redis)
+        except Exception:
+            # Worker tetap hidup; job yang sedang jalan masih di processing untuk reaper
+            app.logger.exception('Job worker error')
+            socketio.sleep(timeout)
+
+
+def run_worker(app, stop=None, reaper=False):
+    # Selama ada worker berjalan, dispatcher proses ini boleh memakai antrian in-process
+    with _metrics_lock:
+        _running[0] += 1
+    try:
+        _run_loop(app, _client(app, blocking=True), _keys(app), app.config.get('JOBS_POLL_TIMEOUT', 1),
+                  stop, reaper)
+    finally:
+        with _metrics_lock:
+            _running[0] -= 1
+
+
+def start_workers(app):
+    if 'job_workers' in app.extensions:
+        return app.extensions['job_workers']
+    app.extensions['job_workers'] = [
+        socketio.start_background_task(run_worker, app, reaper=(n == 0))
+        for n in range(app.config.get('JOBS_WORKERS', 2))
+    ]
+    return app.extensions['job_workers']
+
+
+def _percentile(values, percent):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(percent / 100 * (len(values) - 1))))]
+
+
+def job_metrics():
+    app = current_app._get_current_object()
+    with _metrics_lock:
+        metrics = dict(_metrics)
+        latencies = list(_latencies)
+    metrics['local_pending'] = _local.qsize()
+    client = _client(app)
+    if client is not None:
+        keys = _keys(app)
+        try:
+            pipe = client.pipeline()
+            for name in ('pending', 'processing', 'dead'):
+                pipe.llen(keys[name])
+            metrics['pending'], metrics['processing'], metrics['dead_letter'] = pipe.execute()
+        except redis.RedisError as e:
+            metrics['redis_error'] = str(e)
+    metrics['latency_ms'] = {
+        f'p{p}': round(_percentile(latencies, p) * 1000, 2) if latencies else None
+        for p in (50, 95, 99)
+    }
+    return metrics
+
+
+@job('credit_delivery')
+def credit_delivery(order_id):
+    """Kredit stok reseller untuk semua baris order yang delivered, satu upsert untuk semua produk."""
+    order = db.session.get(OrderRequest, order_id)
+    if order is None:
+        return
+    lines = {pid: int(quantity) for pid, quantity in db.session.execute(
+        db.select(OrderDetail.product_id, db.func.sum(OrderDetail.quantity))
+        .where(OrderDetail.order_id == order_id).group_by(OrderDetail.product_id)
+    )}
+    try:
+        # Key per order: job yang terkirim ulang tidak mengkredit dua kali
+        stocks = ledger.move_many(lines, 'delivery', reseller_id=order.reseller_id,
+                                  reference=f'order:{order_id}', key=f'delivery:{order_id}')
+    except ledger.DuplicateMovement:
+        db.session.rollback()
+        return
+    notify_reseller(order.reseller_id, 'stock_update', {
+        'order_id': order_id,
+        'stocks': [{'product_id': pid, 'quantity': quantity} for pid, quantity in stocks.items()]
+    })
+    db.session.commit()
+
+
+@click.group('jobs')
+def jobs_cli():
+    """Worker antrian job background."""
+
+
+@jobs_cli.command('run')
+@click.option('--workers', type=int, default=None)
+@with_appcontext
+def run_command(workers):
+    app = current_app._get_current_object()
+    if _client(app) is None:
+        raise click.ClickException('JOBS_REDIS_URL tidak di-set atau redis tidak terpasang')
+    threads = [threading.Thread(target=run_worker, args=(app,), kwargs={'reaper': n == 0}, daemon=True)
+               for n in range(workers or app.config.get('JOBS_WORKERS', 2))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
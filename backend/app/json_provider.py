@@ -0,0 +1,41 @@
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # tanpa orjson tetap memakai json bawaan Flask
+    orjson = None
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    # Datetime tetap lewat default() supaya formatnya sama dengan provider bawaan Flask
+    base_option = (orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME) if orjson else 0
+
+    def _option(self, indent=False):
+        option = self.base_option
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps(self, obj, **kwargs):
+        # Argumen khusus json.dumps (cls, separators, ...) tidak didukung orjson
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self._option()).decode()
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        body = orjson.dumps(obj, default=self.default, option=self._option(indent) | orjson.OPT_APPEND_NEWLINE)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+def init_json_provider(app):
+    if orjson is not None and app.config.get('JSON_USE_ORJSON', True):
+        app.json = OrjsonProvider(app)
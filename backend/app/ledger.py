@@ -0,0 +1,294 @@
+# Ledger stok: setiap perubahan stok gudang (stocks) dan stok reseller (reseller_stocks)
+# ditulis sebagai baris append-only di stock_movements, dan saldonya diubah dengan
+# UPDATE quantity = quantity + :delta di database, bukan read-modify-write di objek ORM.
+# Idempotency key (header Idempotency-Key) unik per movement, jadi request yang di-retry
+# hanya diterapkan sekali. `flask ledger reconcile` mencocokkan saldo cache dengan SUM(delta).
+from datetime import datetime
+import click
+from flask import request
+from flask.cli import with_appcontext
+from flask_jwt_extended import get_jwt
+from sqlalchemy.dialects import mysql, sqlite, postgresql
+from sqlalchemy.exc import IntegrityError
+from .models import db, Stock, ResellerStock, StockMovement
+from .analytics import record_stock_level, refresh_stock_outs
+from .inventory import stock_changed
+from . import availability
+
+RECONCILE_BATCH = 500
+_upsert_dialects = {'mysql': mysql, 'mariadb': mysql, 'sqlite': sqlite, 'postgresql': postgresql}
+
+
+class InsufficientStock(Exception):
+    def __init__(self, product_id):
+        super().__init__(f'Insufficient stock for product {product_id}')
+        self.product_id = product_id
+
+
+class DuplicateMovement(Exception):
+    """Idempotency key sudah pernah dipakai; transaksi harus di-rollback."""
+
+    def __init__(self, key):
+        super().__init__(f'Idempotency key {key} already applied')
+        self.key = key
+
+
+def request_key():
+    # Key dari client di-scope per user supaya tidak bisa bertabrakan antar akun
+    key = request.headers.get('Idempotency-Key', '').strip()[:100]
+    if not key:
+        return None
+    claims = get_jwt()
+    return f"{claims.get('role')}:{claims.get('sub')}:{key}"
+
+
+def replay(key):
+    """Reference movement yang sudah diterapkan dengan key ini (mis. 'order:12'), atau None."""
+    if not key:
+        return None
+    # Range scan di unique index: semua movement key ini berawalan '<key>:'
+    return db.session.scalar(
+        db.select(StockMovement.reference)
+        .where(StockMovement.idempotency_key >= f'{key}:', StockMovement.idempotency_key < f'{key};')
+        .limit(1)
+    )
+
+
+def is_duplicate_key(error):
+    # Hanya pelanggaran unique index idempotency_key yang berarti retry; FK dan
+    # constraint lain tetap error biasa
+    return 'idempotency_key' in str(getattr(error, 'orig', error))
+
+
+def _location(reseller_id):
+    if reseller_id is None:
+        table = Stock.__table__
+        return table, [], {'last_restocked': datetime.utcnow()}
+    table = ResellerStock.__table__
+    return table, [table.c.reseller_id == reseller_id], {'last_updated': datetime.utcnow()}
+
+
+def _upsert(table, index_elements, touch):
+    # INSERT ... ON CONFLICT/ON DUPLICATE KEY: quantity = quantity + nilai baru. Dieksekusi
+    # sebagai executemany; PyMySQL menggabungkannya jadi satu INSERT multi-row
+    dialect = _upsert_dialects[db.session.get_bind().dialect.name]
+    stmt = dialect.insert(table)
+    if dialect is mysql:
+        return stmt.on_duplicate_key_update(quantity=table.c.quantity + stmt.inserted.quantity, **touch)
+    return stmt.on_conflict_do_update(
+        index_elements=index_elements, set_={'quantity': table.c.quantity + stmt.excluded.quantity, **touch}
+    )
+
+
+def balances(product_ids, reseller_id=None, lock=False):
+    table, scope, _ = _location(reseller_id)
+    query = db.select(table.c.product_id, table.c.quantity).where(*scope, table.c.product_id.in_(product_ids))
+    if lock:
+        query = query.with_for_update()
+    return dict(db.session.execute(query).all())
+
+
+def _subtract(table, scope, product_ids, changes, stamp):
+    # quantity = quantity + :delta tanpa syarat; baris yang belum ada tidak tersentuh
+    if product_ids:
+        db.session.execute(
+            table.update().where(*scope, table.c.product_id == db.bindparam('pid'))
+            .values(quantity=table.c.quantity + db.bindparam('delta'), **stamp),
+            [{'pid': pid, 'delta': changes[pid]} for pid in product_ids]
+        )
+
+
+def move_many(changes, reason, reseller_id=None, reference=None, key=None, allow_negative=False,
+              track_stock_outs=True):
+    """Terapkan {product_id: delta} di satu lokasi; mengembalikan {product_id: saldo baru}.
+
+    Delta negatif ditolak (InsufficientStock) kalau saldo tidak cukup, kecuali allow_negative.
+    """
+    changes = {pid: delta for pid, delta in changes.items() if delta}
+    if not changes:
+        return {}
+    table, scope, touch = _location(reseller_id)
+    index_elements = ['product_id'] if reseller_id is None else ['reseller_id', 'product_id']
+    location = reseller_id or 0
+    keys = {pid: f'{key}:{pid}:{location}' for pid in changes} if key else {}
+    # Key dicek sebelum saldo diubah; unique index tetap menangkap retry yang bersamaan
+    if keys and db.session.scalar(
+        db.select(StockMovement.id).where(StockMovement.idempotency_key.in_(list(keys.values()))).limit(1)
+    ):
+        raise DuplicateMovement(key)
+
+    # Urut per product_id supaya row lock selalu diambil dengan urutan yang sama
+    ordered = sorted(changes)
+    decrements = [pid for pid in ordered if changes[pid] < 0]
+    increments = [pid for pid in ordered if changes[pid] > 0]
+    # last_updated reseller dipakai sebagai watermark sync (app/inventory.py), jadi selalu
+    # diisi dari sini; last_restocked gudang hanya untuk penambahan
+    stamp = touch if reseller_id is not None else {}
+    if allow_negative:
+        # Jalur batch (bulk/stock opname): satu executemany
+        _subtract(table, scope, decrements, changes, stamp)
+    else:
+        # Stok gudang yang ditahan reservasi order pending tidak bisa dipakai (app/reservations.py)
+        available = table.c.quantity - table.c.reserved if reseller_id is None else table.c.quantity
+        guarded = table.update().where(
+            *scope, table.c.product_id == db.bindparam('pid'), available >= -db.bindparam('delta')
+        ).values(quantity=table.c.quantity + db.bindparam('delta'), **stamp)
+        for product_id in decrements:
+            result = db.session.execute(guarded, {'pid': product_id, 'delta': changes[product_id]})
+            if result.rowcount != 1:
+                raise InsufficientStock(product_id)
+
+    # Penambahan: satu upsert untuk semua produk, baris saldo dibuat kalau belum ada
+    location_values = {} if reseller_id is None else {'reseller_id': reseller_id}
+    rows = [{**location_values, 'product_id': pid, 'quantity': changes[pid], **touch} for pid in increments]
+    missing = []
+    new_balances = {}
+    if decrements:
+        new_balances = balances(decrements, reseller_id)
+        # Pengurangan yang dibolehkan minus untuk produk tanpa baris saldo
+        missing = [{**location_values, 'product_id': pid, 'quantity': changes[pid], **touch}
+                   for pid in decrements if pid not in new_balances]
+    if rows or missing:
+        db.session.execute(_upsert(table, index_elements, touch), rows + missing)
+        new_balances.update(balances(increments + [r['product_id'] for r in missing], reseller_id))
+
+    try:
+        db.session.execute(db.insert(StockMovement), [{
+            'product_id': product_id,
+            'reseller_id': reseller_id,
+            'delta': delta,
+            'balance': new_balances[product_id],
+            'reason': reason,
+            'reference': reference,
+            'idempotency_key': keys.get(product_id),
+            'created_at': datetime.utcnow()
+        } for product_id, delta in changes.items()])
+    except IntegrityError as e:
+        if key and is_duplicate_key(e):
+            raise DuplicateMovement(key) from e
+        raise
+
+    if reseller_id is not None:
+        stock_changed(reseller_id)
+        return new_balances
+    availability.record(changes, sold={pid: -delta for pid, delta in changes.items()}
+                        if reason in availability.SALE_REASONS else None)
+    if track_stock_outs:
+        for product_id, delta in changes.items():
+            record_stock_level(new_balances[product_id] - delta, new_balances[product_id])
+    return new_balances
+
+
+def move(product_id, delta, reason, reseller_id=None, reference=None, key=None, allow_negative=False):
+    return move_many({product_id: delta}, reason, reseller_id, reference, key, allow_negative).get(product_id)
+
+
+def set_levels(levels, reason, reseller_id=None, reference=None, key=None, track_stock_outs=True):
+    """Set saldo absolut (stock opname) sebagai delta terhadap saldo yang dikunci.
+
+    Saldo gudang tidak boleh di bawah stok yang ditahan reservasi (InsufficientStock).
+    """
+    if reseller_id is None:
+        locked = db.session.execute(
+            db.select(Stock.product_id, Stock.quantity, Stock.reserved)
+            .where(Stock.product_id.in_(list(levels))).with_for_update()
+        ).all()
+        for product_id, _, reserved in sorted(locked):
+            if levels[product_id] < reserved:
+                raise InsufficientStock(product_id)
+        current = {product_id: quantity for product_id, quantity, _ in locked}
+    else:
+        current = balances(list(levels), reseller_id, lock=True)
+    changes = {pid: quantity - current.get(pid, 0) for pid, quantity in levels.items()}
+    return move_many(changes, reason, reseller_id, reference, key, allow_negative=True,
+                     track_stock_outs=track_stock_outs)
+
+
+def opened(rows, reason='initial', reseller_id=None, reference=None):
+    """Catat movement untuk saldo yang baru di-insert langsung (bulk import)."""
+    if reseller_id is None:
+        # Saldo nol juga perlu baris ringkasan
+        availability.record([pid for pid, _ in rows])
+    rows = [(pid, quantity) for pid, quantity in rows if quantity]
+    if rows:
+        db.session.execute(db.insert(StockMovement), [{
+            'product_id': pid, 'reseller_id': reseller_id, 'delta': quantity, 'balance': quantity,
+            'reason': reason, 'reference': reference, 'created_at': datetime.utcnow()
+        } for pid, quantity in rows])
+
+
+def _reconcile_table(table, batch_size, fix):
+    drift = []
+    warehouse = table is Stock.__table__
+    movements = StockMovement.__table__.c
+    last = 0
+    while True:
+        product_ids = db.session.scalars(
+            db.select(table.c.product_id).where(table.c.product_id > last)
+            .group_by(table.c.product_id).order_by(table.c.product_id).limit(batch_size)
+        ).all()
+        if not product_ids:
+            return drift
+        low, high = product_ids[0], product_ids[-1]
+
+        # Kunci saldo dulu: move_many selalu meng-UPDATE saldo sebelum menulis movement,
+        # jadi setelah lock ini tidak ada movement setengah jadi di rentang ini
+        reseller = table.c.reseller_id if not warehouse else db.null()
+        cached = {(pid, rid): quantity for pid, rid, quantity in db.session.execute(
+            db.select(table.c.product_id, reseller, table.c.quantity)
+            .where(table.c.product_id.between(low, high)).with_for_update()
+        )}
+        location = movements.reseller_id.is_(None) if warehouse else movements.reseller_id.isnot(None)
+        ledger = {(pid, rid): int(total) for pid, rid, total in db.session.execute(
+            db.select(movements.product_id, movements.reseller_id, db.func.sum(movements.delta))
+            .where(movements.product_id.between(low, high), location)
+            .group_by(movements.product_id, movements.reseller_id)
+        )}
+
+        for (pid, rid), quantity in cached.items():
+            expected = ledger.get((pid, rid), 0)
+            if quantity != expected:
+                drift.append({'product_id': pid, 'reseller_id': rid, 'cached': quantity, 'ledger': expected})
+                if fix:
+                    scope = [table.c.product_id == pid] + ([] if warehouse else [table.c.reseller_id == rid])
+                    if warehouse:
+                        db.session.execute(table.update().where(*scope).values(quantity=expected))
+                        availability.record([pid])
+                    else:
+                        db.session.execute(table.update().where(*scope)
+                                           .values(quantity=expected, last_updated=datetime.utcnow()))
+                        stock_changed(rid)
+        # Saldo yang hilang (baris dihapus) hanya dilaporkan
+        for (pid, rid), expected in ledger.items():
+            if (pid, rid) not in cached and expected:
+                drift.append({'product_id': pid, 'reseller_id': rid, 'cached': None, 'ledger': expected})
+
+        db.session.commit()
+        last = high
+
+
+def reconcile(batch_size=RECONCILE_BATCH, fix=True):
+    """Bandingkan saldo cache dengan SUM(delta) ledger per batch produk; kembalikan daftar drift."""
+    drift = _reconcile_table(Stock.__table__, batch_size, fix)
+    drift += _reconcile_table(ResellerStock.__table__, batch_size, fix)
+    if fix and any(d['reseller_id'] is None and d['cached'] is not None for d in drift):
+        refresh_stock_outs()
+        db.session.commit()
+    return drift
+
+
+@click.group('ledger')
+def ledger_cli():
+    """Ledger stok (stock_movements)."""
+
+
+@ledger_cli.command('reconcile')
+@click.option('--dry-run', is_flag=True, help='Hanya laporkan drift, jangan perbaiki saldo')
+@click.option('--batch-size', type=int, default=RECONCILE_BATCH)
+@with_appcontext
+def reconcile_command(dry_run, batch_size):
+    drift = reconcile(batch_size, fix=not dry_run)
+    for d in drift:
+        location = f'reseller {d["reseller_id"]}' if d['reseller_id'] else 'gudang'
+        click.echo(f'product {d["product_id"]} ({location}): cached={d["cached"]} ledger={d["ledger"]}')
+    click.echo(f'{len(drift)} drifted balances{" (dry run)" if dry_run else " fixed"}')
@@ -0,0 +1,167 @@
+# Siklus hidup order: pending -> approved/rejected, approved -> shipped -> delivered -> completed.
+# Setiap transisi divalidasi dan efek sampingnya (reservasi stok dipotong saat approved atau
+# dilepas saat rejected, shipping dibuat saat approved, kredit stok reseller saat delivered,
+# counter analytics, event Socket.IO)
+# dijalankan di transaksi pemanggil; commit tetap di controller.
+from datetime import datetime
+from sqlalchemy.orm.attributes import set_committed_value
+from .models import db, OrderRequest, OrderDetail, ShippingInfo
+from .analytics import record_order_status, record_orders_status
+from .realtime import notify_admins, notify_reseller, order_delta, enqueue_many, reseller_room, order_room
+from .jobs import enqueue_job
+from . import ledger, reservations
+
+TRANSITIONS = {
+    'pending': ('approved', 'rejected'),
+    'approved': ('shipped',),
+    'shipped': ('delivered',),
+    'delivered': ('completed',),
+}
+STATUSES = ('pending', 'approved', 'rejected', 'shipped', 'delivered', 'completed')
+BULK_STATUSES = ('approved', 'rejected')
+# Status shipment yang ikut memajukan order (PUT /api/admin/shipping)
+SHIPMENT_ORDER_STATUS = {'shipped': 'shipped', 'in_transit': 'shipped', 'delivered': 'delivered'}
+DEFAULT_SHIPPING_METHOD = 'regular'
+
+
+class InvalidTransition(Exception):
+    def __init__(self, order_id, old_status, new_status):
+        super().__init__(f'Order {order_id} cannot go from {old_status} to {new_status}')
+        self.order_id = order_id
+        self.old_status = old_status
+        self.new_status = new_status
+
+
+class TransitionConflict(Exception):
+    """Order diubah request lain di tengah transisi; transaksi harus di-rollback."""
+
+
+def allowed(old_status, new_status):
+    return new_status in TRANSITIONS.get(old_status, ())
+
+
+def _sources(status):
+    return [old for old, targets in TRANSITIONS.items() if status in targets]
+
+
+def _release_stock(order_ids, reference, key=None):
+    # Order lama (sebelum ada reservasi) memotong stok gudang saat dibuat; dikembalikan lewat ledger
+    changes = {pid: int(quantity) for pid, quantity in db.session.execute(
+        db.select(OrderDetail.product_id, db.func.sum(OrderDetail.quantity))
+        .where(OrderDetail.order_id.in_(order_ids)).group_by(OrderDetail.product_id)
+    )}
+    return ledger.move_many(changes, 'release', reference=reference, key=key)
+
+
+def _apply_effects(order, status):
+    if status == 'rejected':
+        if order.id not in reservations.release([order.id]):
+            _release_stock([order.id], f'order:{order.id}', key=f'release:{order.id}')
+    elif status == 'approved':
+        reservations.commit([order.id], f'order:{order.id}', key=f'commit:{order.id}')
+        if order.shipping is None:
+            db.session.add(ShippingInfo(order_id=order.id, reseller_id=order.reseller_id,
+                                        shipping_method=DEFAULT_SHIPPING_METHOD, status='preparing'))
+    elif status == 'delivered':
+        # Kredit stok reseller dikerjakan worker setelah commit (app/jobs.py)
+        enqueue_job('credit_delivery', order_id=order.id)
+
+
+def transition(order, status, notify=True):
+    """Pindahkan satu order ke `status`; False kalau status sudah sama (retry aman)."""
+    if status not in STATUSES:
+        raise ValueError(f'Unknown order status {status}')
+    old_status = order.status
+    if status == old_status:
+        return False
+    if not allowed(old_status, status):
+        raise InvalidTransition(order.id, old_status, status)
+
+    # Compare-and-set: request lain yang memindahkan order yang sama lebih dulu membuat ini gagal
+    result = db.session.execute(
+        db.update(OrderRequest)
+        .where(OrderRequest.id == order.id, OrderRequest.status == old_status)
+        .values(status=status, updated_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount != 1:
+        raise TransitionConflict(f'Order {order.id} was changed concurrently')
+    set_committed_value(order, 'status', status)
+
+    record_order_status(order, old_status)
+    _apply_effects(order, status)
+
+    if notify:
+        payload = {'order_id': order.id, 'status': status, 'reseller_id': order.reseller_id}
+        notify_admins('order_updated', payload)
+        notify_reseller(order.reseller_id, 'order_updated', payload)
+        order_delta(order.id, {'status': status})
+    return True
+
+
+def advance(order, status, notify=True):
+    """Maju sepanjang approved -> shipped -> delivered -> completed sampai `status`."""
+    path = ['approved', 'shipped', 'delivered', 'completed']
+    if order.status not in path:
+        raise InvalidTransition(order.id, order.status, status)
+    for step in path[path.index(order.status) + 1:path.index(status) + 1]:
+        transition(order, step, notify)
+
+
+def bulk_transition(order_ids, status):
+    """Approve/reject banyak order sekaligus dengan satu UPDATE dan efek samping berbasis set.
+
+    Mengembalikan (id yang dipindahkan, {id: status sekarang} untuk yang dilewati).
+    """
+    if status not in BULK_STATUSES:
+        raise ValueError(f'Bulk transition to {status} is not supported')
+    sources = _sources(status)
+    orders = db.session.execute(
+        db.select(OrderRequest.id, OrderRequest.reseller_id, OrderRequest.status, OrderRequest.order_date)
+        .where(OrderRequest.id.in_(order_ids)).order_by(OrderRequest.id).with_for_update()
+    ).all()
+    eligible = [o for o in orders if o.status in sources]
+    skipped = {o.id: o.status for o in orders if o.status not in sources}
+    skipped.update({order_id: None for order_id in set(order_ids) - {o.id for o in orders}})
+    if not eligible:
+        return [], skipped
+    ids = [o.id for o in eligible]
+
+    result = db.session.execute(
+        db.update(OrderRequest)
+        .where(OrderRequest.id.in_(ids), OrderRequest.status.in_(sources))
+        .values(status=status, updated_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount != len(ids):
+        # Tanpa row lock (SQLite) order bisa berubah di antara SELECT dan UPDATE
+        raise TransitionConflict('Orders were changed concurrently')
+
+    details = {}
+    if status == 'rejected':
+        for detail in db.session.execute(
+                db.select(OrderDetail.order_id, OrderDetail.product_id, OrderDetail.quantity, OrderDetail.subtotal)
+                .where(OrderDetail.order_id.in_(ids))):
+            details.setdefault(detail.order_id, []).append(detail._asdict())
+        reserved = reservations.release(ids)
+        legacy = [i for i in ids if i not in reserved]
+        if legacy:
+            _release_stock(legacy, f'bulk:{legacy[0]}-{legacy[-1]}')
+    else:
+        reservations.commit(ids, f'bulk:{ids[0]}-{ids[-1]}')
+        shipped = set(db.session.scalars(db.select(ShippingInfo.order_id).where(ShippingInfo.order_id.in_(ids))))
+        rows = [{'order_id': o.id, 'reseller_id': o.reseller_id, 'shipping_method': DEFAULT_SHIPPING_METHOD,
+                 'status': 'preparing'} for o in eligible if o.id not in shipped]
+        if rows:
+            db.session.execute(db.insert(ShippingInfo), rows)
+    record_orders_status(eligible, status, details)
+
+    # Satu event ringkasan untuk admin, satu per order untuk reseller dan room tracking
+    notify_admins('orders_updated', {'order_ids': ids, 'status': status})
+    events = []
+    for o in eligible:
+        payload = {'order_id': o.id, 'status': status, 'reseller_id': o.reseller_id}
+        events.append(('/reseller', reseller_room(o.reseller_id), 'order_updated', payload))
+        events.append(('/reseller', order_room(o.id), 'order_delta', {'order_id': o.id, 'changes': {'status': status}}))
+    enqueue_many(events)
+    return ids, skipped
@@ -1,7 +1,8 @@
 from flask_sqlalchemy import SQLAlchemy
+from .routing import RoutingSession
 
-# Inisialisasi database
-db = SQLAlchemy()
+# Inisialisasi database; RoutingSession mengarahkan GET ke read replica kalau dikonfigurasi
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 
 from .admin import Admin
 from .order import OrderRequest, OrderDetail  # Tambahkan OrderDetail di sini
@@ -10,4 +11,9 @@ from .reseller_stock import ResellerStock
 from .reseller import Reseller
 from .return_request import ReturnRequest
 from .shipping import ShippingInfo
-from .stock import Stock
\ No newline at end of file
+from .stock import Stock
+from .analytics import AnalyticsCounter
+from .outbox import OutboxEvent
+from .stock_movement import StockMovement
+from .stock_reservation import StockReservation
+from .product_availability import ProductAvailability, ProductSalesDaily
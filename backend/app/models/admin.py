@@ -1,6 +1,6 @@
 from . import db
 from flask_jwt_extended import create_access_token
-from werkzeug.security import generate_password_hash, check_password_hash
+from ..auth import hash_password, verify_password
 
 class Admin(db.Model):
     __tablename__ = 'admins'
@@ -14,10 +14,10 @@ class Admin(db.Model):
     updated_at = db.Column(db.DateTime, server_default=db.func.now(), onupdate=db.func.now())
     
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password, method='pbkdf2:sha256')
+        self.password_hash = hash_password(password)
     
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        return verify_password(self.password_hash, password)
     
     def generate_auth_token(self):
         return create_access_token(identity={'id': self.id, 'role': 'admin'})
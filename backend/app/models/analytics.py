@@ -0,0 +1,19 @@
+from . import db
+
+class AnalyticsCounter(db.Model):
+    __tablename__ = 'analytics_counters'
+    __table_args__ = (
+        db.Index('ix_analytics_counters_metric_value', 'metric', 'value'),
+    )
+    
+    # metric: revenue_daily, revenue_product, revenue_reseller, units_sold,
+    # orders_status, returns_status, returned_units, stock_outs
+    metric = db.Column(db.String(32), primary_key=True)
+    bucket = db.Column(db.String(32), primary_key=True, default='')
+    # Counter global (analytics.SHARDED) dipecah ke beberapa baris; nilai = SUM semua shard
+    shard = db.Column(db.SmallInteger, primary_key=True, default=0)
+    value = db.Column(db.Float, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, server_default=db.func.now(), onupdate=db.func.now())
+    
+    def __repr__(self):
+        return f'<AnalyticsCounter {self.metric}[{self.bucket}]#{self.shard}: {self.value}>'
@@ -1,13 +1,18 @@
 from . import db
+from .serializer import compile_serializer
 from datetime import datetime
 
 class OrderRequest(db.Model):
     __tablename__ = 'order_requests'
+    __table_args__ = (
+        db.Index('ix_order_requests_reseller_id_status', 'reseller_id', 'status'),
+        db.Index('ft_order_requests', 'notes', mysql_prefix='FULLTEXT').ddl_if(dialect='mysql'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     reseller_id = db.Column(db.Integer, db.ForeignKey('resellers.id'), nullable=False)
     order_date = db.Column(db.DateTime, default=datetime.utcnow)
-    status = db.Column(db.String(20), default='pending')  # pending, approved, rejected, shipped, delivered
+    status = db.Column(db.String(20), default='pending', index=True)  # pending, approved, rejected, shipped, delivered
     total_amount = db.Column(db.Float)
     notes = db.Column(db.Text)
     created_at = db.Column(db.DateTime, server_default=db.func.now())
@@ -22,14 +27,7 @@ class OrderRequest(db.Model):
 
     def to_dict(self):
         return {
-            'id': self.id,
-            'reseller_id': self.reseller_id,
-            'order_date': self.order_date.isoformat() if self.order_date else None,
-            'status': self.status,
-            'total_amount': self.total_amount,
-            'notes': self.notes,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            **_serialize_order(self),
             'order_details': [detail.to_dict() for detail in self.order_details],
             'shipping': self.shipping.to_dict() if self.shipping else None
         }
@@ -41,8 +39,8 @@ class OrderDetail(db.Model):
     __tablename__ = 'order_details'
     
     id = db.Column(db.Integer, primary_key=True)
-    order_id = db.Column(db.Integer, db.ForeignKey('order_requests.id'), nullable=False)
-    product_id = db.Column(db.Integer, db.ForeignKey('products.id'), nullable=False)
+    order_id = db.Column(db.Integer, db.ForeignKey('order_requests.id'), nullable=False, index=True)
+    product_id = db.Column(db.Integer, db.ForeignKey('products.id'), nullable=False, index=True)
     quantity = db.Column(db.Integer, nullable=False)
     unit_price = db.Column(db.Float, nullable=False)
     subtotal = db.Column(db.Float, nullable=False)
@@ -52,12 +50,8 @@ class OrderDetail(db.Model):
         return f'<OrderDetail Order {self.order_id} Product {self.product_id}>'
 
     def to_dict(self):
-        return {
-            'id': self.id,
-            'order_id': self.order_id,
-            'product_id': self.product_id,
-            'quantity': self.quantity,
-            'unit_price': self.unit_price,
-            'subtotal': self.subtotal,
-            'created_at': self.created_at.isoformat() if self.created_at else None
-        }
+        return _serialize_detail(self)
+
+
+_serialize_order = compile_serializer(OrderRequest)
+_serialize_detail = compile_serializer(OrderDetail)
@@ -0,0 +1,24 @@
+from . import db
+from datetime import datetime
+
+class OutboxEvent(db.Model):
+    __tablename__ = 'outbox_events'
+    __table_args__ = (
+        db.Index('ix_outbox_events_published_at_next_attempt_at', 'published_at', 'next_attempt_at'),
+    )
+    
+    # Event Socket.IO yang ditulis dalam transaksi yang sama dengan perubahan datanya,
+    # lalu dipublish oleh dispatcher (app/outbox.py)
+    id = db.Column(db.Integer, primary_key=True)
+    namespace = db.Column(db.String(32), nullable=False)
+    room = db.Column(db.String(64))
+    event = db.Column(db.String(64), nullable=False)
+    payload = db.Column(db.JSON, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    attempts = db.Column(db.Integer, default=0, nullable=False)
+    next_attempt_at = db.Column(db.DateTime, default=datetime.utcnow)  # NULL: menyerah (dead letter)
+    published_at = db.Column(db.DateTime)
+    last_error = db.Column(db.String(255))
+    
+    def __repr__(self):
+        return f'<OutboxEvent {self.id} {self.namespace} {self.event}>'
@@ -1,7 +1,12 @@
 from . import db
+from .serializer import compile_serializer
 
 class Product(db.Model):
     __tablename__ = 'products'
+    __table_args__ = (
+        # Index pencarian full-text (app/search.py); di SQLite diganti tabel FTS5
+        db.Index('ft_products', 'name', 'description', 'brand', 'category', mysql_prefix='FULLTEXT').ddl_if(dialect='mysql'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
@@ -19,20 +24,15 @@ class Product(db.Model):
     order_details = db.relationship('OrderDetail', backref='product', cascade='all, delete-orphan', lazy=True)
     reseller_stocks = db.relationship('ResellerStock', backref='product', cascade='all, delete-orphan', lazy=True)
     return_requests = db.relationship('ReturnRequest', backref='product', cascade='all, delete-orphan', lazy=True)
+    # Satu baris per produk (app/availability.py)
+    availability = db.relationship('ProductAvailability', backref='product', uselist=False,
+                                   cascade='all, delete-orphan', lazy=True)
     
     def __repr__(self):
         return f'<Product {self.name}>'
     
     def to_dict(self):
-        return {
-            'id': self.id,
-            'name': self.name,
-            'description': self.description,
-            'category': self.category,
-            'brand': self.brand,
-            'model': self.model,
-            'price': self.price,
-            'image_url': self.image_url,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
-        }
+        return _serialize(self)
+
+
+_serialize = compile_serializer(Product)
@@ -0,0 +1,43 @@
+from . import db
+from .serializer import compile_serializer
+from datetime import datetime
+
+class ProductAvailability(db.Model):
+    __tablename__ = 'product_availability'
+    __table_args__ = (
+        # Flusher stock_alert mengambil baris yang alert-nya belum terkirim
+        db.Index('ix_product_availability_alert_pending', 'alert_pending'),
+    )
+    
+    # Ringkasan stok gudang per produk (app/availability.py), diperbarui di transaksi yang
+    # sama dengan setiap movement ledger dan reservasi; listing produk membaca dari sini
+    product_id = db.Column(db.Integer, db.ForeignKey('products.id'), primary_key=True)
+    on_hand = db.Column(db.Integer, nullable=False, default=0)  # stocks.quantity
+    reserved = db.Column(db.Integer, nullable=False, default=0)  # stocks.reserved
+    available = db.Column(db.Integer, nullable=False, default=0)  # on_hand - reserved
+    sold_30d = db.Column(db.Integer, nullable=False, default=0)
+    days_of_cover = db.Column(db.Float)  # available / rata-rata terjual per hari; NULL kalau tidak ada penjualan
+    low_stock = db.Column(db.Boolean, nullable=False, default=False)
+    alert_pending = db.Column(db.Boolean, nullable=False, default=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    
+    def __repr__(self):
+        return f'<ProductAvailability Product {self.product_id}: {self.available}/{self.on_hand}>'
+    
+    def to_dict(self):
+        return _serialize(self)
+
+
+class ProductSalesDaily(db.Model):
+    __tablename__ = 'product_sales_daily'
+    
+    # Unit terjual dari gudang per produk per hari (UTC), untuk jendela sold_30d yang bergeser
+    product_id = db.Column(db.Integer, primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    quantity = db.Column(db.Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f'<ProductSalesDaily Product {self.product_id} {self.day}: {self.quantity}>'
+
+
+_serialize = compile_serializer(ProductAvailability, exclude=('alert_pending',))
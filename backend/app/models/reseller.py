@@ -1,6 +1,6 @@
 from . import db
 from flask_jwt_extended import create_access_token
-from werkzeug.security import generate_password_hash, check_password_hash
+from ..auth import hash_password, verify_password
 
 class Reseller(db.Model):
     __tablename__ = 'resellers'
@@ -22,10 +22,10 @@ class Reseller(db.Model):
     shippings = db.relationship('ShippingInfo', backref='reseller', lazy=True)
     
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password, method='pbkdf2:sha256')
+        self.password_hash = hash_password(password)
     
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        return verify_password(self.password_hash, password)
     
     def generate_auth_token(self):
         return create_access_token(identity={'id': self.id, 'role': 'reseller'})
@@ -1,7 +1,13 @@
 from . import db
+from .serializer import compile_serializer
 
 class ResellerStock(db.Model):
     __tablename__ = 'reseller_stocks'
+    __table_args__ = (
+        db.UniqueConstraint('reseller_id', 'product_id', name='uq_reseller_stocks_reseller_id_product_id'),
+        # Mode delta GET /api/reseller/stock?since=
+        db.Index('ix_reseller_stocks_reseller_id_last_updated', 'reseller_id', 'last_updated'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     reseller_id = db.Column(db.Integer, db.ForeignKey('resellers.id'), nullable=False)
@@ -13,10 +19,7 @@ class ResellerStock(db.Model):
         return f'<ResellerStock Reseller {self.reseller_id} Product {self.product_id}: {self.quantity}>'
 
     def to_dict(self):
-        return {
-            'id': self.id,
-            'reseller_id': self.reseller_id,
-            'product_id': self.product_id,
-            'quantity': self.quantity,
-            'last_updated': self.last_updated.isoformat() if self.last_updated else None
-        }
+        return _serialize(self)
+
+
+_serialize = compile_serializer(ResellerStock)
@@ -0,0 +1,32 @@
+from flask import current_app, g, has_request_context, request
+from flask_sqlalchemy.session import Session
+
+REPLICA_BIND = 'replica'
+
+
+class RoutingSession(Session):
+    """Session yang mengarahkan query dari request GET/HEAD ke bind read replica.
+
+    Aktif hanya kalau SQLALCHEMY_BINDS punya bind 'replica'. Request yang sudah
+    menulis (ada objek baru/berubah di session) atau endpoint di
+    READ_REPLICA_EXCLUDE tetap membaca dari primary.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and self._use_replica():
+            engine = self._db.engines.get(REPLICA_BIND)
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def _use_replica(self):
+        if not has_request_context() or request.method not in ('GET', 'HEAD'):
+            return False
+        if self._flushing or self.new or self.dirty or self.deleted or g.get('use_primary'):
+            return False
+        return request.endpoint not in current_app.config.get('READ_REPLICA_EXCLUDE', ())
+
+
+def use_primary():
+    # Paksa sisa request membaca dari primary (read-your-writes)
+    g.use_primary = True
@@ -0,0 +1,39 @@
+from sqlalchemy import DateTime
+
+
+def compile_serializer(model, exclude=()):
+    """Buat fungsi mapping -> dict untuk kolom-kolom model.
+
+    Kode fungsi di-generate sekali per model (satu dict literal, tanpa loop
+    maupun descriptor ORM), dan bisa dipakai untuk instance.__dict__ maupun
+    Row._mapping hasil query Core.
+    """
+    fields = []
+    for column in model.__table__.columns:
+        if column.key in exclude:
+            continue
+        if isinstance(column.type, DateTime):
+            fields.append(f"{column.key!r}: _iso(m[{column.key!r}])")
+        else:
+            fields.append(f"{column.key!r}: m[{column.key!r}]")
+
+    source = 'def serialize(m):\n    return {' + ', '.join(fields) + '}\n'
+    namespace = {'_iso': _iso}
+    exec(compile(source, f'<serializer {model.__name__}>', 'exec'), namespace)
+    from_mapping = namespace['serialize']
+    keys = tuple(c.key for c in model.__table__.columns if c.key not in exclude)
+
+    def serialize(obj):
+        try:
+            return from_mapping(obj.__dict__)
+        except KeyError:
+            # Atribut ter-expire (mis. setelah commit): load lewat ORM sekali
+            return from_mapping({key: getattr(obj, key) for key in keys})
+
+    serialize.from_mapping = from_mapping
+    serialize.keys = keys
+    return serialize
+
+
+def _iso(value):
+    return value.isoformat() if value else None
@@ -1,11 +1,17 @@
 from . import db
+from .serializer import compile_serializer
 
 class Stock(db.Model):
     __tablename__ = 'stocks'
+    __table_args__ = (
+        db.UniqueConstraint('product_id', name='uq_stocks_product_id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     product_id = db.Column(db.Integer, db.ForeignKey('products.id'), nullable=False)
     quantity = db.Column(db.Integer, nullable=False, default=0)
+    # Total reservasi aktif (app/reservations.py); tersedia untuk dijual = quantity - reserved
+    reserved = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     last_restocked = db.Column(db.DateTime)
     created_at = db.Column(db.DateTime, server_default=db.func.now())
     updated_at = db.Column(db.DateTime, server_default=db.func.now(), onupdate=db.func.now())
@@ -14,11 +20,7 @@ class Stock(db.Model):
         return f'<Stock Product {self.product_id}: {self.quantity}>'
 
     def to_dict(self):
-        return {
-            'id': self.id,
-            'product_id': self.product_id,
-            'quantity': self.quantity,
-            'last_restocked': self.last_restocked.isoformat() if self.last_restocked else None,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
-        }
+        return _serialize(self)
+
+
+_serialize = compile_serializer(Stock)
@@ -0,0 +1,25 @@
+from . import db
+from datetime import datetime
+
+class StockMovement(db.Model):
+    __tablename__ = 'stock_movements'
+    __table_args__ = (
+        # Covering index untuk SUM(delta) per lokasi saat rekonsiliasi
+        db.Index('ix_stock_movements_product_id_reseller_id_delta', 'product_id', 'reseller_id', 'delta'),
+    )
+    
+    # Ledger append-only (app/ledger.py); stocks.quantity dan reseller_stocks.quantity
+    # adalah saldo cache dari SUM(delta). Tanpa foreign key supaya riwayat tetap ada
+    # walaupun produk/reseller dihapus.
+    id = db.Column(db.Integer, primary_key=True)
+    product_id = db.Column(db.Integer, nullable=False)
+    reseller_id = db.Column(db.Integer)  # NULL: stok gudang
+    delta = db.Column(db.Integer, nullable=False)
+    balance = db.Column(db.Integer, nullable=False)  # saldo setelah movement ini
+    reason = db.Column(db.String(20), nullable=False)  # opening, initial, order, return, adjustment, bulk, delete
+    reference = db.Column(db.String(50))  # mis. order:12, return:7
+    idempotency_key = db.Column(db.String(160), unique=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    
+    def __repr__(self):
+        return f'<StockMovement {self.id} Product {self.product_id} {self.delta:+d}>'
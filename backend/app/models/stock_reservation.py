@@ -0,0 +1,23 @@
+from . import db
+from datetime import datetime
+
+class StockReservation(db.Model):
+    __tablename__ = 'stock_reservations'
+    __table_args__ = (
+        # Sweeper mencari reservasi aktif yang sudah lewat expires_at
+        db.Index('ix_stock_reservations_status_expires_at', 'status', 'expires_at'),
+    )
+    
+    # Stok gudang yang ditahan order pending (app/reservations.py); jumlah yang aktif
+    # per produk di-cache di stocks.reserved, jadi tersedia = quantity - reserved
+    id = db.Column(db.Integer, primary_key=True)
+    order_id = db.Column(db.Integer, db.ForeignKey('order_requests.id'), nullable=False, index=True)
+    product_id = db.Column(db.Integer, nullable=False)
+    quantity = db.Column(db.Integer, nullable=False)
+    status = db.Column(db.String(10), nullable=False, default='active')  # active, committed, released, expired
+    expires_at = db.Column(db.DateTime, nullable=False)
+    idempotency_key = db.Column(db.String(160), unique=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    
+    def __repr__(self):
+        return f'<StockReservation Order {self.order_id} Product {self.product_id}: {self.quantity}>'
@@ -0,0 +1,214 @@
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy import event
+from sqlalchemy.exc import SQLAlchemyError
+from . import socketio
+from .models import db, OutboxEvent
+from .realtime import publish
+from . import jobs
+
+# Metrik dispatcher per proses; lag dan jumlah pending dihitung dari tabel outbox
+_metrics = {
+    'published_total': 0,
+    'failed_total': 0,
+    'dead_letter_total': 0,
+    'batches_total': 0,
+    'last_dispatch_at': None
+}
+_latencies = deque(maxlen=2000)
+_metrics_lock = threading.Lock()
+_wake = {'pending': False}
+
+
+def _on_commit(session):
+    # Event dari proses ini langsung dibangunkan; event dari proses lain
+    # terambil di polling berikutnya
+    if session.info.pop('outbox_pending', False):
+        _wake['pending'] = True
+
+
+def _on_rollback(session):
+    session.info.pop('outbox_pending', None)
+
+
+def init_outbox(app):
+    if not event.contains(db.session, 'after_commit', _on_commit):
+        event.listen(db.session, 'after_commit', _on_commit)
+        event.listen(db.session, 'after_rollback', _on_rollback)
+    app.cli.add_command(outbox_cli)
+
+
+def _published(message):
+    if message.namespace == jobs.OUTBOX_NAMESPACE:
+        return jobs.push_job(current_app._get_current_object(), message.payload)
+    publish(message.namespace, message.room, message.event, message.payload)
+    # PubSubManager (Redis) menelan error publish dan hanya menandai koneksi putus
+    manager = socketio.server.manager if socketio.server else None
+    return getattr(manager, 'connected', True)
+
+
+def dispatch_batch(batch_size=None):
+    """Publish satu batch event yang jatuh tempo; mengembalikan jumlah yang terkirim."""
+    config = current_app.config
+    batch_size = batch_size or config.get('OUTBOX_BATCH_SIZE', 100)
+    now = datetime.utcnow()
+
+    query = OutboxEvent.query.filter(
+        OutboxEvent.published_at.is_(None),
+        OutboxEvent.next_attempt_at <= now
+    )
+    if not jobs.can_push(current_app):
+        # Tanpa Redis dan tanpa worker di proses ini job ditinggal untuk instance yang punya worker
+        query = query.filter(OutboxEvent.namespace != jobs.OUTBOX_NAMESPACE)
+    query = query.order_by(OutboxEvent.id).limit(batch_size)
+    if config.get('OUTBOX_LOCK_ROWS', True):
+        # Beberapa worker bisa menjalankan dispatcher tanpa mempublish event yang sama dua kali
+        query = query.with_for_update(skip_locked=True)
+    messages = query.all()
+
+    published = failed = dead = 0
+    latencies = []
+    for message in messages:
+        try:
+            ok = _published(message)
+            error = None if ok else 'message queue unavailable'
+        except Exception as e:
+            ok, error = False, str(e)
+
+        now = datetime.utcnow()
+        if ok:
+            message.published_at = now
+            latencies.append((now - message.created_at).total_seconds())
+            published += 1
+            continue
+
+        message.attempts += 1
+        message.last_error = error[:255]
+        if message.attempts >= config.get('OUTBOX_MAX_ATTEMPTS', 10):
+            message.next_attempt_at = None
+            dead += 1
+        else:
+            backoff = min(config.get('OUTBOX_RETRY_BASE', 0.5) * 2 ** (message.attempts - 1), 60)
+            message.next_attempt_at = now + timedelta(seconds=backoff)
+        failed += 1
+        current_app.logger.warning('Outbox publish failed for event %s: %s', message.id, error)
+        if message.namespace == jobs.OUTBOX_NAMESPACE:
+            # Job tidak punya urutan; event Socket.IO di belakangnya tetap dikirim
+            continue
+        # Message queue bermasalah: sisa batch dicoba lagi di putaran berikutnya
+        # supaya urutan event per room tetap terjaga
+        break
+
+    db.session.commit()
+
+    with _metrics_lock:
+        _metrics['published_total'] += published
+        _metrics['failed_total'] += failed
+        _metrics['dead_letter_total'] += dead
+        _metrics['batches_total'] += 1
+        _metrics['last_dispatch_at'] = datetime.utcnow().isoformat()
+        _latencies.extend(latencies)
+    return published
+
+
+def purge_published(older_than):
+    cutoff = datetime.utcnow() - timedelta(seconds=older_than)
+    result = db.session.execute(
+        db.delete(OutboxEvent).where(OutboxEvent.published_at < cutoff)
+    )
+    db.session.commit()
+    return result.rowcount
+
+
+def _percentile(values, percent):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(percent / 100 * (len(values) - 1))))]
+
+
+def outbox_metrics():
+    with _metrics_lock:
+        metrics = dict(_metrics)
+        latencies = list(_latencies)
+
+    pending, oldest = db.session.execute(
+        db.select(db.func.count(OutboxEvent.id), db.func.min(OutboxEvent.created_at))
+        .where(OutboxEvent.published_at.is_(None), OutboxEvent.next_attempt_at.isnot(None))
+    ).one()
+    dead = db.session.scalar(
+        db.select(db.func.count(OutboxEvent.id))
+        .where(OutboxEvent.published_at.is_(None), OutboxEvent.next_attempt_at.is_(None))
+    )
+
+    metrics.update({
+        'pending': pending,
+        'dead_letter': dead,
+        'lag_seconds': (datetime.utcnow() - oldest).total_seconds() if oldest else 0.0,
+        'publish_latency_ms': {
+            f'p{p}': round(_percentile(latencies, p) * 1000, 2) if latencies else None
+            for p in (50, 95, 99)
+        }
+    })
+    return metrics
+
+
+def run_dispatcher(app, stop=None):
+    """Loop dispatcher: dijalankan sebagai background task Socket.IO atau lewat `flask outbox run`."""
+    poll_interval = app.config.get('OUTBOX_POLL_INTERVAL', 1.0)
+    batch_size = app.config.get('OUTBOX_BATCH_SIZE', 100)
+    retention = app.config.get('OUTBOX_RETENTION', 86400)
+    last_purge = time.monotonic()
+
+    while not (stop and stop()):
+        _wake['pending'] = False
+        published = 0
+        with app.app_context():
+            try:
+                published = dispatch_batch(batch_size)
+                if time.monotonic() - last_purge > 3600:
+                    purge_published(retention)
+                    last_purge = time.monotonic()
+            except SQLAlchemyError as e:
+                db.session.rollback()
+                app.logger.error('Outbox dispatcher failed: %s', e)
+            finally:
+                db.session.remove()
+
+        if published >= batch_size:
+            continue
+        # Tidur sampai ada commit baru di proses ini atau interval polling habis
+        deadline = time.monotonic() + poll_interval
+        while not _wake['pending'] and time.monotonic() < deadline:
+            socketio.sleep(0.01)
+
+
+def start_dispatcher(app):
+    if not app.config.get('OUTBOX_DISPATCHER', True) or 'outbox_dispatcher' in app.extensions:
+        return None
+    app.extensions['outbox_dispatcher'] = socketio.start_background_task(run_dispatcher, app)
+    return app.extensions['outbox_dispatcher']
+
+
+@click.group('outbox')
+def outbox_cli():
+    """Dispatcher event Socket.IO dari tabel outbox."""
+
+
+@outbox_cli.command('run')
+@with_appcontext
+def run_command():
+    run_dispatcher(current_app._get_current_object())
+
+
+@outbox_cli.command('purge')
+@click.option('--older-than', type=int, default=None, help='Detik sejak dipublish')
+@with_appcontext
+def purge_command(older_than):
+    count = purge_published(older_than or current_app.config.get('OUTBOX_RETENTION', 86400))
+    click.echo(f'Purged {count} published outbox events')
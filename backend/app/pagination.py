@@ -0,0 +1,64 @@
+import base64
+import json
+import time
+from flask import request
+
+COUNT_CACHE_TTL = 30
+_count_cache = {}
+
+
+def encode_cursor(last_id):
+    payload = json.dumps({'id': last_id}, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        last_id = json.loads(base64.urlsafe_b64decode(padded.encode()))['id']
+    except (ValueError, KeyError, TypeError):
+        raise ValueError('Invalid cursor')
+    if not isinstance(last_id, int):
+        raise ValueError('Invalid cursor')
+    return last_id
+
+
+def wants_cursor():
+    # Mode cursor bersifat opt-in: ?cursor= (kosong) untuk halaman pertama,
+    # lalu next_cursor dari response untuk halaman berikutnya
+    return 'cursor' in request.args
+
+
+def cursor_page(query, id_column, limit, cursor=None):
+    # Keyset pagination berdasarkan id menurun: WHERE id < :last_id memakai primary key,
+    # jadi halaman ke-1000 sama murahnya dengan halaman pertama (tanpa OFFSET)
+    limit = max(limit, 1)
+    if cursor:
+        query = query.filter(id_column < decode_cursor(cursor))
+
+    rows = query.order_by(None).order_by(id_column.desc()).limit(limit + 1).all()
+    next_cursor = encode_cursor(rows[limit - 1].id) if len(rows) > limit else None
+    return rows[:limit], next_cursor
+
+
+def cached_count(query, ttl=COUNT_CACHE_TTL):
+    # COUNT(*) per filter di-cache sebentar; total di mode cursor cukup perkiraan
+    compiled = query.statement.compile()
+    key = (str(compiled), tuple(sorted((k, str(v)) for k, v in compiled.params.items())))
+    now = time.monotonic()
+
+    cached = _count_cache.get(key)
+    if cached and cached[1] > now:
+        return cached[0]
+
+    if len(_count_cache) > 512:
+        _count_cache.clear()
+    total = query.order_by(None).count()
+    _count_cache[key] = (total, now + ttl)
+    return total
+
+
+def requested_total(query):
+    if request.args.get('include_total', '').lower() in ('1', 'true', 'yes'):
+        return cached_count(query)
+    return None
@@ -0,0 +1,48 @@
+from . import socketio
+from .models import db, OutboxEvent
+
+# Room Socket.IO: event hanya dikirim ke client yang memang berhak menerimanya,
+# bukan broadcast ke seluruh namespace
+ADMIN_ROOM = 'admins'
+
+
+def reseller_room(reseller_id):
+    return f'reseller_{reseller_id}'
+
+
+def order_room(order_id):
+    return f'order_{order_id}'
+
+
+def enqueue(namespace, room, event, payload):
+    # Event ditulis ke outbox di transaksi yang sedang berjalan: ikut hilang kalau
+    # rollback, dan dipublish dispatcher (app/outbox.py) setelah commit
+    db.session.add(OutboxEvent(namespace=namespace, room=room, event=event, payload=payload))
+    db.session.info['outbox_pending'] = True
+
+
+def enqueue_many(events):
+    # Batch (namespace, room, event, payload) sebagai satu INSERT multi-row
+    if events:
+        db.session.execute(db.insert(OutboxEvent), [
+            {'namespace': namespace, 'room': room, 'event': event, 'payload': payload}
+            for namespace, room, event, payload in events
+        ])
+        db.session.info['outbox_pending'] = True
+
+
+def publish(namespace, room, event, payload):
+    socketio.emit(event, payload, namespace=namespace, to=room)
+
+
+def notify_admins(event, payload):
+    enqueue('/admin', ADMIN_ROOM, event, payload)
+
+
+def notify_reseller(reseller_id, event, payload):
+    enqueue('/reseller', reseller_room(reseller_id), event, payload)
+
+
+def order_delta(order_id, changes):
+    # Delta untuk client yang sedang on_track_order; snapshot dikirim saat join
+    enqueue('/reseller', order_room(order_id), 'order_delta', {'order_id': order_id, 'changes': changes})
@@ -0,0 +1,243 @@
+# Reservasi stok untuk order pending: saat order dibuat stok gudang hanya ditahan
+# (stocks.reserved naik, baris stock_reservations dengan expires_at), belum dipotong.
+# Approve meng-commit reservasi lewat ledger (quantity turun), reject melepasnya, dan
+# sweeper menolak order yang reservasinya kedaluwarsa. Tersedia = quantity - reserved.
+import threading
+import time
+from datetime import datetime, timedelta
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from . import socketio
+from .models import db, Stock, StockReservation
+from .ledger import InsufficientStock, DuplicateMovement
+from . import ledger, availability
+
+SWEEP_BATCH = 500
+_metrics = {'reserved_total': 0, 'committed_total': 0, 'released_total': 0, 'expired_total': 0,
+            'last_sweep_at': None}
+_metrics_lock = threading.Lock()
+
+
+def _count(name, n):
+    with _metrics_lock:
+        _metrics[name] += n
+
+
+def available(product_ids, lock=False):
+    """{product_id: quantity - reserved} untuk produk yang punya baris stok."""
+    query = db.select(Stock.product_id, Stock.quantity - Stock.reserved).where(Stock.product_id.in_(product_ids))
+    if lock:
+        query = query.with_for_update()
+    return dict(db.session.execute(query).all())
+
+
+def replay(key):
+    """Order yang sudah dibuat dengan idempotency key ini, atau None."""
+    if not key:
+        return None
+    # Range scan di unique index, sama seperti ledger.replay
+    return db.session.scalar(
+        db.select(StockReservation.order_id)
+        .where(StockReservation.idempotency_key >= f'{key}:', StockReservation.idempotency_key < f'{key};')
+        .limit(1)
+    )
+
+
+def reserve(order_id, quantities, key=None, ttl=None):
+    """Tahan {product_id: quantity} untuk order; InsufficientStock kalau stok tersedia kurang."""
+    stocks = Stock.__table__
+    guarded = stocks.update().where(
+        stocks.c.product_id == db.bindparam('pid'),
+        stocks.c.quantity - stocks.c.reserved >= db.bindparam('qty')
+    ).values(reserved=stocks.c.reserved + db.bindparam('qty'))
+    # Urut per product_id supaya row lock selalu diambil dengan urutan yang sama
+    for product_id in sorted(quantities):
+        result = db.session.execute(guarded, {'pid': product_id, 'qty': quantities[product_id]})
+        if result.rowcount != 1:
+            raise InsufficientStock(product_id)
+    availability.record(quantities)
+
+    now = datetime.utcnow()
+    expires_at = now + timedelta(seconds=ttl or current_app.config.get('RESERVATION_TTL', 86400))
+    try:
+        db.session.execute(db.insert(StockReservation), [{
+            'order_id': order_id,
+            'product_id': product_id,
+            'quantity': quantity,
+            'status': 'active',
+            'expires_at': expires_at,
+            'idempotency_key': f'{key}:{product_id}' if key else None,
+            'created_at': now
+        } for product_id, quantity in quantities.items()])
+    except IntegrityError as e:
+        if key and ledger.is_duplicate_key(e):
+            raise DuplicateMovement(key) from e
+        raise
+    _count('reserved_total', len(quantities))
+    return expires_at
+
+
+def _close(order_ids, status):
+    # Kunci reservasi order ini, turunkan stocks.reserved untuk yang masih aktif
+    rows = db.session.execute(
+        db.select(StockReservation.id, StockReservation.order_id, StockReservation.product_id,
+                  StockReservation.quantity, StockReservation.status)
+        .where(StockReservation.order_id.in_(order_ids)).with_for_update()
+    ).all()
+    active = [r for r in rows if r.status == 'active']
+    totals = {}
+    for r in active:
+        totals[r.product_id] = totals.get(r.product_id, 0) + r.quantity
+    if totals:
+        stocks = Stock.__table__
+        db.session.execute(
+            stocks.update().where(stocks.c.product_id == db.bindparam('pid'))
+            .values(reserved=stocks.c.reserved - db.bindparam('qty')),
+            [{'pid': pid, 'qty': totals[pid]} for pid in sorted(totals)]
+        )
+        db.session.execute(
+            db.update(StockReservation).where(StockReservation.id.in_([r.id for r in active]))
+            .values(status=status).execution_options(synchronize_session=False)
+        )
+    return {r.order_id for r in rows}, totals
+
+
+def commit(order_ids, reference, key=None):
+    """Jadikan reservasi aktif potongan stok lewat ledger; mengembalikan order yang punya reservasi.
+
+    Order tanpa baris reservasi (dibuat sebelum ada reservasi) stoknya sudah dipotong saat dibuat.
+    """
+    reserved_orders, totals = _close(order_ids, 'committed')
+    if not totals:
+        return reserved_orders
+    # Setelah reservasinya dilepas stok tersedia harus masih cukup (bisa kurang kalau stok
+    # opname menurunkan quantity di bawah reserved). Dicek sekali untuk semua produk yang
+    # sudah dikunci, lalu dipotong dengan satu executemany di ledger
+    for product_id, quantity in sorted(available(list(totals), lock=True).items()):
+        if quantity < totals[product_id]:
+            raise InsufficientStock(product_id)
+    ledger.move_many({pid: -quantity for pid, quantity in totals.items()}, 'order', reference=reference, key=key,
+                     allow_negative=True)
+    _count('committed_total', len(totals))
+    return reserved_orders
+
+
+def release(order_ids, status='released'):
+    """Lepas reservasi aktif; mengembalikan order yang punya reservasi (lihat commit)."""
+    reserved_orders, totals = _close(order_ids, status)
+    availability.record(totals)
+    _count('expired_total' if status == 'expired' else 'released_total', len(totals))
+    return reserved_orders
+
+
+def sweep(batch_size=SWEEP_BATCH, now=None):
+    """Tolak order pending yang reservasinya kedaluwarsa, per batch; mengembalikan jumlah order."""
+    # Import di sini: lifecycle memakai modul ini untuk efek approve/reject
+    from .lifecycle import bulk_transition, TransitionConflict
+    from .catalogue import invalidate_catalogue
+    now = now or datetime.utcnow()
+    expired = 0
+    while True:
+        order_ids = sorted(set(db.session.scalars(
+            db.select(StockReservation.order_id)
+            .where(StockReservation.status == 'active', StockReservation.expires_at <= now)
+            .order_by(StockReservation.expires_at).limit(batch_size)
+        )))
+        if not order_ids:
+            break
+        try:
+            # Reservasi dilepas sebagai 'expired' dulu, jadi reject tidak melepas apa-apa lagi
+            release(order_ids, 'expired')
+            moved, _ = bulk_transition(order_ids, 'rejected')
+            db.session.commit()
+        except (TransitionConflict, SQLAlchemyError) as e:
+            db.session.rollback()
+            current_app.logger.warning('Reservation sweep batch failed, retrying later: %s', e)
+            break
+        expired += len(moved)
+    with _metrics_lock:
+        _metrics['last_sweep_at'] = datetime.utcnow().isoformat()
+    if expired:
+        invalidate_catalogue()
+    return expired
+
+
+def reconcile(fix=True):
+    """Bandingkan stocks.reserved dengan SUM reservasi aktif; kembalikan daftar drift."""
+    active = dict(db.session.execute(
+        db.select(StockReservation.product_id, db.func.sum(StockReservation.quantity))
+        .where(StockReservation.status == 'active').group_by(StockReservation.product_id)
+    ).all())
+    cached = dict(db.session.execute(db.select(Stock.product_id, Stock.reserved).with_for_update()).all())
+    drift = [{'product_id': pid, 'cached': reserved, 'active': int(active.get(pid, 0))}
+             for pid, reserved in cached.items() if reserved != int(active.get(pid, 0))]
+    if fix and drift:
+        db.session.execute(db.update(Stock), [
+            {'id': stock_id, 'reserved': int(active.get(pid, 0))}
+            for stock_id, pid in db.session.execute(
+                db.select(Stock.id, Stock.product_id).where(Stock.product_id.in_([d['product_id'] for d in drift])))
+        ])
+        availability.record([d['product_id'] for d in drift])
+    db.session.commit()
+    return drift
+
+
+def reservation_metrics():
+    with _metrics_lock:
+        metrics = dict(_metrics)
+    count, units, oldest = db.session.execute(
+        db.select(db.func.count(StockReservation.id), db.func.sum(StockReservation.quantity),
+                  db.func.min(StockReservation.expires_at))
+        .where(StockReservation.status == 'active')
+    ).one()
+    metrics.update({'active': count, 'active_units': int(units or 0),
+                    'next_expiry': oldest.isoformat() if oldest else None})
+    return metrics
+
+
+def run_sweeper(app, stop=None):
+    interval = app.config.get('RESERVATION_SWEEP_INTERVAL', 30)
+    batch_size = app.config.get('RESERVATION_SWEEP_BATCH', SWEEP_BATCH)
+    while not (stop and stop()):
+        with app.app_context():
+            try:
+                sweep(batch_size)
+            except SQLAlchemyError as e:
+                db.session.rollback()
+                app.logger.error('Reservation sweeper failed: %s', e)
+            finally:
+                db.session.remove()
+        deadline = time.monotonic() + interval
+        while time.monotonic() < deadline and not (stop and stop()):
+            socketio.sleep(min(1, interval))
+
+
+def start_sweeper(app):
+    if not app.config.get('RESERVATION_SWEEPER', True) or 'reservation_sweeper' in app.extensions:
+        return None
+    app.extensions['reservation_sweeper'] = socketio.start_background_task(run_sweeper, app)
+    return app.extensions['reservation_sweeper']
+
+
+@click.group('reservations')
+def reservations_cli():
+    """Reservasi stok order pending."""
+
+
+@reservations_cli.command('sweep')
+@click.option('--batch-size', type=int, default=SWEEP_BATCH)
+@with_appcontext
+def sweep_command(batch_size):
+    click.echo(f'Rejected {sweep(batch_size)} orders with expired reservations')
+
+
+@reservations_cli.command('reconcile')
+@click.option('--dry-run', is_flag=True, help='Hanya laporkan drift, jangan perbaiki stocks.reserved')
+@with_appcontext
+def reconcile_command(dry_run):
+    drift = reconcile(fix=not dry_run)
+    for d in drift:
+        click.echo(f'product {d["product_id"]}: reserved={d["cached"]} active={d["active"]}')
+    click.echo(f'{len(drift)} drifted reservations{" (dry run)" if dry_run else " fixed"}')
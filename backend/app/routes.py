@@ -4,7 +4,12 @@ from .controllers.admin_controller import (
     product_management,
     order_management,
     shipping_management,
-    return_management
+    return_management,
+    dashboard_stats,
+    outbox_status,
+    job_status,
+    reservation_status,
+    stock_alerts
 )
 from .controllers.reseller_controller import (
     reseller_login,
@@ -15,6 +20,18 @@ from .controllers.reseller_controller import (
     stock_management,
     shipping_tracking
 )
+from .controllers.export_controller import (
+    admin_order_export,
+    admin_shipping_export,
+    admin_return_export,
+    reseller_order_export,
+    reseller_return_export
+)
+from .controllers.bulk_controller import (
+    bulk_product_import,
+    bulk_stock_adjustment,
+    bulk_order_status
+)
 
 admin_bp = Blueprint('admin', __name__)
 reseller_bp = Blueprint('reseller', __name__)
@@ -23,10 +40,21 @@ reseller_bp = Blueprint('reseller', __name__)
 admin_bp.route('/login', methods=['POST'])(admin_login)
 admin_bp.route('/products', methods=['GET', 'POST'])(product_management)
 admin_bp.route('/products/<int:product_id>', methods=['GET', 'PUT', 'DELETE'])(product_management)
+admin_bp.route('/products/bulk', methods=['POST'])(bulk_product_import)
+admin_bp.route('/stock/bulk', methods=['POST'])(bulk_stock_adjustment)
 admin_bp.route('/orders', methods=['GET'])(order_management)
+admin_bp.route('/orders/bulk-status', methods=['POST'])(bulk_order_status)
 admin_bp.route('/orders/<int:order_id>', methods=['GET', 'PUT'])(order_management)
 admin_bp.route('/shipping', methods=['GET', 'PUT'])(shipping_management)
 admin_bp.route('/returns', methods=['GET', 'PUT'])(return_management)
+admin_bp.route('/exports/orders', methods=['GET'])(admin_order_export)
+admin_bp.route('/exports/shipping', methods=['GET'])(admin_shipping_export)
+admin_bp.route('/exports/returns', methods=['GET'])(admin_return_export)
+admin_bp.route('/stats', methods=['GET'])(dashboard_stats)
+admin_bp.route('/outbox', methods=['GET'])(outbox_status)
+admin_bp.route('/jobs', methods=['GET'])(job_status)
+admin_bp.route('/reservations', methods=['GET'])(reservation_status)
+admin_bp.route('/stock-alerts', methods=['GET'])(stock_alerts)
 
 # Reseller routes
 reseller_bp.route('/login', methods=['POST'])(reseller_login)
@@ -36,6 +64,8 @@ reseller_bp.route('/orders', methods=['GET', 'POST'])(order_operations)
 reseller_bp.route('/orders/<int:order_id>', methods=['GET'])(order_operations)
 reseller_bp.route('/returns', methods=['GET', 'POST'])(return_operations)
 reseller_bp.route('/returns/returnable-orders', methods=['GET'])(return_operations)
+reseller_bp.route('/orders/export', methods=['GET'])(reseller_order_export)
+reseller_bp.route('/returns/export', methods=['GET'])(reseller_return_export)
 reseller_bp.route('/stock', methods=['GET'])(stock_management)
 reseller_bp.route('/shipping', methods=['GET'])(shipping_tracking)
 reseller_bp.route('/shipping/<int:shipping_id>/validate', methods=['PUT'])(shipping_tracking)
\ No newline at end of file
@@ -0,0 +1,130 @@
+# Pencarian full-text untuk dashboard admin. Di MySQL memakai index FULLTEXT
+# (MATCH ... AGAINST dalam boolean mode), di SQLite memakai tabel FTS5 external-content
+# yang disinkronkan trigger (`flask search rebuild` untuk membuat/mengisi ulang).
+# Dialek lain, atau tabel FTS yang belum dibuat, jatuh ke ILIKE seperti sebelumnya.
+import re
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import column, inspect, literal_column, or_, select, table
+from sqlalchemy.dialects.mysql import match as mysql_match
+from .models import db
+
+# Kolom yang diindex per tabel; harus sama dengan index FULLTEXT di model/migration
+INDEXES = {
+    'products': ('name', 'description', 'brand', 'category'),
+    'order_requests': ('notes',),
+    'shipping_info': ('tracking_number', 'carrier'),
+    'return_requests': ('reason',),
+}
+# innodb_ft_min_token_size default; token lebih pendek tidak pernah ada di index MySQL
+MIN_TOKEN = 3
+
+_word = re.compile(r'\w+')
+_tracking = re.compile(r'^(?=.*\d)(?=.*[a-z])[a-z0-9-]{6,}$', re.IGNORECASE)
+_fts_ready = {}
+
+
+def numeric_id(term):
+    """Term berupa angka saja diperlakukan sebagai id (lookup primary key/FK)."""
+    term = term.strip()
+    return int(term) if term.isdigit() and len(term) < 10 else None
+
+
+def looks_like_tracking(term):
+    return bool(_tracking.match(term.strip()))
+
+
+def _sqlite_fts(name):
+    engine = db.engine
+    key = (str(engine.url), name)
+    if key not in _fts_ready:
+        _fts_ready[key] = inspect(engine).has_table(f'{name}_fts')
+    return _fts_ready[key]
+
+
+def _fts5(model, words):
+    # (tabel FTS5, kondisi MATCH) kalau index FTS5 tersedia untuk model ini
+    name = model.__tablename__
+    if not words or db.engine.dialect.name != 'sqlite' or not _sqlite_fts(name):
+        return None
+    fts = table(f'{name}_fts', column('rowid'), column('rank'))
+    return fts, literal_column(fts.name).match(' '.join(f'"{w}"*' for w in words))
+
+
+def match(model, term):
+    """(clause, order_by) full-text untuk model; order_by None kalau tidak ada ranking."""
+    columns = [model.__table__.c[c] for c in INDEXES[model.__tablename__]]
+    words = _word.findall(term.lower())
+
+    if db.engine.dialect.name in ('mysql', 'mariadb'):
+        words = [w for w in words if len(w) >= MIN_TOKEN]
+        if words:
+            # Semua kata wajib ada (+), masing-masing sebagai prefix (*) untuk search-as-you-type
+            score = mysql_match(*columns, against=' '.join(f'+{w}*' for w in words)).in_boolean_mode()
+            return score, score.desc()
+
+    fts5 = _fts5(model, words)
+    if fts5:
+        fts, matched = fts5
+        return model.id.in_(select(fts.c.rowid).where(matched)), None
+
+    pattern = f'%{term}%'
+    return or_(*(c.ilike(pattern) for c in columns)), None
+
+
+def apply(query, model, term, ranked=False):
+    fts5 = _fts5(model, _word.findall(term.lower())) if ranked else None
+    if fts5:
+        # rank FTS5 (bm25, makin kecil makin relevan) hanya bisa dibaca lewat join ke tabel FTS
+        fts, matched = fts5
+        return query.join(fts, fts.c.rowid == model.id).filter(matched).order_by(fts.c.rank)
+
+    clause, rank = match(model, term)
+    query = query.filter(clause)
+    if ranked and rank is not None:
+        query = query.order_by(rank)
+    return query
+
+
+def _sqlite_ddl(name, columns):
+    cols = ', '.join(columns)
+    new = ', '.join(f'new.{c}' for c in columns)
+    old = ', '.join(f'old.{c}' for c in columns)
+    insert = f"INSERT INTO {name}_fts(rowid, {cols}) VALUES (new.id, {new});"
+    delete = f"INSERT INTO {name}_fts({name}_fts, rowid, {cols}) VALUES ('delete', old.id, {old});"
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {name}_fts USING fts5("
+        f"{cols}, content='{name}', content_rowid='id', prefix='2 3')",
+        f"CREATE TRIGGER IF NOT EXISTS {name}_fts_ai AFTER INSERT ON {name} BEGIN {insert} END",
+        f"CREATE TRIGGER IF NOT EXISTS {name}_fts_ad AFTER DELETE ON {name} BEGIN {delete} END",
+        # Hanya update kolom yang diindex; update status/stok tidak menyentuh FTS
+        f"CREATE TRIGGER IF NOT EXISTS {name}_fts_au AFTER UPDATE OF {cols} ON {name} "
+        f"BEGIN {delete} {insert} END",
+    ]
+
+
+def rebuild():
+    """Buat (kalau belum ada) dan isi ulang index FTS5; False kalau dialek tidak memakainya."""
+    if db.engine.dialect.name != 'sqlite':
+        return False
+    with db.engine.begin() as conn:
+        for name, columns in INDEXES.items():
+            for statement in _sqlite_ddl(name, columns):
+                conn.exec_driver_sql(statement)
+            conn.exec_driver_sql(f"INSERT INTO {name}_fts({name}_fts) VALUES ('rebuild')")
+    _fts_ready.clear()
+    return True
+
+
+@click.group('search')
+def search_cli():
+    """Index pencarian full-text."""
+
+
+@search_cli.command('rebuild')
+@with_appcontext
+def rebuild_command():
+    if rebuild():
+        click.echo(f'Rebuilt FTS5 index for {", ".join(INDEXES)}')
+    else:
+        click.echo('FULLTEXT index dikelola oleh database (lihat migration), tidak ada yang perlu di-rebuild')
@@ -0,0 +1,15 @@
+from sqlalchemy.orm import selectinload
+from .models import OrderRequest
+
+
+def order_query():
+    # OrderRequest.to_dict() menyentuh order_details dan shipping, jadi keduanya
+    # di-load sekaligus (satu query IN per relasi) alih-alih lazy load per baris
+    return OrderRequest.query.options(
+        selectinload(OrderRequest.order_details),
+        selectinload(OrderRequest.shipping)
+    )
+
+
+def serialize_orders(orders):
+    return [o.to_dict() for o in orders]
@@ -0,0 +1,134 @@
+"""Ringkasan stok per produk (product_availability) dan alert low stock per batch.
+
+    python -m benchmarks.availability --products 500 --orders 600
+
+Diukur:
+- listing produk admin: query per halaman dengan stok dibaca per produk (p.stocks[0],
+  cara lama) vs GET /api/admin/products yang membaca ringkasan dengan satu query IN
+- order dibuat (reserve), di-approve/reject lewat bulk-status dan stok dikoreksi lewat
+  ledger; ringkasan yang diperbarui incremental harus sama dengan rebuild dari ledger
+- alert: ratusan perubahan stok menghasilkan satu event stock_alert per batch di outbox,
+  bukan satu per write, dan hanya untuk produk yang baru masuk low stock
+"""
+import argparse
+import math
+import statistics
+import time
+from .common import make_app, auth_headers, count_queries
+from .seed import seed
+from app import ledger, availability
+from app.models import db, Product, OutboxEvent, ProductAvailability
+
+
+def _alert_events():
+    return db.session.scalars(db.select(OutboxEvent).where(OutboxEvent.event == 'stock_alert')
+                              .order_by(OutboxEvent.id)).all()
+
+
+def _listing(client, admin, pages, limit):
+    samples = []
+    with count_queries() as counter:
+        for page in range(1, pages + 1):
+            start = time.perf_counter()
+            response = client.get(f'/api/admin/products?page={page}&limit={limit}', headers=admin)
+            samples.append((time.perf_counter() - start) * 1000)
+            assert response.status_code == 200
+            products = response.get_json()['products']
+            assert all(p['stock'] is not None and 'quantity' in p['stock'] for p in products)
+    return statistics.median(samples), counter.count / pages
+
+
+def _listing_per_product(pages, limit):
+    # Cara lama: halaman produk, lalu baris stocks di-lazy-load per produk
+    samples = []
+    with count_queries() as counter:
+        for page in range(1, pages + 1):
+            start = time.perf_counter()
+            query = Product.query
+            query.count()
+            products = query.order_by(Product.id.desc()).offset((page - 1) * limit).limit(limit).all()
+            [{**p.to_dict(), 'stock': p.stocks[0].to_dict() if p.stocks else None} for p in products]
+            samples.append((time.perf_counter() - start) * 1000)
+            db.session.expunge_all()
+    return statistics.median(samples), counter.count / pages
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--products', type=int, default=500)
+    parser.add_argument('--orders', type=int, default=600)
+    parser.add_argument('--limit', type=int, default=100)
+    parser.add_argument('--batch', type=int, default=50, help='produk per event stock_alert')
+    args = parser.parse_args()
+
+    app = make_app()
+    app.config['STOCK_ALERT_THRESHOLD'] = 5
+    client = app.test_client()
+    with app.app_context():
+        seed(resellers=10, products=args.products, orders=100, stock_range=(6, 30))
+        admin = auth_headers(1, 'admin')
+        resellers = [auth_headers(r, 'reseller') for r in range(1, 11)]
+        pages = max(args.products // args.limit, 1)
+
+        old_ms, old_queries = _listing_per_product(pages, args.limit)
+        new_ms, new_queries = _listing(client, admin, pages, args.limit)
+        print(f'listing {args.limit}/page: per-product stocks {old_ms:.1f}ms {old_queries:.0f} queries, '
+              f'availability {new_ms:.1f}ms {new_queries:.0f} queries')
+        assert new_queries <= 3 and old_queries > args.limit, (old_queries, new_queries)
+
+        # Alert dari seed (produk yang sudah rendah) dikirim dulu
+        availability.flush_alerts(args.batch)
+        events_before = len(_alert_events())
+
+        # Beban: order baru (reserve), approve/reject, dan koreksi stok lewat ledger
+        ids, writes = [], 0
+        for i in range(args.orders):
+            response = client.post('/api/reseller/orders', headers=resellers[i % 10], json={
+                'products': [{'product_id': 1 + (i * 7 + k) % args.products, 'quantity': 1 + k % 3}
+                             for k in range(3)]})
+            if response.status_code == 201:
+                ids.append(response.get_json()['id'])
+                writes += 1
+        for status, part in (('approved', ids[0::2]), ('rejected', ids[1::4])):
+            summary = client.post('/api/admin/orders/bulk-status', headers=admin,
+                                  json={'order_ids': part, 'status': status}).get_json()
+            assert summary['failed'] == 0, summary['results'][:3]
+            writes += len(part)
+        for product_id in range(1, args.products + 1, 3):
+            ledger.move(product_id, -1, 'adjustment', allow_negative=True)
+            writes += 1
+        db.session.commit()
+
+        # Incremental vs rebuild dari ledger
+        start = time.perf_counter()
+        drift = availability.rebuild(fix=False)
+        rebuild_ms = (time.perf_counter() - start) * 1000
+        assert not drift, drift[:5]
+        rows = ProductAvailability.query.all()
+        sold = sum(r.sold_30d for r in rows)
+        assert all(r.available == r.on_hand - r.reserved for r in rows)
+        assert sold > 0 and all((r.days_of_cover is None) == (r.sold_30d == 0) for r in rows)
+
+        pending = ProductAvailability.query.filter(ProductAvailability.alert_pending.is_(True)).count()
+        start = time.perf_counter()
+        sent = availability.flush_alerts(args.batch)
+        flush_ms = (time.perf_counter() - start) * 1000
+        events = _alert_events()[events_before:]
+        alerted = [a['product_id'] for e in events for a in e.payload['alerts']]
+        low = {r.product_id for r in rows if r.low_stock}
+
+        print(f'{writes} stock writes, {sold} units sold in 30d, rebuild check {rebuild_ms:.1f}ms, no drift')
+        print(f'{len(low)} products low on stock, {sent} newly low -> {len(events)} stock_alert events '
+              f'(batch {args.batch}, flush {flush_ms:.1f}ms)')
+        assert sent == pending == len(alerted) == len(set(alerted)) and set(alerted) <= low
+        assert sent > 0 and len(events) == math.ceil(sent / args.batch) and len(events) < writes
+        assert availability.flush_alerts(args.batch) == 0
+
+        # Geser jendela 30 hari tidak mengubah apa-apa di hari yang sama, dan tidak mengulang alert
+        availability.refresh_window()
+        assert not availability.rebuild(fix=False)
+        assert availability.flush_alerts(args.batch) == 0
+
+
+if __name__ == '__main__':
+    main()
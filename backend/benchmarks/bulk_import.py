@@ -0,0 +1,60 @@
+"""Import 50k produk lewat POST /api/admin/products/bulk, dibandingkan dengan
+POST /api/admin/products satu per satu (diekstrapolasi dari sampel kecil).
+
+    python -m benchmarks.bulk_import --rows 50000
+"""
+import argparse
+import time
+from .common import make_app, auth_headers
+from .seed import seed
+from app.models import db, Product, Stock
+
+
+def product_row(i):
+    return {
+        'name': f'Imported {i}', 'category': 'electronics', 'brand': f'Brand {i % 13}',
+        'model': f'M-{i}', 'price': float(i % 500 + 1), 'stock': i % 100
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=50000)
+    parser.add_argument('--sample', type=int, default=500, help='single-request sample size')
+    args = parser.parse_args()
+
+    app = make_app()
+    with app.app_context():
+        seed(products=10, orders=0)
+        headers = auth_headers(1, 'admin')
+    client = app.test_client()
+
+    start = time.perf_counter()
+    for i in range(args.sample):
+        row = product_row(i)
+        client.post('/api/admin/products', headers=headers, json={**row, 'stock': {'quantity': row['stock']}})
+    single = (time.perf_counter() - start) / args.sample
+    print(f'single POST: {single * 1000:.2f} ms/row -> ~{single * args.rows:.1f}s for {args.rows} rows')
+
+    start = time.perf_counter()
+    response = client.post('/api/admin/products/bulk', headers=headers,
+                           json={'products': [product_row(i) for i in range(args.rows)]})
+    elapsed = time.perf_counter() - start
+    summary = response.get_json()
+    print(f'bulk import: {elapsed:.1f}s for {args.rows} rows ({args.rows / elapsed:.0f} rows/s), '
+          f'succeeded={summary["succeeded"]} failed={summary["failed"]}')
+
+    start = time.perf_counter()
+    response = client.post('/api/admin/stock/bulk', headers=headers, json={'adjustments': [
+        {'product_id': r['id'], 'delta': 5} for r in summary['results'] if r['status'] == 'created'
+    ]})
+    elapsed = time.perf_counter() - start
+    print(f'bulk stock delta: {elapsed:.1f}s, failed={response.get_json()["failed"]}')
+
+    with app.app_context():
+        assert db.session.scalar(db.select(db.func.count(Product.id))) == 10 + args.sample + args.rows
+        assert db.session.scalar(db.select(db.func.count(Stock.id))) == 10 + args.sample + args.rows
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+import os
+import time
+from contextlib import contextmanager
+
+# Benchmark default-nya jalan di SQLite in-memory tanpa Redis,
+# set DATABASE_URL / REDIS_URL untuk menjalankan terhadap MySQL / Redis sungguhan
+os.environ.setdefault('DATABASE_URL', 'sqlite://')
+os.environ.setdefault('REDIS_URL', '')
+
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event
+from app import create_app, db
+
+
+def make_app():
+    app = create_app(os.getenv('FLASK_CONFIG') or 'development')
+    app.config['TESTING'] = True
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+def auth_headers(user_id, role):
+    token = create_access_token(identity=str(user_id), additional_claims={'role': role})
+    return {'Authorization': f'Bearer {token}'}
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+        self.statements = []
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+        self.statements.append(statement)
+
+
+@contextmanager
+def count_queries(engine=None):
+    engine = engine or db.engine
+    counter = QueryCounter()
+    event.listen(engine, 'before_cursor_execute', counter)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, 'before_cursor_execute', counter)
+
+
+@contextmanager
+def timer(label):
+    start = time.perf_counter()
+    yield
+    print(f'{label}: {(time.perf_counter() - start) * 1000:.1f} ms')
@@ -0,0 +1,84 @@
+"""Banyak worker memesan SKU yang sama secara bersamaan lewat POST /api/reseller/orders.
+
+    python -m benchmarks.concurrent_orders --workers 16 --orders 50 --stock 300
+
+Default-nya memakai file SQLite sementara (bukan in-memory) supaya setiap worker
+punya koneksi sendiri; set DATABASE_URL ke MySQL untuk uji row locking sebenarnya.
+Order pending menahan stok (reserved); stok yang terpesan harus tepat sama dengan
+reserved dan tidak pernah melebihi stok awal.
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+if 'DATABASE_URL' not in os.environ:
+    os.environ['DATABASE_URL'] = f'sqlite:///{tempfile.mkdtemp()}/concurrent_orders.db'
+
+from .common import make_app, auth_headers
+from .seed import seed
+from app.models import db, Stock, OrderDetail
+
+SKU = 1
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--workers', type=int, default=16)
+    parser.add_argument('--orders', type=int, default=50, help='orders per worker')
+    parser.add_argument('--stock', type=int, default=300)
+    parser.add_argument('--quantity', type=int, default=2)
+    args = parser.parse_args()
+
+    app = make_app()
+    with app.app_context():
+        seed(resellers=args.workers, products=5, orders=0)
+        db.session.execute(db.update(Stock).where(Stock.product_id == SKU).values(quantity=args.stock))
+        db.session.commit()
+        headers = [auth_headers(r, 'reseller') for r in range(1, args.workers + 1)]
+
+    results = {'created': 0, 'rejected': 0, 'errors': 0}
+    lock = threading.Lock()
+
+    def worker(worker_headers):
+        client = app.test_client()
+        for _ in range(args.orders):
+            try:
+                response = client.post('/api/reseller/orders', headers=worker_headers, json={
+                    'products': [{'product_id': SKU, 'quantity': args.quantity}]
+                })
+                key = {201: 'created', 400: 'rejected'}.get(response.status_code, 'errors')
+            except Exception:
+                key = 'errors'
+            with lock:
+                results[key] += 1
+
+    threads = [threading.Thread(target=worker, args=(h,)) for h in headers]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    with app.app_context():
+        on_hand, reserved = db.session.execute(
+            db.select(Stock.quantity, Stock.reserved).where(Stock.product_id == SKU)).one()
+        remaining = on_hand - reserved
+        sold = db.session.scalar(
+            db.select(db.func.coalesce(db.func.sum(OrderDetail.quantity), 0)).where(OrderDetail.product_id == SKU)
+        )
+
+    total = args.workers * args.orders
+    print(f'{total} requests in {elapsed:.2f}s ({total / elapsed:.0f} req/s) {results}')
+    print(f'stock: initial={args.stock} sold={sold} reserved={reserved} available={remaining}')
+
+    assert sold <= args.stock, f'oversold: {sold} > {args.stock}'
+    assert on_hand == args.stock, f'on-hand changed before approval: {on_hand}'
+    assert reserved == sold, f'lost update: reserved {reserved} != {sold}'
+    assert remaining >= 0
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+"""Biaya /api/admin/stats vs agregasi langsung, plus cek konsistensi counter inkremental.
+
+    python -m benchmarks.dashboard_stats --orders 100000
+"""
+import argparse
+import random
+import time
+from .common import make_app, auth_headers, count_queries
+from .seed import seed
+from app.analytics import rebuild
+from app.models import db, AnalyticsCounter, OrderRequest, OrderDetail, ResellerStock
+
+QUERY_BUDGET = 4
+
+
+def _counters():
+    # Counter global tersebar di beberapa shard
+    totals = {}
+    for c in AnalyticsCounter.query.all():
+        totals[(c.metric, c.bucket)] = totals.get((c.metric, c.bucket), 0) + c.value
+    return {k: v for k, v in totals.items() if v}
+
+
+def _naive_stats():
+    # Yang dilakukan dashboard tanpa tabel ringkasan: scan order_details tiap request
+    sold = db.session.query(OrderDetail.product_id, db.func.sum(OrderDetail.subtotal)) \
+        .join(OrderRequest).filter(OrderRequest.status != 'rejected') \
+        .group_by(OrderDetail.product_id).all()
+    daily = db.session.query(db.func.date(OrderRequest.order_date), db.func.sum(OrderDetail.subtotal)) \
+        .join(OrderDetail).filter(OrderRequest.status != 'rejected') \
+        .group_by(db.func.date(OrderRequest.order_date)).all()
+    statuses = db.session.query(OrderRequest.status, db.func.count(OrderRequest.id)).group_by(OrderRequest.status).all()
+    return sold, daily, statuses
+
+
+def _workload(client, app, operations, rng):
+    products = [1 + i for i in range(20)]
+    with app.app_context():
+        admin = auth_headers(1, 'admin')
+        resellers = [auth_headers(r, 'reseller') for r in range(1, 4)]
+
+    placed = []
+    for _ in range(operations):
+        items = [{'product_id': p, 'quantity': rng.randint(1, 3)} for p in rng.sample(products, 2)]
+        response = client.post('/api/reseller/orders', json={'products': items}, headers=rng.choice(resellers))
+        if response.status_code == 201:
+            placed.append(response.get_json()['id'])
+
+    # Separuh order lewat PUT satu per satu (sampai delivered), separuh lewat bulk-status
+    half = len(placed) // 2
+    for order_id in placed[:half]:
+        target = rng.choice(['approved', 'rejected', 'delivered'])
+        steps = ['approved', 'shipped', 'delivered'] if target == 'delivered' else [target]
+        for status in steps:
+            client.put(f'/api/admin/orders/{order_id}', json={'status': status}, headers=admin)
+    bulk = placed[half:]
+    for status, order_ids in (('rejected', bulk[::2]), ('approved', bulk[1::2] + bulk[:4])):
+        client.post('/api/admin/orders/bulk-status', json={'order_ids': order_ids, 'status': status}, headers=admin)
+
+    for p in products[:5]:
+        client.put(f'/api/admin/products/{p}', json={'stock': {'quantity': rng.choice([0, 50])}}, headers=admin)
+
+    with app.app_context():
+        delivered = OrderRequest.query.filter_by(reseller_id=1, status='delivered').limit(10).all()
+        returns = [(o.id, o.order_details[0].product_id) for o in delivered]
+        for _, product_id in returns:
+            if not ResellerStock.query.filter_by(reseller_id=1, product_id=product_id).first():
+                db.session.add(ResellerStock(reseller_id=1, product_id=product_id, quantity=100))
+        db.session.commit()
+
+    for order_id, product_id in returns:
+        response = client.post('/api/reseller/returns', json={
+            'order_id': order_id, 'product_id': product_id, 'quantity': 1, 'reason': 'rusak'
+        }, headers=resellers[0])
+        if response.status_code == 201:
+            client.put('/api/admin/returns', json={
+                'return_id': response.get_json()['id'], 'status': rng.choice(['approved', 'rejected'])
+            }, headers=admin)
+    print(f'workload: {len(placed)} orders placed, {len(returns)} returns')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--orders', type=int, default=100000)
+    parser.add_argument('--operations', type=int, default=200)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    app = make_app()
+    client = app.test_client()
+    with app.app_context():
+        seed(resellers=50, products=500, orders=args.orders)
+        start = time.perf_counter()
+        rebuild()
+        print(f'rebuild: {(time.perf_counter() - start) * 1000:.1f} ms')
+        headers = auth_headers(1, 'admin')
+
+    _workload(client, app, args.operations, random.Random(7))
+
+    with app.app_context():
+        incremental = _counters()
+        rebuild()
+        rebuilt = _counters()
+    drift = {key: (incremental.get(key), rebuilt.get(key)) for key in set(incremental) | set(rebuilt)
+             if abs((incremental.get(key) or 0) - (rebuilt.get(key) or 0)) > 1e-6}
+    print(f'counters: {len(rebuilt)} drift: {len(drift)}')
+    assert not drift, sorted(drift.items())[:10]
+
+    with app.app_context():
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            _naive_stats()
+        naive_ms = (time.perf_counter() - start) * 1000 / args.repeat
+
+    with app.app_context(), count_queries() as counter:
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            response = client.get('/api/admin/stats', headers=headers)
+            assert response.status_code == 200, response.get_data(as_text=True)
+        stats_ms = (time.perf_counter() - start) * 1000 / args.repeat
+    queries = counter.count // args.repeat
+
+    print(f'naive aggregation: {naive_ms:8.1f} ms/request')
+    print(f'/api/admin/stats:  {stats_ms:8.1f} ms/request queries={queries}')
+    assert queries <= QUERY_BUDGET, f'{queries} queries > budget {QUERY_BUDGET}'
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+"""Kredit stok reseller saat shipment delivered lewat antrian job background.
+
+    python -m benchmarks.delivery_credit --shipments 500 --lines 10
+
+PUT /api/admin/shipping hanya menulis job ke outbox; dispatcher mengirimnya ke antrian dan
+worker (run_dispatcher/run_worker, di sini sebagai thread biasa karena benchmark tidak
+di-monkeypatch eventlet) meng-upsert reseller_stocks untuk semua baris order. Default-nya
+file SQLite sementara dan antrian in-process; set REDIS_URL untuk lewat Redis. Di akhir:
+- stok reseller = stok awal + jumlah baris order yang delivered, tepat sekali
+- PUT delivered berulang dan job yang terkirim ulang tidak mengkredit dua kali
+- job yang di-commit saat belum ada worker tetap di outbox, terkirim begitu worker jalan
+"""
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import threading
+import time
+import uuid
+
+if 'DATABASE_URL' not in os.environ:
+    os.environ['DATABASE_URL'] = f'sqlite:///{tempfile.mkdtemp()}/delivery_credit.db'
+
+from .common import make_app, auth_headers, count_queries
+from .seed import seed
+from app.jobs import run_worker, job_metrics, process, can_push, OUTBOX_NAMESPACE
+from app.outbox import run_dispatcher, dispatch_batch
+from app.ledger import reconcile
+from app.models import db, ShippingInfo, OrderRequest, OrderDetail, ResellerStock, OutboxEvent
+
+
+def _reseller_stock():
+    return {(r, p): q for r, p, q in db.session.execute(
+        db.select(ResellerStock.reseller_id, ResellerStock.product_id, ResellerStock.quantity))}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--shipments', type=int, default=500)
+    parser.add_argument('--lines', type=int, default=10, help='baris per order')
+    parser.add_argument('--timeout', type=float, default=120)
+    args = parser.parse_args()
+
+    app = make_app()
+    with app.app_context():
+        seed(resellers=20, products=200, orders=args.shipments * 6, lines_per_order=args.lines, reseller_stock=True)
+        shipments = db.session.execute(
+            db.select(ShippingInfo.id, ShippingInfo.order_id)
+            .join(OrderRequest, OrderRequest.id == ShippingInfo.order_id)
+            .where(OrderRequest.status == 'shipped').order_by(ShippingInfo.id).limit(args.shipments)
+        ).all()
+        order_ids = [order_id for _, order_id in shipments]
+        expected = _reseller_stock()
+        for reseller_id, product_id, quantity in db.session.execute(
+                db.select(OrderRequest.reseller_id, OrderDetail.product_id, OrderDetail.quantity)
+                .join(OrderDetail, OrderDetail.order_id == OrderRequest.id)
+                .where(OrderRequest.id.in_(order_ids))):
+            expected[(reseller_id, product_id)] = expected.get((reseller_id, product_id), 0) + quantity
+        headers = auth_headers(1, 'admin')
+
+    # Job yang di-commit sebelum worker jalan (atau di instance tanpa worker) tidak hilang
+    # dan tidak masuk antrian in-process yang tidak pernah dikosongkan
+    client = app.test_client()
+    first_id, _ = shipments[0]
+    with app.app_context():
+        response = client.put('/api/admin/shipping', headers=headers,
+                              json={'shipping_id': first_id, 'status': 'delivered'})
+        assert response.status_code == 200, response.get_data(as_text=True)[:200]
+        if not can_push(app):
+            dispatch_batch()
+            assert job_metrics()['enqueued_total'] == 0 and job_metrics()['local_pending'] == 0
+            assert db.session.scalar(db.select(db.func.count(OutboxEvent.id)).where(
+                OutboxEvent.namespace == OUTBOX_NAMESPACE, OutboxEvent.published_at.is_(None))) == 1
+
+    stop = threading.Event()
+    workers = [threading.Thread(target=run_worker, args=(app, stop.is_set), daemon=True)
+               for _ in range(app.config['JOBS_WORKERS'])]
+    workers.append(threading.Thread(target=run_dispatcher, args=(app, stop.is_set), daemon=True))
+    for t in workers:
+        t.start()
+    latencies = []
+    queries = []
+    start = time.perf_counter()
+    for shipping_id, _ in shipments[1:]:
+        begin = time.perf_counter()
+        with app.app_context(), count_queries() as counter:
+            response = client.put('/api/admin/shipping', headers=headers,
+                                  json={'shipping_id': shipping_id, 'status': 'delivered'})
+        latencies.append((time.perf_counter() - begin) * 1000)
+        queries.append(counter.count)
+        assert response.status_code == 200, response.get_data(as_text=True)[:200]
+    put_elapsed = time.perf_counter() - start
+
+    # PUT delivered kedua untuk shipment yang sama tidak meng-enqueue job lagi
+    for shipping_id, _ in shipments[:10]:
+        client.put('/api/admin/shipping', headers=headers, json={'shipping_id': shipping_id, 'status': 'delivered'})
+
+    with app.app_context():
+        deadline = time.monotonic() + args.timeout
+        while job_metrics()['processed_total'] + job_metrics()['failed_total'] < len(shipments):
+            assert time.monotonic() < deadline, f'jobs not drained: {job_metrics()}'
+            time.sleep(0.01)
+        drained = time.perf_counter() - start
+        metrics = job_metrics()
+        stop.set()
+
+        # Job yang terkirim ulang (retry/reaper) harus no-op
+        for order_id in order_ids[:10]:
+            process(app, json.dumps({'id': uuid.uuid4().hex, 'name': 'credit_delivery',
+                                     'kwargs': {'order_id': order_id}, 'attempts': 0, 'enqueued_at': time.time()}))
+        final = _reseller_stock()
+        drift = reconcile(fix=False)
+
+    latencies.sort()
+    print(f'{len(shipments)} deliveries x {args.lines} lines: PUT p50={statistics.median(latencies):.1f}ms '
+          f'p99={latencies[int(len(latencies) * 0.99) - 1]:.1f}ms, {statistics.median(queries):.0f} queries/PUT, '
+          f'{put_elapsed:.2f}s for all PUTs')
+    print(f'queue drained {drained:.2f}s after first PUT; job latency {metrics["latency_ms"]}, '
+          f'failed={metrics["failed_total"]}')
+    wrong = {k: (final.get(k), v) for k, v in expected.items() if final.get(k) != v}
+    print(f'wrong reseller balances: {len(wrong)}, ledger drift: {len(drift)}')
+    assert metrics['failed_total'] == 0
+    assert metrics['enqueued_total'] == len(shipments), 'repeated delivered PUT enqueued another job'
+    assert not wrong, f'reseller stock != expected: {list(wrong.items())[:5]}'
+    assert not drift, f'ledger drift: {drift[:5]}'
+
+
+if __name__ == '__main__':
+    main()
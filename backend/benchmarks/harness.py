@@ -0,0 +1,424 @@
+"""Load test seluruh route admin/reseller + namespace Socket.IO, hasil disimpan sebagai JSON.
+
+    python -m benchmarks.harness --scale small --mix mixed --duration 30 --concurrency 8
+    python -m benchmarks.harness --scale large --database mysql+pymysql://u:p@localhost/wps_bench \\
+        --out results/after.json --compare results/before.json
+
+Server dijalankan sebagai subprocess eventlet (socketio.run) dengan INSTRUMENTATION=1, jadi
+jumlah query per request dibaca dari header Server-Timing. Tanpa --database harness memakai
+file SQLite sebagai pengganti MySQL; angka latency-nya hanya berguna untuk dibandingkan dengan
+run SQLite lain.
+"""
+import argparse
+import http.client
+import json
+import os
+import platform
+import random
+import re
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime
+
+SCALES = {
+    'small': {'products': 200, 'resellers': 50, 'orders': 20000, 'returns': 2000},
+    'medium': {'products': 1000, 'resellers': 500, 'orders': 500000, 'returns': 20000},
+    'large': {'products': 5000, 'resellers': 2000, 'orders': 2000000, 'returns': 100000},
+}
+DEFAULT_SQLITE = 'sqlite:////tmp/wps_benchmark.db'
+QUERIES_RE = re.compile(r'desc="(\d+) queries"')
+
+
+def serve(port):
+    import eventlet
+    eventlet.monkey_patch()
+    from app import create_app, socketio
+    from app.outbox import start_dispatcher
+
+    app = create_app(os.getenv('FLASK_CONFIG') or 'production')
+    start_dispatcher(app)
+    socketio.run(app, port=port, debug=False, use_reloader=False, log_output=False)
+
+
+def prepare_database(args):
+    os.environ['DATABASE_URL'] = args.database
+    from .common import make_app
+    from .seed import seed
+    from app.analytics import rebuild
+    from app.models import db, Product
+
+    if args.database.startswith('sqlite:///') and not args.reuse_db:
+        path = args.database[len('sqlite:///'):]
+        if os.path.exists(path):
+            os.remove(path)
+
+    app = make_app()
+    with app.app_context():
+        if args.reuse_db and db.session.query(Product.id).first():
+            print('reusing seeded database')
+        else:
+            start = time.perf_counter()
+            seed(resellers=args.resellers, products=args.products, orders=args.orders,
+                 returns=args.returns, reseller_stock=True, stock_range=(10 ** 6, 2 * 10 ** 6),
+                 seed_value=args.seed)
+            rebuild()
+            print(f'seeded {args.orders} orders in {time.perf_counter() - start:.1f}s')
+    return app
+
+
+def load_fixtures(app, args):
+    from flask_jwt_extended import create_access_token
+    from app.models import db, Product, OrderRequest, ShippingInfo, ReturnRequest, ResellerStock, OrderDetail
+    from .scenarios import Fixtures
+
+    rng = random.Random(args.seed)
+    with app.app_context():
+        products = list(db.session.scalars(db.select(Product.id).where(Product.brand != 'Harness').limit(5000)))
+        resellers = list(range(1, args.resellers + 1))
+        active = rng.sample(resellers, min(len(resellers), max(args.concurrency * 4, 20)))
+
+        orders_by_reseller, delivered_shipping, returnable = {}, {}, {}
+        for reseller_id in active:
+            orders_by_reseller[reseller_id] = list(db.session.scalars(
+                db.select(OrderRequest.id).where(OrderRequest.reseller_id == reseller_id).limit(200)))
+            delivered_shipping[reseller_id] = list(db.session.scalars(
+                db.select(ShippingInfo.id).where(ShippingInfo.reseller_id == reseller_id,
+                                                 ShippingInfo.status == 'delivered').limit(50)))
+            returnable[reseller_id] = [tuple(row) for row in db.session.execute(
+                db.select(OrderDetail.order_id, OrderDetail.product_id)
+                .join(OrderRequest, OrderRequest.id == OrderDetail.order_id)
+                .join(ResellerStock, (ResellerStock.reseller_id == OrderRequest.reseller_id)
+                      & (ResellerStock.product_id == OrderDetail.product_id))
+                .where(OrderRequest.reseller_id == reseller_id, OrderRequest.status == 'delivered',
+                       ResellerStock.quantity > 0)
+                .limit(50))]
+        shipping_ids = list(db.session.scalars(db.select(ShippingInfo.id).limit(5000)))
+        return_ids = list(db.session.scalars(db.select(ReturnRequest.id).limit(5000)))
+
+        tokens = {r: create_access_token(identity=str(r), additional_claims={'role': 'reseller'}) for r in active}
+        admin_token = create_access_token(identity='1', additional_claims={'role': 'admin'})
+
+    return Fixtures(products, active, orders_by_reseller, shipping_ids, delivered_shipping,
+                    return_ids, returnable, tokens, admin_token)
+
+
+def check_coverage(app):
+    from .scenarios import SCENARIOS
+    covered = {(rule, method) for _, _, method, rule, _ in SCENARIOS}
+    missing = []
+    for rule in app.url_map.iter_rules():
+        if not rule.endpoint.startswith(('admin.', 'reseller.')):
+            continue
+        for method in rule.methods - {'HEAD', 'OPTIONS'}:
+            if (rule.rule, method) not in covered:
+                missing.append(f'{method} {rule.rule}')
+    return sorted(missing)
+
+
+class Recorder:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.samples = {}
+
+    def add(self, name, latency_ms, status, queries):
+        with self.lock:
+            entry = self.samples.setdefault(name, {'latency': [], 'statuses': {}, 'queries': []})
+            entry['latency'].append(latency_ms)
+            entry['statuses'][status] = entry['statuses'].get(status, 0) + 1
+            if queries is not None:
+                entry['queries'].append(queries)
+
+
+def percentiles(samples):
+    if not samples:
+        return {'p50': None, 'p95': None, 'p99': None, 'mean': None, 'max': None}
+    if len(samples) == 1:
+        cuts = [samples[0]] * 99
+    else:
+        cuts = statistics.quantiles(samples, n=100, method='inclusive')
+    return {'p50': round(cuts[49], 2), 'p95': round(cuts[94], 2), 'p99': round(cuts[98], 2),
+            'mean': round(statistics.fmean(samples), 2), 'max': round(max(samples), 2)}
+
+
+def http_worker(port, fx, names, weights, stop, recorder, seed):
+    from .scenarios import SCENARIOS
+    table = {name: (role, method, builder) for name, role, method, _, builder in SCENARIOS}
+    rng = random.Random(seed)
+    reseller_id = fx.resellers[seed % len(fx.resellers)]
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=120)
+
+    while not stop.is_set():
+        name = rng.choices(names, weights)[0]
+        role, method, builder = table[name]
+        request = builder(fx, rng, reseller_id)
+        if request is None:
+            continue
+        path, body = request
+        headers = {'Content-Type': 'application/json'}
+        if role == 'admin':
+            headers['Authorization'] = f'Bearer {fx.admin_token}'
+        elif role == 'reseller':
+            headers['Authorization'] = f'Bearer {fx.tokens[reseller_id]}'
+
+        start = time.perf_counter()
+        try:
+            conn.request(method, path, body=json.dumps(body) if body is not None else None, headers=headers)
+            response = conn.getresponse()
+            payload = response.read()
+            status = response.status
+            timing = response.getheader('Server-Timing') or ''
+        except (OSError, http.client.HTTPException):
+            conn.close()
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=120)
+            recorder.add(name, (time.perf_counter() - start) * 1000, 'connection_error', None)
+            continue
+        elapsed = (time.perf_counter() - start) * 1000
+        match = QUERIES_RE.search(timing)
+        recorder.add(name, elapsed, status, int(match.group(1)) if match else None)
+
+        if name == 'admin_product_create' and status == 201:
+            with fx.lock:
+                fx.created_products.append(json.loads(payload)['id'])
+        if name == 'admin_order_update' and status == 200:
+            fx.changed_at[int(path.rsplit('/', 1)[1])] = time.perf_counter()
+    conn.close()
+
+
+def socket_worker(port, fx, order_id, reseller_id, stop, recorder):
+    from .sio_client import PollingClient
+    client = PollingClient('127.0.0.1', port, '/reseller')
+    start = time.perf_counter()
+    try:
+        client.connect({'token': fx.tokens[reseller_id]})
+        recorder.add('socket_connect', (time.perf_counter() - start) * 1000, 'ok', None)
+
+        start = time.perf_counter()
+        client.emit('track_order', {'order_id': order_id})
+        snapshot = False
+        while not snapshot and not stop.is_set():
+            snapshot = any(event == 'order_snapshot' for event, _ in client.receive())
+        recorder.add('socket_track_order', (time.perf_counter() - start) * 1000, 'ok', None)
+
+        # Latency commit -> order_delta diterima client (lewat outbox dispatcher)
+        while not stop.is_set():
+            for event, data in client.receive():
+                if event == 'order_delta' and data.get('order_id') in fx.changed_at:
+                    changed = fx.changed_at.pop(data['order_id'], None)
+                    if changed:
+                        recorder.add('socket_order_delta', (time.perf_counter() - changed) * 1000, 'ok', None)
+    except (OSError, ConnectionError, http.client.HTTPException, ValueError) as e:
+        if not stop.is_set():
+            recorder.add('socket_connect', (time.perf_counter() - start) * 1000, f'error: {e}'[:80], None)
+    finally:
+        client.close()
+
+
+def wait_for_port(port, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+            conn.request('GET', '/metrics')
+            conn.getresponse().read()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f'server on port {port} did not start')
+
+
+def run_load(args, fx):
+    from .scenarios import weights
+    mix = weights(args.mix)
+    names = list(mix)
+    recorder = Recorder()
+    stop = threading.Event()
+
+    # Client socket: tiap client men-track satu order milik reseller-nya
+    socket_threads = []
+    for i in range(args.socket_clients):
+        reseller_id = fx.resellers[i % len(fx.resellers)]
+        orders = fx.orders_by_reseller.get(reseller_id)
+        if not orders:
+            continue
+        fx.tracked_orders.append(orders[0])
+        socket_threads.append(threading.Thread(
+            target=socket_worker, args=(args.port, fx, orders[0], reseller_id, stop, recorder), daemon=True))
+    for thread in socket_threads:
+        thread.start()
+
+    workers = [threading.Thread(target=http_worker,
+                                args=(args.port, fx, names, [mix[n] for n in names], stop, recorder, args.seed + i))
+               for i in range(args.concurrency)]
+    for worker in workers:
+        worker.start()
+
+    if args.warmup:
+        time.sleep(args.warmup)
+        with recorder.lock:
+            recorder.samples = {k: v for k, v in recorder.samples.items() if k.startswith('socket_')}
+    start = time.perf_counter()
+    time.sleep(args.duration)
+    stop.set()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - start
+    return recorder.samples, elapsed
+
+
+def summarize(samples, elapsed):
+    scenarios = {}
+    for name, entry in sorted(samples.items()):
+        count = len(entry['latency'])
+        errors = sum(n for status, n in entry['statuses'].items()
+                     if not isinstance(status, int) and status != 'ok' or isinstance(status, int) and status >= 500)
+        scenarios[name] = {
+            'count': count,
+            'rps': round(count / elapsed, 2),
+            'errors': errors,
+            'statuses': {str(k): v for k, v in sorted(entry['statuses'].items(), key=lambda kv: str(kv[0]))},
+            'latency_ms': percentiles(entry['latency']),
+            'queries_per_request': round(statistics.fmean(entry['queries']), 2) if entry['queries'] else None,
+            'max_queries': max(entry['queries']) if entry['queries'] else None,
+        }
+    http_latency = [l for name, e in samples.items() if not name.startswith('socket_') for l in e['latency']]
+    total = sum(s['count'] for name, s in scenarios.items() if not name.startswith('socket_'))
+    return scenarios, {
+        'requests': total,
+        'rps': round(total / elapsed, 2),
+        'errors': sum(s['errors'] for name, s in scenarios.items() if not name.startswith('socket_')),
+        'latency_ms': percentiles(http_latency),
+    }
+
+
+def print_report(result):
+    print(f'\n{"scenario":<28}{"count":>7}{"rps":>8}{"err":>5}{"p50":>9}{"p95":>9}{"p99":>9}{"q/req":>7}')
+    for name, s in result['scenarios'].items():
+        lat = s['latency_ms']
+        fmt = lambda v: f'{v:9.1f}' if v is not None else f'{"-":>9}'
+        qpr = f'{s["queries_per_request"]:7.1f}' if s['queries_per_request'] is not None else f'{"-":>7}'
+        print(f'{name:<28}{s["count"]:>7}{s["rps"]:>8.1f}{s["errors"]:>5}'
+              f'{fmt(lat["p50"])}{fmt(lat["p95"])}{fmt(lat["p99"])}{qpr}')
+    t = result['totals']
+    print(f'\ntotal: {t["requests"]} requests, {t["rps"]} req/s, {t["errors"]} errors, '
+          f'p50={t["latency_ms"]["p50"]} p95={t["latency_ms"]["p95"]} p99={t["latency_ms"]["p99"]} ms')
+    if result['uncovered_routes']:
+        print(f'routes without a scenario: {", ".join(result["uncovered_routes"])}')
+
+
+def compare(result, baseline, tolerance):
+    """Bandingkan dengan run sebelumnya; mengembalikan daftar regresi."""
+    regressions = []
+    print(f'\n{"scenario":<28}{"base p95":>10}{"p95":>10}{"change":>9}{"base q":>8}{"q":>8}')
+    for name, current in result['scenarios'].items():
+        base = baseline['scenarios'].get(name)
+        if not base or not base['latency_ms']['p95'] or not current['latency_ms']['p95']:
+            continue
+        p95, base_p95 = current['latency_ms']['p95'], base['latency_ms']['p95']
+        change = (p95 - base_p95) / base_p95
+        q, base_q = current['queries_per_request'], base['queries_per_request']
+        flags = []
+        # Selisih absolut kecil (< 2 ms) dianggap noise
+        if change > tolerance and p95 - base_p95 > 2:
+            flags.append('p95')
+        if q is not None and base_q is not None and q > base_q + 0.5:
+            flags.append('queries')
+        if current['errors'] > base['errors']:
+            flags.append('errors')
+        if flags:
+            regressions.append((name, flags))
+        print(f'{name:<28}{base_p95:>10.1f}{p95:>10.1f}{change:>+9.0%}'
+              f'{base_q if base_q is not None else "-":>8}{q if q is not None else "-":>8}'
+              f'  {"REGRESSION: " + ", ".join(flags) if flags else ""}')
+    return regressions
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    if len(sys.argv) == 3 and sys.argv[1] == '--serve':
+        serve(int(sys.argv[2]))
+        return
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--scale', choices=SCALES, default='small')
+    parser.add_argument('--products', type=int)
+    parser.add_argument('--resellers', type=int)
+    parser.add_argument('--orders', type=int)
+    parser.add_argument('--returns', type=int)
+    parser.add_argument('--database', default=os.getenv('BENCHMARK_DATABASE_URL', DEFAULT_SQLITE))
+    parser.add_argument('--reuse-db', action='store_true', help='pakai data seed yang sudah ada')
+    parser.add_argument('--mix', choices=['mixed', 'reseller', 'admin', 'full'], default='mixed')
+    parser.add_argument('--duration', type=float, default=30)
+    parser.add_argument('--warmup', type=float, default=3)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--socket-clients', type=int, default=20)
+    parser.add_argument('--port', type=int, default=5098)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--out', help='file JSON hasil run (default benchmarks/results/<waktu>-<mix>.json)')
+    parser.add_argument('--compare', help='file JSON run sebelumnya')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='kenaikan p95 yang masih diterima')
+    args = parser.parse_args()
+    for key, value in SCALES[args.scale].items():
+        if getattr(args, key) is None:
+            setattr(args, key, value)
+
+    app = prepare_database(args)
+    fx = load_fixtures(app, args)
+    uncovered = check_coverage(app)
+
+    env = {**os.environ, 'DATABASE_URL': args.database, 'REDIS_URL': os.getenv('REDIS_URL', ''),
+           'INSTRUMENTATION': '1', 'LOGIN_RATE_LIMIT_IP': '1000000', 'LOGIN_RATE_LIMIT_ACCOUNT': '1000000'}
+    server = subprocess.Popen([sys.executable, '-m', 'benchmarks.harness', '--serve', str(args.port)],
+                              env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_for_port(args.port)
+        samples, elapsed = run_load(args, fx)
+    finally:
+        server.terminate()
+        server.wait()
+
+    scenarios, totals = summarize(samples, elapsed)
+    result = {
+        'meta': {
+            'timestamp': datetime.utcnow().isoformat(timespec='seconds'),
+            'git_revision': git_revision(),
+            'python': platform.python_version(),
+            'database': args.database.split('://', 1)[0],
+            'scale': {k: getattr(args, k) for k in ('products', 'resellers', 'orders', 'returns')},
+            'mix': args.mix,
+            'duration': round(elapsed, 2),
+            'concurrency': args.concurrency,
+            'socket_clients': args.socket_clients,
+        },
+        'totals': totals,
+        'scenarios': scenarios,
+        'uncovered_routes': uncovered,
+    }
+    print_report(result)
+
+    out = args.out or os.path.join(os.path.dirname(__file__), 'results',
+                                   f'{datetime.utcnow():%Y%m%dT%H%M%S}-{args.mix}.json')
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, 'w') as f:
+        json.dump(result, f, indent=2)
+    print(f'results written to {out}')
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(result, json.load(f), args.tolerance)
+        if regressions:
+            print(f'\n{len(regressions)} regression(s)')
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
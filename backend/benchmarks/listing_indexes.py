@@ -0,0 +1,66 @@
+"""Seed ~1M order lalu tampilkan query plan + waktu query listing utama.
+
+    python -m benchmarks.listing_indexes --orders 1000000
+
+Gagal (AssertionError) kalau ada listing yang masih full scan.
+"""
+import argparse
+import time
+from sqlalchemy import text
+from .common import make_app
+from .seed import seed
+from app.models import db, OrderRequest, OrderDetail, ResellerStock, Stock, ShippingInfo, ReturnRequest
+
+LISTINGS = {
+    'reseller orders': lambda: OrderRequest.query.filter_by(reseller_id=3, status='delivered'),
+    'admin orders by status': lambda: OrderRequest.query.filter_by(status='pending').limit(10),
+    'order details': lambda: OrderDetail.query.filter_by(order_id=4242),
+    'details by product': lambda: OrderDetail.query.filter_by(product_id=7).limit(10),
+    'reseller stock': lambda: ResellerStock.query.filter_by(reseller_id=3, product_id=7),
+    'warehouse stock': lambda: Stock.query.filter_by(product_id=7),
+    'reseller shipping': lambda: ShippingInfo.query.filter_by(reseller_id=3).limit(10),
+    'shipping by status': lambda: ShippingInfo.query.filter_by(status='in_transit').limit(10),
+    'reseller returns': lambda: ReturnRequest.query.filter_by(reseller_id=3, status='pending'),
+}
+
+
+def explain(query):
+    statement = query.statement.compile(db.engine, compile_kwargs={'literal_binds': True})
+    if db.engine.dialect.name == 'sqlite':
+        rows = db.session.execute(text(f'EXPLAIN QUERY PLAN {statement}')).all()
+        steps = [row[-1] for row in rows]
+        return ' | '.join(steps), all(step.startswith('SEARCH') or 'INDEX' in step for step in steps)
+    rows = db.session.execute(text(f'EXPLAIN {statement}')).mappings().all()
+    plan = ' | '.join(f"{row['table']}:{row['type']}:{row['key']}" for row in rows)
+    return plan, all(row['key'] for row in rows)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--orders', type=int, default=1_000_000)
+    parser.add_argument('--resellers', type=int, default=500)
+    parser.add_argument('--products', type=int, default=2000)
+    args = parser.parse_args()
+
+    app = make_app()
+    with app.app_context():
+        start = time.perf_counter()
+        seed(resellers=args.resellers, products=args.products, orders=args.orders, lines_per_order=2)
+        print(f'seeded {args.orders} orders in {time.perf_counter() - start:.1f}s')
+
+        full_scans = []
+        for name, build in LISTINGS.items():
+            query = build()
+            plan, indexed = explain(query)
+            start = time.perf_counter()
+            query.all()
+            elapsed = (time.perf_counter() - start) * 1000
+            print(f'{name:<24} {elapsed:8.2f} ms  {"index" if indexed else "FULL SCAN":<9}  {plan}')
+            if not indexed:
+                full_scans.append(name)
+
+        assert not full_scans, f'full table scans: {full_scans}'
+
+
+if __name__ == '__main__':
+    main()
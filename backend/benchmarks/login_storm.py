@@ -0,0 +1,121 @@
+"""Latensi handshake Socket.IO selama badai login, dengan dan tanpa offload hash password.
+
+    python -m benchmarks.login_storm --threads 8 --seconds 5
+
+Server dijalankan sebagai subprocess eventlet (socketio.run), sekali dengan
+PASSWORD_HASH_OFFLOAD=0 dan sekali dengan PASSWORD_HASH_OFFLOAD=1.
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+import urllib.error
+
+
+def serve(port):
+    import eventlet
+    eventlet.monkey_patch()
+    from .common import make_app
+    from .seed import seed
+    from app import socketio
+
+    app = make_app()
+    with app.app_context():
+        seed(resellers=1, products=1, orders=0)
+    socketio.run(app, port=port, debug=False, use_reloader=False, log_output=False)
+
+
+def wait_for_port(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.5).close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f'server on port {port} did not start')
+
+
+def probe(base_url, stop, samples):
+    # Handshake polling Engine.IO dilayani event loop yang sama dengan traffic socket
+    while not stop.is_set():
+        start = time.perf_counter()
+        urllib.request.urlopen(f'{base_url}/socket.io/?EIO=4&transport=polling', timeout=30).read()
+        samples.append((time.perf_counter() - start) * 1000)
+        time.sleep(0.02)
+
+
+def login_storm(base_url, stop, counter):
+    body = json.dumps({'email': 'admin@example.com', 'password': 'secret'}).encode()
+    while not stop.is_set():
+        req = urllib.request.Request(f'{base_url}/api/admin/login', data=body,
+                                     headers={'Content-Type': 'application/json'})
+        try:
+            urllib.request.urlopen(req, timeout=60).read()
+            counter.append(1)
+        except urllib.error.HTTPError:
+            pass
+
+
+def measure(base_url, threads, seconds):
+    samples, logins = [], []
+    stop = threading.Event()
+    workers = [threading.Thread(target=probe, args=(base_url, stop, samples))]
+    workers += [threading.Thread(target=login_storm, args=(base_url, stop, logins)) for _ in range(threads)]
+    for w in workers:
+        w.start()
+    time.sleep(seconds)
+    stop.set()
+    for w in workers:
+        w.join()
+    return samples, len(logins)
+
+
+def percentile(samples, p):
+    return statistics.quantiles(samples, n=100, method='inclusive')[p - 1] if len(samples) > 1 else samples[0]
+
+
+def run(offload, args):
+    port = args.port
+    env = {**os.environ, 'PASSWORD_HASH_OFFLOAD': '1' if offload else '0',
+           'LOGIN_RATE_LIMIT_IP': '1000000', 'LOGIN_RATE_LIMIT_ACCOUNT': '1000000'}
+    server = subprocess.Popen([sys.executable, '-m', 'benchmarks.login_storm', '--serve', str(port)],
+                              env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_for_port(port)
+        base_url = f'http://127.0.0.1:{port}'
+        idle, _ = measure(base_url, 0, 1)
+        storm, logins = measure(base_url, args.threads, args.seconds)
+    finally:
+        server.terminate()
+        server.wait()
+
+    print(f'offload={"on " if offload else "off"} logins={logins:<4} '
+          f'idle p50={percentile(idle, 50):6.1f}ms  '
+          f'storm p50={percentile(storm, 50):7.1f}ms p95={percentile(storm, 95):7.1f}ms '
+          f'max={max(storm):7.1f}ms samples={len(storm)}')
+
+
+def main():
+    if len(sys.argv) == 3 and sys.argv[1] == '--serve':
+        serve(int(sys.argv[2]))
+        return
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--port', type=int, default=5099)
+    args = parser.parse_args()
+
+    for offload in (False, True):
+        run(offload, args)
+
+
+if __name__ == '__main__':
+    main()
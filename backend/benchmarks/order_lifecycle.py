@@ -0,0 +1,136 @@
+"""Transisi status order: PUT per order vs POST /api/admin/orders/bulk-status.
+
+    python -m benchmarks.order_lifecycle --orders 300
+
+Order pending dibagi dua: separuh di-approve/reject satu per satu lewat PUT, separuh
+lewat bulk-status. Di akhir dicek:
+- reject mengembalikan stok gudang tersedia tepat sekali (juga saat bulk diulang), approve membuat shipping
+- transisi yang tidak valid ditolak (409) dan tidak mengubah apa pun
+- shipment delivered divalidasi reseller -> order completed (validasi ulang tidak mengubah apa-apa)
+- counter analytics sama dengan rebuild, ledger tanpa drift
+"""
+import argparse
+import time
+from .common import make_app, auth_headers, count_queries
+from .seed import seed
+from app.analytics import rebuild
+from app.ledger import reconcile
+from app import reservations
+from app.models import db, AnalyticsCounter, OrderRequest, OrderDetail, ShippingInfo, Stock
+
+
+def _counters():
+    # Counter global tersebar di beberapa shard
+    totals = {}
+    for c in AnalyticsCounter.query.all():
+        totals[(c.metric, c.bucket)] = totals.get((c.metric, c.bucket), 0) + c.value
+    return {k: v for k, v in totals.items() if v}
+
+
+def _place(client, resellers, n):
+    ids = []
+    for i in range(n):
+        response = client.post('/api/reseller/orders', headers=resellers[i % len(resellers)], json={
+            'products': [{'product_id': 1 + (i * 7 + k) % 50, 'quantity': 1 + k} for k in range(3)]})
+        assert response.status_code == 201, response.get_data(as_text=True)[:200]
+        ids.append(response.get_json()['id'])
+    return ids
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--orders', type=int, default=300, help='order per cara (PUT dan bulk)')
+    args = parser.parse_args()
+
+    app = make_app()
+    client = app.test_client()
+    with app.app_context():
+        seed(resellers=10, products=50, orders=1000, stock_range=(10000, 20000))
+        rebuild()
+        admin = auth_headers(1, 'admin')
+        resellers = [auth_headers(r, 'reseller') for r in range(1, 11)]
+        single = _place(client, resellers, args.orders)
+        bulk = _place(client, resellers, args.orders)
+        reject = set(single[::2]) | set(bulk[::2])
+        released = dict(db.session.execute(
+            db.select(OrderDetail.product_id, db.func.sum(OrderDetail.quantity))
+            .where(OrderDetail.order_id.in_(reject)).group_by(OrderDetail.product_id)).all())
+        before = dict(db.session.execute(db.select(Stock.product_id, Stock.quantity - Stock.reserved)).all())
+
+        with count_queries() as counter:
+            start = time.perf_counter()
+            for order_id in single:
+                status = 'rejected' if order_id in reject else 'approved'
+                response = client.put(f'/api/admin/orders/{order_id}', json={'status': status}, headers=admin)
+                assert response.status_code == 200, response.get_data(as_text=True)[:200]
+            single_ms = (time.perf_counter() - start) * 1000
+        single_queries = counter.count
+
+        with count_queries() as counter:
+            start = time.perf_counter()
+            for status in ('rejected', 'approved'):
+                ids = [o for o in bulk if (o in reject) == (status == 'rejected')]
+                summary = client.post('/api/admin/orders/bulk-status', headers=admin,
+                                      json={'order_ids': ids, 'status': status}).get_json()
+                assert summary['failed'] == 0, summary['results'][:3]
+            bulk_ms = (time.perf_counter() - start) * 1000
+        bulk_queries = counter.count
+
+        print(f'{"mode":<12} {"orders":>7} {"ms":>9} {"queries":>8}')
+        print(f'{"PUT each":<12} {len(single):>7} {single_ms:>9.1f} {single_queries:>8}')
+        print(f'{"bulk-status":<12} {len(bulk):>7} {bulk_ms:>9.1f} {bulk_queries:>8}')
+
+        # Diulang: tidak ada yang berubah, stok tidak dilepas dua kali
+        again = client.post('/api/admin/orders/bulk-status', headers=admin,
+                            json={'order_ids': sorted(reject), 'status': 'rejected'}).get_json()
+        assert {r['status'] for r in again['results']} == {'unchanged'}, again['results'][:3]
+        invalid = [
+            client.put(f'/api/admin/orders/{single[0]}', json={'status': 'approved'}, headers=admin).status_code,
+            client.put(f'/api/admin/orders/{single[1]}', json={'status': 'delivered'}, headers=admin).status_code,
+            client.put(f'/api/admin/orders/{single[1]}', json={'status': 'bogus'}, headers=admin).status_code,
+        ]
+        assert invalid == [409, 409, 400], invalid
+        mixed = client.post('/api/admin/orders/bulk-status', headers=admin,
+                            json={'order_ids': [single[0], 10 ** 9], 'status': 'approved'}).get_json()
+        assert mixed['failed'] == 2, mixed
+
+        # Admin menandai shipment delivered, reseller pemilik memvalidasi -> completed
+        done = db.session.get(OrderRequest, single[3])
+        shipping = ShippingInfo.query.filter_by(order_id=done.id).one()
+        owner = auth_headers(done.reseller_id, 'reseller')
+        for status in ('shipped', 'delivered'):
+            response = client.put('/api/admin/shipping', headers=admin,
+                                  json={'shipping_id': shipping.id, 'status': status})
+            assert response.status_code == 200, response.get_data(as_text=True)[:200]
+        validated = [client.put(f'/api/reseller/shipping/{shipping.id}/validate', headers=owner).status_code
+                     for _ in range(2)]
+        assert validated == [200, 200], validated
+        assert client.get('/api/reseller/shipping', headers=owner).status_code == 200
+
+        db.session.expire_all()
+        after = dict(db.session.execute(db.select(Stock.product_id, Stock.quantity - Stock.reserved)).all())
+        wrong = {p: (after[p], before[p] + released.get(p, 0)) for p in before
+                 if after[p] != before[p] + released.get(p, 0)}
+        approved = [o for o in single + bulk if o not in reject]
+        shipments = db.session.scalar(db.select(db.func.count(ShippingInfo.id))
+                                      .where(ShippingInfo.order_id.in_(approved)))
+        statuses = dict(db.session.execute(
+            db.select(OrderRequest.status, db.func.count(OrderRequest.id))
+            .where(OrderRequest.id.in_(single + bulk)).group_by(OrderRequest.status)).all())
+        incremental = _counters()
+        rebuild()
+        drift = {k for k in set(incremental) | set(_counters())
+                 if abs((incremental.get(k) or 0) - (_counters().get(k) or 0)) > 1e-6}
+        ledger_drift = reconcile(fix=False) + reservations.reconcile(fix=False)
+
+    print(f'statuses: {statuses}, shipments created: {shipments}/{len(approved)}')
+    print(f'wrong warehouse balances: {len(wrong)}, counter drift: {len(drift)}, ledger drift: {len(ledger_drift)}')
+    assert not wrong, list(wrong.items())[:5]
+    assert shipments == len(approved)
+    assert statuses == {'approved': len(approved) - 1, 'completed': 1, 'rejected': len(reject)}
+    assert not drift, sorted(drift)[:10]
+    assert not ledger_drift
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+"""Jumlah query per halaman order_management harus konstan, berapa pun isi halamannya.
+
+    python -m benchmarks.order_listing_queries
+
+Juga dijalankan sebagai test (tests/test_query_counts.py), jadi regresi eager load gagal di pytest.
+"""
+from .common import make_app, auth_headers, count_queries
+from .seed import seed
+from app import db
+
+# Count + halaman + selectinload order_details dan shipping
+MAX_QUERIES = 4
+
+
+def measure(orders=500, limits=(1, 10, 100)):
+    """Kembalikan {limit: (jumlah baris, jumlah query)} untuk GET /api/admin/orders."""
+    app = make_app()
+    with app.app_context():
+        admin_id = seed(orders=orders)
+        headers = auth_headers(admin_id, 'admin')
+
+    client = app.test_client()
+    counts = {}
+    for limit in limits:
+        with app.app_context(), count_queries(db.engine) as counter:
+            response = client.get(f'/api/admin/orders?status=delivered&limit={limit}', headers=headers)
+        assert response.status_code == 200, response.get_data(as_text=True)
+        counts[limit] = (len(response.get_json()['data']), counter.count)
+    return counts
+
+
+def check(counts):
+    queries = {limit: count for limit, (_, count) in counts.items()}
+    assert len(set(queries.values())) == 1, f'query count depends on page size: {queries}'
+    assert max(queries.values()) <= MAX_QUERIES, f'more than {MAX_QUERIES} queries per page: {queries}'
+
+
+def main():
+    counts = measure()
+    for limit, (rows, queries) in counts.items():
+        print(f'limit={limit:<4} rows={rows:<4} queries={queries}')
+    check(counts)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""Latency request dengan message queue lambat/putus, plus retry dan lag dispatcher outbox.
+
+    python -m benchmarks.outbox_dispatch --requests 200 --publish-delay 0.05
+
+Publish ke message queue diperlambat dengan membungkus manager Socket.IO, jadi yang
+diukur adalah apakah latency itu masih bocor ke response HTTP.
+"""
+import argparse
+import statistics
+import time
+from .common import make_app, auth_headers
+from .seed import seed
+from app import socketio
+from app.models import db, OutboxEvent, OrderRequest
+from app.outbox import dispatch_batch, outbox_metrics
+from app.realtime import notify_admins
+
+
+class FlakyQueue:
+    def __init__(self, emit, delay):
+        self.emit = emit
+        self.delay = delay
+        self.failures = 0
+        self.calls = 0
+
+    def __call__(self, *args, **kwargs):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError('message queue down')
+        return self.emit(*args, **kwargs)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--publish-delay', type=float, default=0.05)
+    parser.add_argument('--failures', type=int, default=5)
+    args = parser.parse_args()
+
+    app = make_app()
+    app.config['OUTBOX_RETRY_BASE'] = 0.01
+    client = app.test_client()
+    with app.app_context():
+        seed(resellers=10, products=20, orders=args.requests * 10)
+        headers = auth_headers(1, 'admin')
+        # Hanya order pending yang boleh di-approve/reject
+        order_ids = [o.id for o in OrderRequest.query.filter_by(status='pending')
+                     .order_by(OrderRequest.id).limit(args.requests)]
+
+    queue = FlakyQueue(socketio.server.manager.emit, args.publish_delay)
+    socketio.server.manager.emit = queue
+
+    latencies = []
+    for i, order_id in enumerate(order_ids):
+        status = 'approved' if i % 2 else 'rejected'
+        start = time.perf_counter()
+        response = client.put(f'/api/admin/orders/{order_id}', json={'status': status}, headers=headers)
+        latencies.append((time.perf_counter() - start) * 1000)
+        assert response.status_code == 200, response.get_data(as_text=True)
+    print(f'PUT /orders p50={statistics.median(latencies):.1f} ms  '
+          f'(inline emit would add ~{3 * args.publish_delay * 1000:.0f} ms: 3 events x publish delay)')
+    assert queue.calls == 0, 'request path published directly'
+
+    with app.app_context():
+        # Rollback: event ikut dibatalkan, tidak pernah terpublish
+        before = OutboxEvent.query.count()
+        notify_admins('new_order', {'order_id': -1})
+        db.session.rollback()
+        assert OutboxEvent.query.count() == before, 'rolled back event was kept'
+
+        queue.failures = args.failures
+        start = time.perf_counter()
+        deadline = start + 60
+        while OutboxEvent.query.filter(OutboxEvent.published_at.is_(None)).count() and time.perf_counter() < deadline:
+            if not dispatch_batch():
+                time.sleep(0.01)
+        elapsed = time.perf_counter() - start
+
+        metrics = outbox_metrics()
+        print(f'dispatched {metrics["published_total"]} events in {elapsed:.1f}s, '
+              f'failed attempts={metrics["failed_total"]} pending={metrics["pending"]} '
+              f'dead={metrics["dead_letter"]} lag={metrics["lag_seconds"]:.2f}s')
+        print(f'publish latency (commit -> queue): {metrics["publish_latency_ms"]}')
+        assert metrics['pending'] == 0 and metrics['dead_letter'] == 0, 'events lost or stuck'
+        assert metrics['published_total'] == before, 'not every event was published'
+
+
+if __name__ == '__main__':
+    main()
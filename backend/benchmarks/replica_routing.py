@@ -0,0 +1,109 @@
+"""Routing query ke read replica dan statistik pool, dengan dua file SQLite sebagai primary/replica.
+
+    python -m benchmarks.replica_routing --orders 20000
+
+GET listing harus dilayani replica sepenuhnya, request tulis dan endpoint di
+READ_REPLICA_EXCLUDE tetap ke primary. Snapshot yang di-cache per versi (katalog, halaman
+stok reseller) dibangun dari primary: replica di sini tidak pernah menerima write, jadi
+rebuild setelah versi naik yang membaca replica akan meng-cache data lama.
+"""
+import argparse
+import os
+import shutil
+
+PRIMARY = '/tmp/wps_primary.db'
+REPLICA = '/tmp/wps_replica.db'
+os.environ['DATABASE_URL'] = f'sqlite:///{PRIMARY}'
+os.environ['REPLICA_DATABASE_URL'] = f'sqlite:///{REPLICA}'
+os.environ.setdefault('INSTRUMENTATION', '1')
+
+from .common import make_app, auth_headers, count_queries
+from .seed import seed
+from app import ledger
+from app.catalogue import invalidate_catalogue
+from app.models import db, OrderRequest, ResellerStock, Stock
+
+READS = [
+    ('admin', '/api/admin/orders?status=all&limit=50'),
+    ('admin', '/api/admin/orders?status=pending&cursor=&limit=50'),
+    ('admin', '/api/admin/shipping?status=all'),
+    ('admin', '/api/admin/returns'),
+    ('admin', '/api/admin/products?limit=50'),
+    ('admin', '/api/admin/stats'),
+    ('reseller', '/api/reseller/orders'),
+    ('reseller', '/api/reseller/returns/returnable-orders'),
+]
+SNAPSHOTS = [
+    ('reseller', '/api/reseller/products'),
+    ('reseller', '/api/reseller/stock'),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--orders', type=int, default=20000)
+    args = parser.parse_args()
+
+    for path in (PRIMARY, REPLICA):
+        if os.path.exists(path):
+            os.remove(path)
+
+    app = make_app()
+    with app.app_context():
+        seed(resellers=20, products=100, orders=args.orders, reseller_stock=True)
+        db.engines[None].dispose()
+        shutil.copyfile(PRIMARY, REPLICA)
+        headers = {'admin': auth_headers(1, 'admin'), 'reseller': auth_headers(1, 'reseller')}
+        primary, replica = db.engines[None], db.engines['replica']
+        pending_id = db.session.scalar(db.select(OrderRequest.id).where(OrderRequest.status == 'pending').limit(1))
+
+    client = app.test_client()
+    failures = []
+
+    def run(label, method, path, role, expect, **kwargs):
+        with app.app_context(), count_queries(primary) as on_primary, count_queries(replica) as on_replica:
+            response = client.open(path, method=method, headers=headers[role], **kwargs)
+        assert response.status_code < 400, f'{path}: {response.status_code} {response.get_data(as_text=True)[:200]}'
+        routed = 'replica' if on_replica.count and not on_primary.count else \
+            'primary' if on_primary.count and not on_replica.count else 'mixed'
+        print(f'{label:<7} {method:<4} {path:<50} primary={on_primary.count:<3} replica={on_replica.count:<3} {routed}')
+        if routed != expect:
+            failures.append(path)
+
+    for role, path in READS:
+        run('read', 'GET', path, role, 'replica')
+    for role, path in SNAPSHOTS:
+        run('build', 'GET', path, role, 'primary')
+    run('write', 'POST', '/api/reseller/orders', 'reseller', 'primary',
+        json={'products': [{'product_id': 1, 'quantity': 1}]})
+    run('write', 'PUT', f'/api/admin/orders/{pending_id}', 'admin', 'primary', json={'status': 'approved'})
+    run('exclude', 'GET', '/api/admin/outbox', 'admin', 'primary')
+
+    # Stok berubah di primary saja (replica tertinggal), versi naik: rebuild harus melihatnya
+    with app.app_context():
+        product_id, reseller_qty = db.session.execute(
+            db.select(ResellerStock.product_id, ResellerStock.quantity)
+            .where(ResellerStock.reseller_id == 1).order_by(ResellerStock.product_id).limit(1)).one()
+        ledger.move(product_id, 7, 'adjustment', reseller_id=1)
+        sold_out = db.session.scalar(db.select(Stock.product_id).where(Stock.quantity > Stock.reserved)
+                                     .order_by(Stock.product_id).limit(1))
+        ledger.set_levels({sold_out: db.session.get(Stock, sold_out).reserved}, 'adjustment')
+        db.session.commit()
+        invalidate_catalogue()
+    catalogue = client.get('/api/reseller/products', headers=headers['reseller']).get_json()
+    stock = client.get('/api/reseller/stock?limit=500', headers=headers['reseller']).get_json()
+    stale = [name for name, ok in (
+        ('catalogue', all(row['product']['id'] != sold_out for row in catalogue)),
+        ('reseller stock', any(row['product']['id'] == product_id and row['quantity'] == reseller_qty + 7
+                               for row in stock)),
+    ) if not ok]
+    print(f'rebuild after version bump: {"stale " + ", ".join(stale) if stale else "fresh"}')
+
+    metrics = client.get('/metrics').get_data(as_text=True)
+    print('\n'.join(line for line in metrics.splitlines() if line.startswith('db_pool_')))
+    assert not failures, f'wrongly routed: {failures}'
+    assert not stale, f'snapshot rebuilt from a stale replica: {stale}'
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+"""GET /api/reseller/stock: listing lama (lazy load produk per baris) vs halaman ber-cache.
+
+    python -m benchmarks.reseller_stock --products 2000
+
+Satu reseller memegang stok untuk semua produk. Dibandingkan jumlah query dan latensi
+listing lama, halaman pertama (cache dingin/hangat) dan filter low_stock. Lalu dicek:
+- perubahan stok lewat ledger langsung terlihat di halaman yang sudah ter-cache
+- mode delta (?since=) hanya mengembalikan baris yang berubah, dan paging-nya lengkap
+"""
+import argparse
+import statistics
+import time
+from datetime import datetime
+from .common import make_app, auth_headers, count_queries
+from .seed import seed
+from app import ledger
+from app.models import db, ResellerStock
+
+RESELLER = 1
+
+
+def _legacy():
+    stocks = ResellerStock.query.filter_by(reseller_id=RESELLER).all()
+    return [{'product': s.product.to_dict(), 'quantity': s.quantity} for s in stocks]
+
+
+def _measure(fn, repeat):
+    samples = []
+    with count_queries() as counter:
+        fn()
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), counter.count
+
+
+def _sync(client, headers, since, limit):
+    # Ikuti `next` sampai habis, seperti aplikasi mobile
+    rows, pages, params = {}, 0, {'since': since, 'limit': limit}
+    while True:
+        body = client.get('/api/reseller/stock', headers=headers, query_string=params).get_json()
+        pages += 1
+        rows.update({s['product']['id']: s['quantity'] for s in body['stocks']})
+        if body['watermark']:
+            return rows, pages, body['watermark']
+        params = {**body['next'], 'limit': limit}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--products', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    app = make_app()
+    client = app.test_client()
+    with app.app_context():
+        seed(resellers=5, products=args.products, orders=100)
+        db.session.execute(db.insert(ResellerStock), [
+            {'reseller_id': RESELLER, 'product_id': p, 'quantity': p % 20, 'last_updated': datetime.utcnow()}
+            for p in range(1, args.products + 1)
+        ])
+        db.session.commit()
+        headers = auth_headers(RESELLER, 'reseller')
+        get = lambda query: client.get(f'/api/reseller/stock{query}', headers=headers)
+
+        print(f'{"case":<28} {"ms":>8} {"queries":>8}')
+        for label, fn in [
+            ('legacy (all rows, N+1)', _legacy),
+            ('page 1, cold cache', lambda: (ledger.stock_changed(RESELLER), db.session.commit(), get('?limit=50'))),
+            ('page 1, cached', lambda: get('?limit=50')),
+            ('low_stock, cached', lambda: get('?low_stock=1&limit=50')),
+        ]:
+            ms, queries = _measure(fn, args.repeat)
+            print(f'{label:<28} {ms:>8.1f} {queries:>8}')
+
+        low = get('?low_stock=1&threshold=3&limit=500')
+        assert int(low.headers['X-Total-Count']) == sum(1 for p in range(1, args.products + 1) if p % 20 <= 3)
+        assert all(s['quantity'] <= 3 for s in low.get_json())
+        # Body tetap array; halaman berikutnya lewat header
+        first = get('?limit=50')
+        assert isinstance(first.get_json(), list) and first.headers['X-Next-Page'] == '2'
+        assert 'X-Next-Page' not in get(f'?limit=50&page={args.products // 50}').headers
+
+        # Cache diinvalidasi oleh perubahan stok lewat ledger (commit)
+        before = get('?limit=10').get_json()[0]
+        etag = get('?limit=10').headers['ETag']
+        assert get('?limit=10').status_code == 200
+        assert client.get('/api/reseller/stock?limit=10', headers={**headers, 'If-None-Match': etag}).status_code == 304
+        ledger.move(before['product']['id'], 7, 'delivery', reseller_id=RESELLER)
+        db.session.commit()
+        after = get('?limit=10').get_json()[0]
+        assert after['quantity'] == before['quantity'] + 7, 'cached page not invalidated'
+
+        # Produk yang diubah juga tidak tersaji dari cache lama
+        product_id = before['product']['id']
+        admin = auth_headers(1, 'admin')
+        client.put(f'/api/admin/products/{product_id}', headers=admin, json={'name': 'Renamed'})
+        assert get('?limit=10').get_json()[0]['product']['name'] == 'Renamed'
+
+        # Delta: sync penuh, ubah 120 baris, sync lagi dari watermark
+        full, pages, watermark = _sync(client, headers, '2000-01-01T00:00:00', 500)
+        assert len(full) == args.products, (len(full), args.products)
+        app.config['RESELLER_STOCK_DELTA_OVERLAP'] = 0
+        time.sleep(0.01)
+        changed = {p: 1 for p in range(1, args.products + 1, args.products // 120)}
+        ledger.move_many(changed, 'delivery', reseller_id=RESELLER)
+        db.session.commit()
+        start = time.perf_counter()
+        delta, delta_pages, _ = _sync(client, headers, watermark, 50)
+        elapsed = (time.perf_counter() - start) * 1000
+        expected = {pid: q for pid, q in db.session.execute(
+            db.select(ResellerStock.product_id, ResellerStock.quantity)
+            .where(ResellerStock.reseller_id == RESELLER, ResellerStock.product_id.in_(changed)))}
+        print(f'full sync: {len(full)} rows in {pages} pages; delta sync: {len(delta)} rows in '
+              f'{delta_pages} pages, {elapsed:.1f} ms')
+        assert delta == expected, 'delta sync missed or returned stale rows'
+        assert client.get('/api/reseller/stock?since=yesterday', headers=headers).status_code == 400
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+"""Reservasi stok: reserve saat order dibuat, commit saat approve, release saat reject/kedaluwarsa.
+
+    python -m benchmarks.reservations --orders 600 --products 200
+
+Order dibuat lewat POST /api/reseller/orders (reserve), lalu sepertiga di-approve dan
+sepertiga di-reject lewat bulk-status; sisanya dibiarkan kedaluwarsa dan di-reject oleh
+sweeper. Di akhir dicek:
+- stok gudang on-hand hanya turun untuk order approved, stok tersedia kembali untuk yang lain
+- reserved = SUM reservasi aktif (reconcile tanpa drift), ledger tanpa drift
+- stok yang ditahan tidak bisa dipesan atau dipotong lewat ledger
+"""
+import argparse
+import statistics
+import time
+from datetime import datetime, timedelta
+from .common import make_app, auth_headers, count_queries
+from .seed import seed
+from app import ledger, reservations
+from app.models import db, OrderRequest, OrderDetail, Stock, StockReservation
+
+
+def _stock():
+    return {pid: (quantity, reserved) for pid, quantity, reserved in db.session.execute(
+        db.select(Stock.product_id, Stock.quantity, Stock.reserved)).all()}
+
+
+def _ordered(order_ids):
+    return dict(db.session.execute(
+        db.select(OrderDetail.product_id, db.func.sum(OrderDetail.quantity))
+        .where(OrderDetail.order_id.in_(order_ids)).group_by(OrderDetail.product_id)).all())
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--orders', type=int, default=600)
+    parser.add_argument('--products', type=int, default=200)
+    args = parser.parse_args()
+
+    app = make_app()
+    client = app.test_client()
+    with app.app_context():
+        seed(resellers=10, products=args.products, orders=100, stock_range=(10000, 20000))
+        admin = auth_headers(1, 'admin')
+        resellers = [auth_headers(r, 'reseller') for r in range(1, 11)]
+        before = _stock()
+
+        samples, ids = [], []
+        with count_queries() as counter:
+            for i in range(args.orders):
+                start = time.perf_counter()
+                response = client.post('/api/reseller/orders', headers=resellers[i % 10], json={
+                    'products': [{'product_id': 1 + (i * 13 + k) % args.products, 'quantity': 1 + k}
+                                 for k in range(3)]})
+                samples.append((time.perf_counter() - start) * 1000)
+                assert response.status_code == 201, response.get_data(as_text=True)[:200]
+                ids.append(response.get_json()['id'])
+        reserve_queries = counter.count / args.orders
+        approve, reject, expire = ids[0::3], ids[1::3], ids[2::3]
+
+        timings = {}
+        for status, part in (('approved', approve), ('rejected', reject)):
+            start = time.perf_counter()
+            summary = client.post('/api/admin/orders/bulk-status', headers=admin,
+                                  json={'order_ids': part, 'status': status}).get_json()
+            timings[status] = (time.perf_counter() - start) * 1000
+            assert summary['failed'] == 0, summary['results'][:3]
+
+        # Sweeper: reservasi sisa dibuat kedaluwarsa, batch kecil supaya loop-nya teruji
+        db.session.execute(db.update(StockReservation).where(StockReservation.order_id.in_(expire))
+                           .values(expires_at=datetime.utcnow() - timedelta(seconds=1)))
+        db.session.commit()
+        start = time.perf_counter()
+        swept = reservations.sweep(batch_size=50)
+        timings['sweep'] = (time.perf_counter() - start) * 1000
+        assert reservations.sweep() == 0
+
+        print(f'reserve (POST order): p50={statistics.median(samples):.1f}ms '
+              f'p99={sorted(samples)[int(len(samples) * 0.99) - 1]:.1f}ms, {reserve_queries:.1f} queries/order')
+        for label, part in (('approved', approve), ('rejected', reject), ('sweep', expire)):
+            ms = timings[label]
+            print(f'{label + " (bulk)" if label != "sweep" else "sweep expired":<16} {len(part):>5} orders '
+                  f'{ms:>8.1f} ms ({len(part) / ms * 1000:.0f} orders/s)')
+
+        db.session.expire_all()
+        after = _stock()
+        sold = _ordered(approve)
+        wrong = {p: (after[p], before[p]) for p in before
+                 if after[p] != (before[p][0] - sold.get(p, 0), before[p][1])}
+        statuses = dict(db.session.execute(
+            db.select(OrderRequest.status, db.func.count(OrderRequest.id))
+            .where(OrderRequest.id.in_(ids)).group_by(OrderRequest.status)).all())
+        drift = reservations.reconcile(fix=False)
+        ledger_drift = ledger.reconcile(fix=False)
+
+        # Stok yang ditahan order pending tidak bisa dipakai order lain atau dipotong ledger
+        product_id = 1
+        quantity, reserved = after[product_id]
+        held = client.post('/api/reseller/orders', headers=resellers[0], json={
+            'products': [{'product_id': product_id, 'quantity': quantity - reserved}]}).get_json()['id']
+        blocked = client.post('/api/reseller/orders', headers=resellers[1], json={
+            'products': [{'product_id': product_id, 'quantity': 1}]}).status_code
+        try:
+            ledger.move(product_id, -1, 'adjustment')
+            overdrawn = True
+        except ledger.InsufficientStock:
+            overdrawn = False
+        db.session.rollback()
+        client.post('/api/admin/orders/bulk-status', headers=admin, json={'order_ids': [held], 'status': 'rejected'})
+        released = client.post('/api/reseller/orders', headers=resellers[1], json={
+            'products': [{'product_id': product_id, 'quantity': 1}]}).status_code
+
+    print(f'statuses: {statuses}, swept: {swept}')
+    print(f'wrong balances: {len(wrong)}, reserved drift: {len(drift)}, ledger drift: {len(ledger_drift)}')
+    print(f'held stock: order -> {blocked}, ledger overdraw -> {overdrawn}, after release -> {released}')
+    assert swept == len(expire)
+    assert statuses == {'approved': len(approve), 'rejected': len(reject) + len(expire)}, statuses
+    assert not wrong, list(wrong.items())[:5]
+    assert not drift and not ledger_drift
+    assert blocked == 400 and not overdrawn and released == 201
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+"""Budget query untuk /api/reseller/returns/returnable-orders, reseller dengan 5k order delivered.
+
+    python -m benchmarks.returnable_orders --orders 5000
+"""
+import argparse
+import time
+from .common import make_app, auth_headers, count_queries
+from .seed import seed
+from app.models import db, OrderRequest, ResellerStock
+
+QUERY_BUDGET = 1
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--orders', type=int, default=5000)
+    parser.add_argument('--products', type=int, default=200)
+    args = parser.parse_args()
+
+    app = make_app()
+    with app.app_context():
+        seed(resellers=1, products=args.products, orders=args.orders)
+        db.session.execute(db.update(OrderRequest).values(status='delivered'))
+        db.session.execute(db.insert(ResellerStock), [
+            {'reseller_id': 1, 'product_id': p, 'quantity': p % 4} for p in range(1, args.products + 1)
+        ])
+        db.session.commit()
+        headers = auth_headers(1, 'reseller')
+
+    client = app.test_client()
+    for query_string in ('limit=50', 'limit=200&page=3', 'limit=50&from=2020-01-01&to=2100-01-01'):
+        with app.app_context(), count_queries() as counter:
+            start = time.perf_counter()
+            response = client.get(f'/api/reseller/returns/returnable-orders?{query_string}', headers=headers)
+            elapsed = (time.perf_counter() - start) * 1000
+        assert response.status_code == 200, response.get_data(as_text=True)
+        print(f'{query_string:<40} orders={len(response.get_json()):<4} queries={counter.count} '
+              f'{elapsed:7.1f} ms next_page={response.headers.get("X-Next-Page")}')
+        assert counter.count <= QUERY_BUDGET, f'{counter.count} queries > budget {QUERY_BUDGET}'
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,228 @@
+"""Scale-out: throughput HTTP dan Socket.IO dengan 1, 2, 4 instance gunicorn/eventlet (serve.py).
+
+    REDIS_URL=redis://localhost:6379/0 python -m benchmarks.scale_out --instances 1 2 4
+
+Instance dijalankan dengan serve.start di atas satu database (default file SQLite sementara,
+set DATABASE_URL untuk MySQL). Client dibagi rata ke instance, sticky di sisi client seperti
+yang dilakukan load balancer; --proxy host:port untuk lewat deploy/haproxy.cfg. Per jumlah
+instance diukur:
+- HTTP: GET katalog dan daftar order dari --concurrency thread, req/s dan p50/p99
+- Socket.IO: satu client admin per instance dan client reseller tersebar; order di-approve
+  lewat PUT ke instance bergiliran, setiap client harus menerima event order_updated-nya
+  walaupun emit-nya terjadi di instance lain (lewat Redis)
+
+Load generator berjalan di proses ini (thread), jadi ikut berebut CPU dengan instance;
+scaling hanya terlihat kalau jumlah core > jumlah instance.
+"""
+import argparse
+import http.client
+import json
+import os
+import statistics
+import subprocess
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+if 'DATABASE_URL' not in os.environ:
+    os.environ['DATABASE_URL'] = f'sqlite:///{tempfile.mkdtemp()}/scale_out.db'
+REDIS_URL = os.getenv('REDIS_URL') or 'redis://localhost:6379/0'
+
+from flask_jwt_extended import create_access_token
+from .common import make_app
+from .seed import seed
+from .harness import wait_for_port
+from .sio_client import PollingClient
+from app.models import db, OrderRequest
+import serve
+
+
+def _token(user_id, role):
+    return create_access_token(identity=str(user_id), additional_claims={'role': role})
+
+
+def _request(conn, method, path, token, body=None):
+    headers = {'Authorization': f'Bearer {token}'}
+    if body is not None:
+        headers['Content-Type'] = 'application/json'
+        body = json.dumps(body)
+    conn.request(method, path, body=body, headers=headers)
+    response = conn.getresponse()
+    response.read()
+    return response.status
+
+
+def http_load(targets, tokens, concurrency, duration):
+    latencies, errors, lock = [], [], threading.Lock()
+    stop = time.monotonic() + duration
+
+    def worker(n):
+        host, port = targets[n % len(targets)]
+        reseller_id = list(tokens)[n % len(tokens)]
+        conn = http.client.HTTPConnection(host, port, timeout=30)
+        i = 0
+        while time.monotonic() < stop:
+            path = '/api/reseller/products' if i % 2 == 0 else '/api/reseller/orders'
+            start = time.perf_counter()
+            try:
+                status = _request(conn, 'GET', path, tokens[reseller_id])
+            except (OSError, http.client.HTTPException) as e:
+                status = str(e)
+                conn.close()
+                conn = http.client.HTTPConnection(host, port, timeout=30)
+            with lock:
+                latencies.append((time.perf_counter() - start) * 1000)
+                if status != 200:
+                    errors.append(status)
+            i += 1
+        conn.close()
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    latencies.sort()
+    return {'rps': len(latencies) / duration, 'p50': statistics.median(latencies),
+            'p99': latencies[int(len(latencies) * 0.99) - 1], 'errors': len(errors)}
+
+
+def listen(client, received, expected, done):
+    # Kumpulkan order_id dari event order_updated sampai semua yang diharapkan diterima
+    try:
+        while not done.is_set() and not expected <= received:
+            for event, data in client.receive():
+                if event in ('order_updated', 'orders_updated'):
+                    received.update(data.get('order_ids') or [data.get('order_id')])
+    except (OSError, ConnectionError, http.client.HTTPException):
+        pass
+
+
+def socket_fanout(targets, admin_token, tokens, orders, senders):
+    """Approve `orders` ({order_id: reseller_id}) dan ukur sampai semua client menerima event-nya."""
+    clients = []
+    for n, (host, port) in enumerate(targets):
+        clients.append((PollingClient(host, port, '/admin'), admin_token, set(orders)))
+    for n, reseller_id in enumerate(tokens):
+        host, port = targets[n % len(targets)]
+        mine = {o for o, r in orders.items() if r == reseller_id}
+        clients.append((PollingClient(host, port, '/reseller'), tokens[reseller_id], mine))
+
+    done = threading.Event()
+    listeners = []
+    for client, token, expected in clients:
+        client.connect({'token': token})
+        received = set()
+        thread = threading.Thread(target=listen, args=(client, received, expected, done), daemon=True)
+        listeners.append((thread, received, expected))
+    for thread, _, _ in listeners:
+        thread.start()
+    time.sleep(0.5)
+
+    # PUT dikirim bergiliran ke semua instance, jadi sebagian besar event diterima client
+    # yang terhubung ke instance lain
+    ids = sorted(orders)
+    statuses = []
+
+    def send(n):
+        host, port = targets[n % len(targets)]
+        conn = http.client.HTTPConnection(host, port, timeout=30)
+        for order_id in ids[n::senders]:
+            statuses.append(_request(conn, 'PUT', f'/api/admin/orders/{order_id}', admin_token,
+                                     {'status': 'approved'}))
+        conn.close()
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=send, args=(n,)) for n in range(senders)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    put_elapsed = time.perf_counter() - start
+    for thread, _, _ in listeners:
+        thread.join(timeout=max(60 - (time.perf_counter() - start), 1))
+    elapsed = time.perf_counter() - start
+    done.set()
+    for client, _, _ in clients:
+        client.close()
+
+    expected = sum(len(e) for _, _, e in listeners)
+    delivered = sum(len(r & e) for _, r, e in listeners)
+    return {'puts_per_s': len(ids) / put_elapsed, 'events_per_s': delivered / elapsed,
+            'delivered': delivered, 'expected': expected,
+            'admins_complete': sum(1 for _, r, e in listeners[:len(targets)] if e <= r),
+            'put_errors': sum(1 for s in statuses if s != 200)}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--instances', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--base-port', type=int, default=5101)
+    parser.add_argument('--proxy', help='host:port load balancer sticky (deploy/haproxy.cfg)')
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--resellers', type=int, default=20)
+    parser.add_argument('--events', type=int, default=200, help='order yang di-approve per putaran')
+    parser.add_argument('--senders', type=int, default=4)
+    args = parser.parse_args()
+
+    if not serve.redis_reachable(REDIS_URL):
+        raise SystemExit(f'Redis at {REDIS_URL} is required (set REDIS_URL)')
+    database_url = os.environ['DATABASE_URL']
+    app = make_app()
+    with app.app_context():
+        seed(resellers=args.resellers, products=200, orders=2000, stock_range=(10 ** 6, 2 * 10 ** 6))
+        tokens = {r: _token(r, 'reseller') for r in range(1, args.resellers + 1)}
+        admin_token = _token(1, 'admin')
+
+    # SQLite tidak punya SKIP LOCKED, jadi outbox dispatcher dkk. hanya di instance pertama
+    background = 'first' if database_url.startswith('sqlite') else 'all'
+    env = {'DATABASE_URL': database_url, 'REDIS_URL': REDIS_URL, 'OUTBOX_POLL_INTERVAL': '0.1',
+           'LOGIN_RATE_LIMIT_IP': '1000000', 'PROXY_FIX_X_FOR': '1' if args.proxy else '0'}
+    results = []
+    for instances in args.instances:
+        with app.app_context():
+            # Order pending baru per putaran (tanpa reservasi: approve hanya mengubah status)
+            db.session.execute(db.insert(OrderRequest), [
+                {'reseller_id': 1 + i % args.resellers, 'status': 'pending', 'total_amount': 0,
+                 'order_date': datetime.utcnow()} for i in range(args.events)])
+            db.session.commit()
+            orders = dict(db.session.execute(
+                db.select(OrderRequest.id, OrderRequest.reseller_id).where(OrderRequest.status == 'pending')
+                .order_by(OrderRequest.id.desc()).limit(args.events)).all())
+
+        processes = serve.start(instances, args.base_port, background, env, stdout=subprocess.DEVNULL)
+        try:
+            for port in processes:
+                wait_for_port(port)
+            if args.proxy:
+                host, port = args.proxy.rsplit(':', 1)
+                targets = [(host, int(port))]
+            else:
+                targets = [('127.0.0.1', port) for port in sorted(processes)]
+            load = http_load(targets, tokens, args.concurrency, args.duration)
+            fanout = socket_fanout(targets, admin_token, tokens, orders, args.senders)
+        finally:
+            serve.stop(processes)
+        results.append((instances, load, fanout))
+        print(f'{instances} instance(s): {load["rps"]:.0f} req/s, {fanout["events_per_s"]:.0f} events/s, '
+              f'delivered {fanout["delivered"]}/{fanout["expected"]}')
+
+    base = results[0]
+    print(f'\n{"instances":>9} {"req/s":>8} {"p50 ms":>8} {"p99 ms":>8} {"x":>5} '
+          f'{"PUT/s":>7} {"events/s":>9} {"x":>5} {"delivered":>11} {"admins":>7}')
+    for instances, load, fanout in results:
+        print(f'{instances:>9} {load["rps"]:>8.0f} {load["p50"]:>8.1f} {load["p99"]:>8.1f} '
+              f'{load["rps"] / base[1]["rps"]:>5.2f} {fanout["puts_per_s"]:>7.0f} {fanout["events_per_s"]:>9.0f} '
+              f'{fanout["events_per_s"] / base[2]["events_per_s"]:>5.2f} '
+              f'{fanout["delivered"]:>5}/{fanout["expected"]:<5} {fanout["admins_complete"]:>3}/{instances:<3}')
+    print(f'cpu cores: {os.cpu_count()}')
+
+    for instances, load, fanout in results:
+        assert load['errors'] == 0 and fanout['put_errors'] == 0, (instances, load, fanout)
+        assert fanout['delivered'] == fanout['expected'], f'{instances} instances: events lost across instances'
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,288 @@
+"""Skenario request untuk benchmarks.harness: satu entri per (route, method) di app/routes.py.
+
+Setiap skenario menerima reseller yang sedang dipakai worker dan mengembalikan (path, body),
+atau None kalau tidak bisa dijalankan saat itu (mis. belum ada produk hasil POST untuk
+di-DELETE); harness lalu memilih skenario lain.
+"""
+import itertools
+import threading
+from collections import deque
+
+STATUSES = ['pending', 'approved', 'rejected', 'shipped', 'delivered', 'completed']
+
+
+class Fixtures:
+    """Id yang dipakai skenario, dibaca sekali dari database sebelum run."""
+
+    def __init__(self, products, resellers, orders_by_reseller, shipping_ids, delivered_shipping,
+                 return_ids, returnable, tokens, admin_token):
+        self.products = products
+        self.resellers = resellers
+        self.orders_by_reseller = orders_by_reseller
+        self.order_ids = [o for orders in orders_by_reseller.values() for o in orders]
+        self.shipping_ids = shipping_ids
+        self.delivered_shipping = delivered_shipping
+        self.return_ids = return_ids
+        self.returnable = returnable
+        self.tokens = tokens
+        self.admin_token = admin_token
+        self.created_products = deque()
+        self.tracked_orders = []
+        self.changed_at = {}
+        self.unique = itertools.count()
+        self.lock = threading.Lock()
+
+
+# --- admin -----------------------------------------------------------------
+
+def admin_login(fx, rng, reseller_id):
+    return '/api/admin/login', {'email': 'admin@example.com', 'password': 'secret'}
+
+
+def admin_products(fx, rng, reseller_id):
+    if rng.random() < 0.5:
+        return '/api/admin/products?cursor=&limit=20', None
+    return f'/api/admin/products?page={rng.randint(1, 20)}&limit=20', None
+
+
+def admin_product_create(fx, rng, reseller_id):
+    n = next(fx.unique)
+    return '/api/admin/products', {
+        'name': f'Harness product {n}', 'category': 'electronics', 'brand': 'Harness',
+        'price': float(rng.randint(10, 500)), 'stock': {'quantity': 100}
+    }
+
+
+def admin_product_get(fx, rng, reseller_id):
+    return f'/api/admin/products/{rng.choice(fx.products)}', None
+
+
+def admin_product_update(fx, rng, reseller_id):
+    return f'/api/admin/products/{rng.choice(fx.products)}', {
+        'price': float(rng.randint(10, 500)), 'stock': {'quantity': rng.randint(100, 1000)}
+    }
+
+
+def admin_product_delete(fx, rng, reseller_id):
+    with fx.lock:
+        if not fx.created_products:
+            return None
+        product_id = fx.created_products.popleft()
+    return f'/api/admin/products/{product_id}', None
+
+
+def admin_bulk_products(fx, rng, reseller_id):
+    n = next(fx.unique)
+    return '/api/admin/products/bulk', {'products': [{
+        'name': f'Bulk {n}-{i}', 'category': 'electronics', 'brand': 'Harness',
+        'price': float(rng.randint(10, 500)), 'stock': 10
+    } for i in range(50)]}
+
+
+def admin_bulk_stock(fx, rng, reseller_id):
+    return '/api/admin/stock/bulk', {'adjustments': [
+        {'product_id': p, 'delta': rng.randint(1, 20)} for p in rng.sample(fx.products, min(50, len(fx.products)))
+    ]}
+
+
+def admin_orders(fx, rng, reseller_id):
+    status = rng.choice(STATUSES + ['all'])
+    if rng.random() < 0.5:
+        return f'/api/admin/orders?status={status}&cursor=&limit=20', None
+    return f'/api/admin/orders?status={status}&page={rng.randint(1, 50)}&limit=20', None
+
+
+def admin_order_get(fx, rng, reseller_id):
+    return f'/api/admin/orders/{rng.choice(fx.order_ids)}', None
+
+
+def admin_order_update(fx, rng, reseller_id):
+    # Separuh perubahan mengenai order yang sedang di-track client socket
+    if fx.tracked_orders and rng.random() < 0.5:
+        order_id = rng.choice(fx.tracked_orders)
+    else:
+        order_id = rng.choice(fx.order_ids)
+    return f'/api/admin/orders/{order_id}', {'status': rng.choice(['approved', 'rejected'])}
+
+
+def admin_shipping(fx, rng, reseller_id):
+    return f'/api/admin/shipping?status={rng.choice(["all", "in_transit", "delivered"])}&page={rng.randint(1, 20)}', None
+
+
+def admin_shipping_update(fx, rng, reseller_id):
+    return '/api/admin/shipping', {
+        'shipping_id': rng.choice(fx.shipping_ids), 'status': rng.choice(['in_transit', 'delivered'])
+    }
+
+
+def admin_returns(fx, rng, reseller_id):
+    return f'/api/admin/returns?page={rng.randint(1, 10)}&limit=20', None
+
+
+def admin_return_update(fx, rng, reseller_id):
+    if not fx.return_ids:
+        return None
+    return '/api/admin/returns', {'return_id': rng.choice(fx.return_ids), 'status': rng.choice(['approved', 'rejected'])}
+
+
+def admin_export_orders(fx, rng, reseller_id):
+    return '/api/admin/exports/orders?status=pending&format=ndjson', None
+
+
+def admin_export_shipping(fx, rng, reseller_id):
+    return '/api/admin/exports/shipping?status=in_transit&format=csv', None
+
+
+def admin_export_returns(fx, rng, reseller_id):
+    return '/api/admin/exports/returns?status=pending', None
+
+
+def admin_stats(fx, rng, reseller_id):
+    return '/api/admin/stats', None
+
+
+def admin_outbox(fx, rng, reseller_id):
+    return '/api/admin/outbox', None
+
+
+# --- reseller --------------------------------------------------------------
+
+def reseller_login(fx, rng, reseller_id):
+    return '/api/reseller/login', {'email': f'reseller{reseller_id}@example.com', 'password': 'secret'}
+
+
+def reseller_register(fx, rng, reseller_id):
+    n = f'{id(fx)}x{next(fx.unique)}'
+    return '/api/reseller/register', {
+        'username': f'harness{n}', 'password': 'secret', 'name': f'Harness {n}',
+        'email': f'harness{n}@example.com', 'phone': '0800000000', 'address': 'Jl. Harness'
+    }
+
+
+def reseller_products(fx, rng, reseller_id):
+    return '/api/reseller/products', None
+
+
+def reseller_orders(fx, rng, reseller_id):
+    return '/api/reseller/orders', None
+
+
+def reseller_order_create(fx, rng, reseller_id):
+    return '/api/reseller/orders', {'products': [
+        {'product_id': p, 'quantity': 1} for p in rng.sample(fx.products, rng.randint(1, 3))
+    ]}
+
+
+def reseller_order_get(fx, rng, reseller_id):
+    orders = fx.orders_by_reseller.get(reseller_id)
+    return (f'/api/reseller/orders/{rng.choice(orders)}', None) if orders else None
+
+
+def reseller_returns(fx, rng, reseller_id):
+    return '/api/reseller/returns', None
+
+
+def reseller_return_create(fx, rng, reseller_id):
+    lines = fx.returnable.get(reseller_id)
+    if not lines:
+        return None
+    order_id, product_id = rng.choice(lines)
+    return '/api/reseller/returns', {'order_id': order_id, 'product_id': product_id,
+                                      'quantity': 1, 'reason': 'Barang rusak'}
+
+
+def reseller_returnable(fx, rng, reseller_id):
+    return '/api/reseller/returns/returnable-orders?limit=50', None
+
+
+def reseller_export_orders(fx, rng, reseller_id):
+    return '/api/reseller/orders/export', None
+
+
+def reseller_export_returns(fx, rng, reseller_id):
+    return '/api/reseller/returns/export?format=csv', None
+
+
+def reseller_stock(fx, rng, reseller_id):
+    return '/api/reseller/stock', None
+
+
+def reseller_shipping(fx, rng, reseller_id):
+    return '/api/reseller/shipping', None
+
+
+def reseller_shipping_validate(fx, rng, reseller_id):
+    shipments = fx.delivered_shipping.get(reseller_id)
+    return (f'/api/reseller/shipping/{rng.choice(shipments)}/validate', None) if shipments else None
+
+
+# (nama, role, method, rule di url_map, builder)
+SCENARIOS = [
+    ('admin_login', None, 'POST', '/api/admin/login', admin_login),
+    ('admin_products', 'admin', 'GET', '/api/admin/products', admin_products),
+    ('admin_product_create', 'admin', 'POST', '/api/admin/products', admin_product_create),
+    ('admin_product_get', 'admin', 'GET', '/api/admin/products/<int:product_id>', admin_product_get),
+    ('admin_product_update', 'admin', 'PUT', '/api/admin/products/<int:product_id>', admin_product_update),
+    ('admin_product_delete', 'admin', 'DELETE', '/api/admin/products/<int:product_id>', admin_product_delete),
+    ('admin_bulk_products', 'admin', 'POST', '/api/admin/products/bulk', admin_bulk_products),
+    ('admin_bulk_stock', 'admin', 'POST', '/api/admin/stock/bulk', admin_bulk_stock),
+    ('admin_orders', 'admin', 'GET', '/api/admin/orders', admin_orders),
+    ('admin_order_get', 'admin', 'GET', '/api/admin/orders/<int:order_id>', admin_order_get),
+    ('admin_order_update', 'admin', 'PUT', '/api/admin/orders/<int:order_id>', admin_order_update),
+    ('admin_shipping', 'admin', 'GET', '/api/admin/shipping', admin_shipping),
+    ('admin_shipping_update', 'admin', 'PUT', '/api/admin/shipping', admin_shipping_update),
+    ('admin_returns', 'admin', 'GET', '/api/admin/returns', admin_returns),
+    ('admin_return_update', 'admin', 'PUT', '/api/admin/returns', admin_return_update),
+    ('admin_export_orders', 'admin', 'GET', '/api/admin/exports/orders', admin_export_orders),
+    ('admin_export_shipping', 'admin', 'GET', '/api/admin/exports/shipping', admin_export_shipping),
+    ('admin_export_returns', 'admin', 'GET', '/api/admin/exports/returns', admin_export_returns),
+    ('admin_stats', 'admin', 'GET', '/api/admin/stats', admin_stats),
+    ('admin_outbox', 'admin', 'GET', '/api/admin/outbox', admin_outbox),
+    ('reseller_login', None, 'POST', '/api/reseller/login', reseller_login),
+    ('reseller_register', None, 'POST', '/api/reseller/register', reseller_register),
+    ('reseller_products', 'reseller', 'GET', '/api/reseller/products', reseller_products),
+    ('reseller_orders', 'reseller', 'GET', '/api/reseller/orders', reseller_orders),
+    ('reseller_order_create', 'reseller', 'POST', '/api/reseller/orders', reseller_order_create),
+    ('reseller_order_get', 'reseller', 'GET', '/api/reseller/orders/<int:order_id>', reseller_order_get),
+    ('reseller_returns', 'reseller', 'GET', '/api/reseller/returns', reseller_returns),
+    ('reseller_return_create', 'reseller', 'POST', '/api/reseller/returns', reseller_return_create),
+    ('reseller_returnable', 'reseller', 'GET', '/api/reseller/returns/returnable-orders', reseller_returnable),
+    ('reseller_export_orders', 'reseller', 'GET', '/api/reseller/orders/export', reseller_export_orders),
+    ('reseller_export_returns', 'reseller', 'GET', '/api/reseller/returns/export', reseller_export_returns),
+    ('reseller_stock', 'reseller', 'GET', '/api/reseller/stock', reseller_stock),
+    ('reseller_shipping', 'reseller', 'GET', '/api/reseller/shipping', reseller_shipping),
+    ('reseller_shipping_validate', 'reseller', 'PUT', '/api/reseller/shipping/<int:shipping_id>/validate',
+     reseller_shipping_validate),
+]
+
+# Bobot relatif per mix; skenario yang tidak disebut berbobot 1 di mix "full"
+MIXES = {
+    # Hari kerja biasa: reseller browsing dan order, admin memproses antrean
+    'mixed': {
+        'reseller_products': 30, 'reseller_orders': 8, 'reseller_order_get': 8, 'reseller_order_create': 10,
+        'reseller_stock': 6, 'reseller_returnable': 3, 'reseller_returns': 3, 'reseller_return_create': 1,
+        'reseller_shipping': 3, 'reseller_login': 1,
+        'admin_orders': 8, 'admin_order_get': 3, 'admin_order_update': 5, 'admin_shipping': 3,
+        'admin_shipping_update': 2, 'admin_returns': 2, 'admin_return_update': 1, 'admin_products': 3,
+        'admin_product_get': 2, 'admin_stats': 2,
+    },
+    'reseller': {
+        'reseller_products': 40, 'reseller_orders': 10, 'reseller_order_get': 10, 'reseller_order_create': 15,
+        'reseller_stock': 10, 'reseller_returnable': 5, 'reseller_returns': 5, 'reseller_return_create': 2,
+        'reseller_shipping': 5, 'reseller_login': 1,
+    },
+    'admin': {
+        'admin_orders': 30, 'admin_order_get': 10, 'admin_order_update': 15, 'admin_shipping': 10,
+        'admin_shipping_update': 8, 'admin_returns': 8, 'admin_return_update': 4, 'admin_products': 8,
+        'admin_product_get': 5, 'admin_product_update': 3, 'admin_stats': 5, 'admin_outbox': 1,
+    },
+    # Semua route sama rata, untuk memastikan tidak ada endpoint yang terlewat
+    'full': {},
+}
+
+
+def weights(mix):
+    table = MIXES[mix]
+    if not table:
+        return {name: 1 for name, *_ in SCENARIOS}
+    return table
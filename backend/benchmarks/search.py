@@ -0,0 +1,144 @@
+"""Pencarian dashboard admin: ILIKE '%x%' lama vs full-text (FTS5 di SQLite, FULLTEXT di MySQL).
+
+    python -m benchmarks.search --orders 1000000
+
+Seed SQLite in-memory, lalu `rebuild()` membangun index FTS5. Kolom legacy menjalankan
+filter ILIKE lama langsung (count + satu halaman), kolom search lewat endpoint listing.
+Hasil pencarian kata utuh harus sama persis dengan ILIKE, dan index harus ikut berubah
+saat produk/order ditulis lewat API.
+"""
+import argparse
+import statistics
+import time
+from sqlalchemy import String, cast, or_
+from werkzeug.datastructures import MultiDict
+from .common import make_app, auth_headers, count_queries
+from .seed import seed
+from app.search import rebuild
+from app.filters import filter_orders, filter_shipments, filter_returns, filter_products
+from app.models import db, OrderRequest, ShippingInfo, ReturnRequest, Product
+
+PAGE = 10
+
+
+def _like(term):
+    return f'%{term}%'
+
+
+# Ekspresi filter sebelum app/search.py, untuk pembanding
+LEGACY = {
+    'orders': (OrderRequest, lambda t: OrderRequest.notes.ilike(_like(t))),
+    'shipping': (ShippingInfo, lambda t: or_(ShippingInfo.tracking_number.ilike(_like(t)),
+                                             cast(ShippingInfo.order_id, String).ilike(_like(t)),
+                                             ShippingInfo.carrier.ilike(_like(t)))),
+    'returns': (ReturnRequest, lambda t: or_(cast(ReturnRequest.id, String).ilike(_like(t)),
+                                             cast(ReturnRequest.order_id, String).ilike(_like(t)),
+                                             Product.name.ilike(_like(t)),
+                                             ReturnRequest.reason.ilike(_like(t)))),
+    'products': (Product, lambda t: Product.name.ilike(_like(t))),
+}
+FILTERS = {
+    'orders': (OrderRequest, lambda q, t: filter_orders(q, MultiDict({'status': '', 'search': t}))),
+    'shipping': (ShippingInfo, lambda q, t: filter_shipments(q, MultiDict({'search': t}))),
+    'returns': (ReturnRequest, lambda q, t: filter_returns(q, MultiDict({'search': t}))),
+    'products': (Product, lambda q, t: filter_products(q, MultiDict({'search': t}))),
+}
+
+
+def cases(orders):
+    target = orders * 7 // 9
+    return [
+        ('orders', 'kayu', True),
+        ('orders', 'packing kayu', True),
+        ('orders', 'satpam', True),
+        ('orders', f'order {target}', True),
+        ('orders', str(target), False),
+        ('shipping', 'jne', True),
+        ('shipping', f'TRK{target:08d}', False),
+        ('shipping', f'TRK{target:08d}'[:8], False),
+        ('returns', 'rusak', True),
+        ('returns', str(target), False),
+        ('products', 'product', True),
+        ('products', 'product 4242', True),
+    ]
+
+
+def _legacy_query(kind, term):
+    model, clause = LEGACY[kind]
+    query = model.query
+    if kind == 'returns':
+        query = query.join(Product)
+    return query.filter(clause(term))
+
+
+def _median_ms(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def _url(kind, term):
+    extra = '&status=' if kind == 'orders' else ''
+    return f'/api/admin/{kind}?search={term}&limit={PAGE}{extra}'
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--orders', type=int, default=1000000)
+    parser.add_argument('--products', type=int, default=5000)
+    parser.add_argument('--returns', type=int, default=50000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    app = make_app()
+    client = app.test_client()
+    with app.app_context():
+        start = time.perf_counter()
+        seed(resellers=50, products=args.products, orders=args.orders, lines_per_order=1, returns=args.returns)
+        print(f'seed: {args.orders} orders in {time.perf_counter() - start:.1f}s')
+        start = time.perf_counter()
+        rebuild()
+        print(f'rebuild FTS5: {time.perf_counter() - start:.1f}s')
+        headers = auth_headers(1, 'admin')
+
+        print(f'{"table":<9} {"term":<16} {"rows":>8} {"legacy ms":>10} {"search ms":>10} {"queries":>8}')
+        mismatches = []
+        for kind, term, compare in cases(args.orders):
+            legacy = _legacy_query(kind, term)
+            legacy_ms = _median_ms(lambda: (legacy.order_by(None).count(), legacy.limit(PAGE).all()), args.repeat)
+
+            model, apply_filter = FILTERS[kind]
+            rows = apply_filter(model.query, term).order_by(None).count()
+            with count_queries() as counter:
+                response = client.get(_url(kind, term), headers=headers)
+            assert response.status_code == 200, response.get_data(as_text=True)[:200]
+            search_ms = _median_ms(lambda: client.get(_url(kind, term), headers=headers), args.repeat)
+            print(f'{kind:<9} {term:<16} {rows:>8} {legacy_ms:>10.1f} {search_ms:>10.1f} {counter.count:>8}')
+
+            if compare:
+                expected = {r.id for r in legacy.with_entities(model.id)}
+                actual = {r.id for r in apply_filter(model.query, term).with_entities(model.id)}
+                if expected != actual:
+                    mismatches.append((kind, term, len(expected), len(actual)))
+
+        # Index ikut sinkron dengan tulis lewat API (trigger FTS5 / FULLTEXT MySQL)
+        created = client.post('/api/admin/products', headers=headers, json={
+            'name': 'Zebra Speaker', 'category': 'audio', 'brand': 'Acme', 'price': 10, 'stock': {'quantity': 1}})
+        product_id = created.get_json()['id']
+        found = lambda term: [p['id'] for p in client.get(
+            f'/api/admin/products?search={term}', headers=headers).get_json()['products']]
+        assert found('zebr') == [product_id], 'insert not indexed'
+        client.put(f'/api/admin/products/{product_id}', headers=headers, json={'name': 'Okapi Speaker'})
+        assert found('zebra') == [] and found('okapi') == [product_id], 'update not indexed'
+        client.delete(f'/api/admin/products/{product_id}', headers=headers)
+        assert found('okapi') == [], 'delete not indexed'
+
+    assert not mismatches, f'full-text results differ from ILIKE: {mismatches}'
+    print('index sync on insert/update/delete: ok')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+import random
+from datetime import datetime, timedelta
+from werkzeug.security import generate_password_hash
+from app.models import (
+    db, Admin, Reseller, Product, Stock, OrderRequest, OrderDetail, ShippingInfo,
+    ReturnRequest, ResellerStock, StockMovement
+)
+from app.availability import rebuild
+
+ORDER_STATUSES = ['pending', 'approved', 'rejected', 'shipped', 'delivered', 'completed']
+# Catatan order bervariasi supaya benchmark pencarian punya selektivitas realistis
+NOTE_PHRASES = ['kirim cepat', 'packing kayu', 'bubble wrap', 'titip satpam', 'hubungi dulu',
+                'dropship', 'alamat kantor', 'jangan dibanting', 'cod', 'stok promo', 'reseller baru']
+
+
+def _insert(model, rows, chunk_size=5000):
+    for i in range(0, len(rows), chunk_size):
+        db.session.execute(db.insert(model), rows[i:i + chunk_size])
+
+
+def seed(resellers=10, products=50, orders=100, lines_per_order=3, seed_value=42, chunk_size=20000,
+         returns=0, reseller_stock=False, stock_range=(0, 1000)):
+    """Isi database dengan data sintetis; mengembalikan id admin pertama.
+
+    returns: jumlah return request dari baris order delivered/completed.
+    reseller_stock: isi reseller_stocks dari order yang sudah sampai ke reseller.
+    """
+    rng = random.Random(seed_value)
+    now = datetime.utcnow()
+    password_hash = generate_password_hash('secret', method='pbkdf2:sha256')
+
+    _insert(Admin, [{
+        'id': 1, 'username': 'admin', 'name': 'Admin', 'email': 'admin@example.com',
+        'password_hash': password_hash
+    }])
+    _insert(Reseller, [{
+        'id': r, 'username': f'reseller{r}', 'name': f'Reseller {r}',
+        'email': f'reseller{r}@example.com', 'phone': '0800000000',
+        'address': 'Jl. Benchmark', 'password_hash': password_hash
+    } for r in range(1, resellers + 1)])
+    _insert(Product, [{
+        'id': p, 'name': f'Product {p}', 'category': 'electronics',
+        'brand': f'Brand {p % 7}', 'price': float(rng.randint(10, 500))
+    } for p in range(1, products + 1)])
+    stock_rows = [{
+        'product_id': p, 'quantity': rng.randint(*stock_range), 'last_restocked': now
+    } for p in range(1, products + 1)]
+    _insert(Stock, stock_rows)
+
+    order_rows, detail_rows, shipping_rows = [], [], []
+    delivered_lines, seen_lines = [], 0
+    received = {}
+    for o in range(1, orders + 1):
+        reseller_id = rng.randint(1, resellers)
+        status = rng.choice(ORDER_STATUSES)
+        created = now - timedelta(minutes=orders - o)
+        total = 0.0
+        for product_id in rng.sample(range(1, products + 1), min(lines_per_order, products)):
+            quantity = rng.randint(1, 5)
+            price = float(rng.randint(10, 500))
+            total += quantity * price
+            detail_rows.append({
+                'order_id': o, 'product_id': product_id, 'quantity': quantity,
+                'unit_price': price, 'subtotal': quantity * price
+            })
+            if status in ('delivered', 'completed'):
+                key = (reseller_id, product_id)
+                received[key] = received.get(key, 0) + quantity
+                # Reservoir sampling supaya seed jutaan order tidak menyimpan semua baris
+                seen_lines += 1
+                if len(delivered_lines) < returns:
+                    delivered_lines.append((o, reseller_id, product_id, quantity, created))
+                elif returns:
+                    j = rng.randrange(seen_lines)
+                    if j < returns:
+                        delivered_lines[j] = (o, reseller_id, product_id, quantity, created)
+        order_rows.append({
+            'id': o, 'reseller_id': reseller_id, 'status': status, 'total_amount': total,
+            'order_date': created, 'created_at': created, 'notes': f'order {o} {NOTE_PHRASES[o % len(NOTE_PHRASES)]}'
+        })
+        if status in ('shipped', 'delivered', 'completed'):
+            shipping_rows.append({
+                'order_id': o, 'reseller_id': reseller_id, 'shipping_method': 'regular',
+                'tracking_number': f'TRK{o:08d}', 'carrier': 'JNE',
+                'status': 'delivered' if status != 'shipped' else 'in_transit'
+            })
+
+        # Flush per chunk supaya seed jutaan order tidak menumpuk di memori
+        if len(order_rows) >= chunk_size or o == orders:
+            _insert(OrderRequest, order_rows)
+            _insert(OrderDetail, detail_rows)
+            _insert(ShippingInfo, shipping_rows)
+            db.session.commit()
+            order_rows, detail_rows, shipping_rows = [], [], []
+
+    # Saldo awal juga dicatat di ledger, supaya rekonsiliasi tidak melihat drift
+    opening = [{'product_id': s['product_id'], 'reseller_id': None, 'delta': s['quantity'],
+                'balance': s['quantity'], 'reason': 'opening', 'created_at': now} for s in stock_rows if s['quantity']]
+    if reseller_stock:
+        _insert(ResellerStock, [
+            {'reseller_id': r, 'product_id': p, 'quantity': quantity, 'last_updated': now}
+            for (r, p), quantity in received.items()
+        ], chunk_size)
+        opening += [{'product_id': p, 'reseller_id': r, 'delta': quantity, 'balance': quantity,
+                     'reason': 'opening', 'created_at': now} for (r, p), quantity in received.items()]
+    _insert(StockMovement, opening, chunk_size)
+    if returns:
+        _insert(ReturnRequest, [{
+            'reseller_id': r, 'product_id': p, 'order_id': o, 'quantity': 1,
+            'reason': 'Barang rusak', 'status': rng.choice(['pending', 'approved', 'rejected']),
+            'request_date': created
+        } for o, r, p, _, created in delivered_lines], chunk_size)
+
+    db.session.commit()
+    # Ringkasan stok per produk dari saldo dan ledger yang baru diisi
+    rebuild()
+    return 1
@@ -0,0 +1,93 @@
+"""Bandingkan serialisasi 10k order: to_dict tulisan tangan + json bawaan vs
+serializer per model + orjson.
+
+    python -m benchmarks.serialization --orders 10000
+"""
+import argparse
+import json
+import time
+from flask.json.provider import DefaultJSONProvider
+from .common import make_app
+from .seed import seed
+from app.json_provider import OrjsonProvider, orjson
+from app.serializers import order_query, serialize_orders
+
+
+def _iso(value):
+    return value.isoformat() if value else None
+
+
+def legacy_order_dict(order):
+    # Salinan OrderRequest.to_dict() sebelum serializer per model
+    return {
+        'id': order.id,
+        'reseller_id': order.reseller_id,
+        'order_date': _iso(order.order_date),
+        'status': order.status,
+        'total_amount': order.total_amount,
+        'notes': order.notes,
+        'created_at': _iso(order.created_at),
+        'updated_at': _iso(order.updated_at),
+        'order_details': [{
+            'id': d.id,
+            'order_id': d.order_id,
+            'product_id': d.product_id,
+            'quantity': d.quantity,
+            'unit_price': d.unit_price,
+            'subtotal': d.subtotal,
+            'created_at': _iso(d.created_at)
+        } for d in order.order_details],
+        'shipping': {
+            'id': order.shipping.id,
+            'order_id': order.shipping.order_id,
+            'reseller_id': order.shipping.reseller_id,
+            'shipping_method': order.shipping.shipping_method,
+            'tracking_number': order.shipping.tracking_number,
+            'shipping_date': _iso(order.shipping.shipping_date),
+            'estimated_delivery': _iso(order.shipping.estimated_delivery),
+            'actual_delivery': _iso(order.shipping.actual_delivery),
+            'status': order.shipping.status,
+            'carrier': order.shipping.carrier,
+            'notes': order.shipping.notes,
+            'created_at': _iso(order.shipping.created_at),
+            'updated_at': _iso(order.shipping.updated_at)
+        } if order.shipping else None
+    }
+
+
+def best_of(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--orders', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    app = make_app()
+    with app.app_context():
+        seed(orders=args.orders)
+        orders = order_query().all()
+
+        default_provider = DefaultJSONProvider(app)
+        before_ms, before = best_of(lambda: default_provider.dumps([legacy_order_dict(o) for o in orders]), args.repeat)
+        print(f'before: to_dict + json      {before_ms:8.1f} ms')
+
+        if orjson is None:
+            print('orjson not installed, skipping "after"')
+            return
+        fast_provider = OrjsonProvider(app)
+        after_ms, after = best_of(lambda: fast_provider.dumps(serialize_orders(orders)), args.repeat)
+        print(f'after:  serializer + orjson {after_ms:8.1f} ms  ({before_ms / after_ms:.1f}x)')
+
+        assert json.loads(before) == json.loads(after), 'serializer output differs from to_dict()'
+
+
+if __name__ == '__main__':
+    main()
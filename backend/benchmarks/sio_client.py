@@ -0,0 +1,74 @@
+"""Client Socket.IO minimal (Engine.IO v4, transport long-polling) untuk benchmark.
+
+python-socketio.Client butuh requests/websocket-client yang tidak ada di requirements,
+jadi harness memakai client kecil ini di atas http.client.
+"""
+import http.client
+import json
+
+SEPARATOR = '\x1e'
+
+
+class PollingClient:
+    def __init__(self, host, port, namespace, timeout=30):
+        self.namespace = namespace
+        self.conn = http.client.HTTPConnection(host, port, timeout=timeout)
+        self.send_conn = http.client.HTTPConnection(host, port, timeout=timeout)
+        self.sid = None
+        # Cookie sticky session dari load balancer (deploy/haproxy.cfg)
+        self.cookies = {}
+
+    def _request(self, conn, method, body=None):
+        path = '/socket.io/?EIO=4&transport=polling' + (f'&sid={self.sid}' if self.sid else '')
+        headers = {'Content-Type': 'text/plain;charset=UTF-8'}
+        if self.cookies:
+            headers['Cookie'] = '; '.join(f'{k}={v}' for k, v in self.cookies.items())
+        conn.request(method, path, body=body, headers=headers)
+        response = conn.getresponse()
+        data = response.read().decode()
+        for cookie in response.headers.get_all('Set-Cookie') or ():
+            name, _, value = cookie.split(';', 1)[0].partition('=')
+            self.cookies[name.strip()] = value.strip()
+        if response.status != 200:
+            raise ConnectionError(f'{method} {path} -> {response.status}: {data[:200]}')
+        return data
+
+    def connect(self, auth):
+        handshake = self._request(self.conn, 'GET')
+        self.sid = json.loads(handshake[1:])['sid']
+        self._send(f'40{self.namespace},{json.dumps(auth)}')
+        for event, data in self.receive():
+            if event == 'connect':
+                return data
+            if event == 'connect_error':
+                raise ConnectionError(f'connect_error: {data}')
+        raise ConnectionError('no namespace connect ack')
+
+    def _send(self, packet):
+        self._request(self.send_conn, 'POST', packet.encode())
+
+    def emit(self, event, data):
+        self._send(f'42{self.namespace},{json.dumps([event, data])}')
+
+    def receive(self):
+        """Satu long-poll; mengembalikan list (event, data)."""
+        events = []
+        for packet in self._request(self.conn, 'GET').split(SEPARATOR):
+            if packet == '2':
+                self._send('3')  # ping -> pong
+            elif packet.startswith('40'):
+                events.append(('connect', json.loads(packet[packet.index(',') + 1:] or 'null')))
+            elif packet.startswith('44'):
+                events.append(('connect_error', packet[packet.index(',') + 1:]))
+            elif packet.startswith('42'):
+                event, *args = json.loads(packet[packet.index(',') + 1:])
+                events.append((event, args[0] if args else None))
+        return events
+
+    def close(self):
+        try:
+            self._send('1')
+        except (OSError, ConnectionError):
+            pass
+        self.conn.close()
+        self.send_conn.close()
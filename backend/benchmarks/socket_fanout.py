@@ -0,0 +1,77 @@
+"""Biaya fan-out satu event ke ribuan client Socket.IO: broadcast namespace vs room per reseller.
+
+    python -m benchmarks.socket_fanout --clients 2000 --resellers 500
+
+Memakai test client Flask-SocketIO (in-process), jadi angka byte dan CPU adalah
+biaya server untuk meng-encode dan mengantar paket, tanpa jaringan.
+"""
+import argparse
+import json
+import time
+from flask_jwt_extended import create_access_token
+from .common import make_app
+from .seed import seed
+from app import socketio
+from app.models import OrderRequest
+from app.realtime import publish, reseller_room, order_room
+
+
+def drain(clients):
+    packets = bytes_ = 0
+    for client in clients:
+        for packet in client.get_received('/reseller'):
+            packets += 1
+            bytes_ += len(json.dumps(packet['args']))
+    return packets, bytes_
+
+
+def measure(label, clients, send, events):
+    drain(clients)
+    cpu = time.process_time()
+    for i in range(events):
+        send(i)
+    cpu = time.process_time() - cpu
+    packets, bytes_ = drain(clients)
+    print(f'{label:<22} packets/event={packets / events:8.1f}  bytes/event={bytes_ / events:10.0f}  '
+          f'cpu/event={cpu / events * 1000:7.3f} ms')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--clients', type=int, default=2000)
+    parser.add_argument('--resellers', type=int, default=500)
+    parser.add_argument('--events', type=int, default=20)
+    args = parser.parse_args()
+
+    app = make_app()
+    with app.app_context():
+        seed(resellers=args.resellers, products=5, orders=args.resellers)
+        tracked_order = OrderRequest.query.filter_by(reseller_id=1).first().id
+        tokens = [create_access_token(identity=str(r % args.resellers + 1), additional_claims={'role': 'reseller'})
+                  for r in range(args.clients)]
+
+    start = time.perf_counter()
+    clients = [socketio.test_client(app, namespace='/reseller', auth={'token': t}) for t in tokens]
+    print(f'connected {len(clients)} clients in {time.perf_counter() - start:.1f}s')
+
+    payload = {'shipping_id': 1, 'order_id': 1, 'status': 'in_transit', 'reseller_id': 1,
+               'updated_at': '2026-01-01T00:00:00'}
+
+    with app.app_context():
+        measure('namespace broadcast', clients,
+                lambda i: socketio.emit('shipping_update', payload, namespace='/reseller'), args.events)
+        measure('reseller room', clients,
+                lambda i: publish('/reseller', reseller_room(i % args.resellers + 1), 'shipping_update', payload), args.events)
+
+        # Snapshot + delta untuk order yang di-track satu client
+        tracker = clients[0]
+        tracker.emit('track_order', {'order_id': tracked_order}, namespace='/reseller')
+        snapshot = [p for p in tracker.get_received('/reseller') if p['name'] == 'order_snapshot']
+        delta = {'order_id': tracked_order, 'changes': {'status': 'shipped'}}
+        measure('order room delta', clients,
+                lambda i: publish('/reseller', order_room(tracked_order), 'order_delta', delta), args.events)
+        assert snapshot and snapshot[0]['args'][0]['id'] == tracked_order, 'no order snapshot received'
+
+
+if __name__ == '__main__':
+    main()
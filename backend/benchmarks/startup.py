@@ -0,0 +1,98 @@
+"""Waktu cold start: import app, create_app light/full, worker gunicorn (wsgi) dan CLI flask.
+
+    python -m benchmarks.startup --repeat 5
+    python -m benchmarks.startup --budget light=1500 --budget full=2500
+
+Setiap kasus dijalankan sebagai proses baru dengan `python -X importtime`, jadi yang diukur
+termasuk start interpreter. Dilaporkan median wall time, jumlah modul dan package top-level
+yang paling mahal; gagal kalau median melewati budget. Mode light juga dicek tidak memuat
+Socket.IO server, eventlet, alembic dan route HTTP.
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REPORT = ('import json, sys; from app import socketio; '
+          'print(json.dumps({"modules": len(sys.modules), "socketio": socketio.server is not None, '
+          '"loaded": [m for m in ("eventlet", "alembic", "flask_cors", "app.routes") if m in sys.modules]}))')
+CASES = {
+    'import': 'import app',
+    'light': "from app import create_app; create_app('production', light=True)",
+    'full': "from app import create_app; create_app('production')",
+    # Worker gunicorn: monkeypatch eventlet + create_app + task background (dimatikan di sini)
+    'worker': 'import wsgi',
+}
+# Budget default (ms, median); sesuaikan dengan --budget untuk mesin yang lebih lambat
+BUDGETS = {'import': 1500, 'light': 1800, 'full': 2500, 'worker': 2800, 'cli': 3000}
+IMPORT_RE = re.compile(r'^import time:\s+(\d+) \|\s+\d+ \| *(\S+)$')
+
+
+def _env():
+    return {**os.environ, 'FLASK_CONFIG': 'production', 'REDIS_URL': os.getenv('REDIS_URL', ''),
+            'DATABASE_URL': os.getenv('DATABASE_URL', 'sqlite://'),
+            'OUTBOX_DISPATCHER': '0', 'JOBS_WORKERS': '0', 'RESERVATION_SWEEPER': '0', 'STOCK_ALERTS': '0'}
+
+
+def run_case(name, repeat):
+    if name == 'cli':
+        command = [sys.executable, '-X', 'importtime', '-m', 'flask', '--app', 'manage.py', 'ledger', '--help']
+    else:
+        command = [sys.executable, '-X', 'importtime', '-c', f'{CASES[name]}; {REPORT}']
+    samples, stderr, stdout = [], '', ''
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = subprocess.run(command, cwd=BACKEND_DIR, env=_env(), capture_output=True, text=True)
+        samples.append((time.perf_counter() - start) * 1000)
+        if result.returncode != 0:
+            raise RuntimeError(f'{name} failed: {result.stderr[-500:]}')
+        stderr, stdout = result.stderr, result.stdout
+
+    # Waktu import (self) dijumlahkan per package top-level, dari run terakhir
+    packages = {}
+    for line in stderr.splitlines():
+        match = IMPORT_RE.match(line)
+        if match:
+            top = match.group(2).split('.')[0]
+            packages[top] = packages.get(top, 0) + int(match.group(1))
+    report = json.loads(stdout.strip().splitlines()[-1]) if name != 'cli' else {}
+    return {'ms': statistics.median(samples), 'min': min(samples),
+            'modules': report.get('modules', sum(1 for line in stderr.splitlines() if IMPORT_RE.match(line))),
+            'socketio': report.get('socketio'), 'loaded': report.get('loaded', []),
+            'top': sorted(packages.items(), key=lambda item: -item[1])[:5]}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--cases', nargs='+', default=list(CASES) + ['cli'], choices=list(CASES) + ['cli'])
+    parser.add_argument('--budget', action='append', default=[], metavar='CASE=MS')
+    args = parser.parse_args()
+    budgets = dict(BUDGETS)
+    for item in args.budget:
+        name, _, ms = item.partition('=')
+        budgets[name] = float(ms)
+
+    results = {name: run_case(name, args.repeat) for name in args.cases}
+    print(f'{"case":<8} {"median":>8} {"min":>8} {"budget":>7} {"modules":>8}  slowest top-level imports (ms)')
+    for name, r in results.items():
+        top = ', '.join(f'{pkg} {us / 1000:.0f}' for pkg, us in r['top'])
+        print(f'{name:<8} {r["ms"]:>8.0f} {r["min"]:>8.0f} {budgets[name]:>7.0f} {r["modules"]:>8}  {top}')
+
+    over = {name: round(r['ms']) for name, r in results.items() if r['ms'] > budgets[name]}
+    assert not over, f'over budget: {over}'
+    if 'light' in results:
+        light = results['light']
+        assert not light['socketio'] and not light['loaded'], f'light mode loaded {light["loaded"]}'
+        if 'full' in results:
+            print(f'light saves {results["full"]["ms"] - light["ms"]:.0f} ms and '
+                  f'{results["full"]["modules"] - light["modules"]} modules vs full')
+
+
+if __name__ == '__main__':
+    main()
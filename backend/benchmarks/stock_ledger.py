@@ -0,0 +1,166 @@
+"""Stress test ledger stok: order, retur dan bulk adjustment bersamaan, dengan retry ber-Idempotency-Key.
+
+    python -m benchmarks.stock_ledger --workers 16 --operations 200
+
+Default-nya file SQLite sementara (koneksi per worker); set DATABASE_URL ke MySQL untuk
+uji row locking sebenarnya. Request yang gagal (5xx, database locked) di-retry dengan key
+yang sama, sebagian request sukses juga dikirim ulang. Di akhir:
+- stok gudang tersedia (quantity - reserved) = stok awal - order + retur disetujui + delta bulk,
+  masing-masing tepat sekali; reserved = SUM reservasi aktif
+- sebagian retur di-approve dua kali bersamaan (key berbeda): stok tetap dikembalikan sekali
+- setiap key menghasilkan tepat satu order
+- SUM(delta) ledger = saldo cache (reconcile tanpa drift) dan tidak ada saldo minus
+- ringkasan product_availability sama dengan rebuild dari stocks dan ledger
+"""
+import argparse
+import os
+import queue
+import random
+import statistics
+import tempfile
+import threading
+import time
+import uuid
+
+if 'DATABASE_URL' not in os.environ:
+    os.environ['DATABASE_URL'] = f'sqlite:///{tempfile.mkdtemp()}/stock_ledger.db'
+
+from .common import make_app, auth_headers
+from .seed import seed
+from app.ledger import reconcile
+from app import reservations, availability
+from app.models import db, Stock, ResellerStock, ReturnRequest, OrderRequest
+
+MAX_ATTEMPTS = 30
+
+
+def _send(client, method, path, headers, body, retry_rate, rng):
+    """Kirim sampai tidak 5xx (key sama setiap kali); kadang kirim ulang walaupun sudah sukses."""
+    headers = {**headers, 'Idempotency-Key': uuid.uuid4().hex}
+    for _ in range(MAX_ATTEMPTS):
+        response = client.open(path, method=method, headers=headers, json=body)
+        if response.status_code < 500:
+            break
+        time.sleep(0.005)
+    else:
+        raise RuntimeError(f'{method} {path} kept failing: {response.status_code}')
+    first = response
+    if rng.random() < retry_rate:
+        response = client.open(path, method=method, headers=headers, json=body)
+    return first, response
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--workers', type=int, default=16)
+    parser.add_argument('--operations', type=int, default=200, help='operasi per worker')
+    parser.add_argument('--products', type=int, default=20)
+    parser.add_argument('--retry-rate', type=float, default=0.3)
+    args = parser.parse_args()
+
+    app = make_app()
+    with app.app_context():
+        seed(resellers=args.workers, products=args.products, orders=2000, returns=args.workers * args.operations,
+             reseller_stock=True, stock_range=(200, 400))
+        initial = dict(db.session.execute(db.select(Stock.product_id, Stock.quantity)).all())
+        returns = queue.Queue()
+        for i, row in enumerate(db.session.execute(
+                db.select(ReturnRequest.id, ReturnRequest.product_id, ReturnRequest.quantity)
+                .where(ReturnRequest.status == 'pending'))):
+            # Retur yang sama diambil dua worker berturut-turut -> approve bersamaan
+            for _ in range(2 if i % 4 == 0 else 1):
+                returns.put(tuple(row))
+        orders_before = db.session.scalar(db.select(db.func.count(OrderRequest.id)))
+        admin = auth_headers(1, 'admin')
+        resellers = [auth_headers(r, 'reseller') for r in range(1, args.workers + 1)]
+
+    expected = dict(initial)
+    created_orders = []
+    latencies = {'order': [], 'return': [], 'bulk': []}
+    mismatched_replays = []
+    approved_returns = {}
+    lock = threading.Lock()
+
+    def worker(n):
+        rng = random.Random(n)
+        client = app.test_client()
+        for _ in range(args.operations):
+            kind = rng.choice(['order', 'order', 'return', 'bulk'])
+            start = time.perf_counter()
+            if kind == 'order':
+                lines = {p: rng.randint(1, 3) for p in rng.sample(range(1, args.products + 1), 2)}
+                first, last = _send(client, 'POST', '/api/reseller/orders', resellers[n], {
+                    'products': [{'product_id': p, 'quantity': q} for p, q in lines.items()]
+                }, args.retry_rate, rng)
+                changes = {p: -q for p, q in lines.items()} if first.status_code == 201 else {}
+                if changes:
+                    with lock:
+                        created_orders.append(first.get_json()['id'])
+                        if last.get_json().get('id') != first.get_json()['id']:
+                            mismatched_replays.append(first.get_json()['id'])
+            elif kind == 'return':
+                try:
+                    return_id, product_id, quantity = returns.get_nowait()
+                except queue.Empty:
+                    continue
+                first, _ = _send(client, 'PUT', '/api/admin/returns', admin,
+                                 {'return_id': return_id, 'status': 'approved'}, args.retry_rate, rng)
+                changes = {}
+                if first.status_code == 200:
+                    # Dihitung per retur: approve kedua tidak boleh mengembalikan stok lagi
+                    with lock:
+                        approved_returns[return_id] = (product_id, quantity)
+            else:
+                adjustments = [{'product_id': p, 'delta': rng.randint(-5, 10)}
+                               for p in rng.sample(range(1, args.products + 1), 3)]
+                first, _ = _send(client, 'POST', '/api/admin/stock/bulk', admin,
+                                 {'adjustments': adjustments}, args.retry_rate, rng)
+                changes = {}
+                for result in first.get_json()['results']:
+                    # 'duplicate' di respons pertama: percobaan sebelumnya (yang berakhir 5xx,
+                    # mis. commit akhir database locked) sudah menerapkan chunk ini
+                    if result['status'] in ('applied', 'duplicate'):
+                        row = adjustments[result['row']]
+                        changes[row['product_id']] = changes.get(row['product_id'], 0) + row['delta']
+            with lock:
+                latencies[kind].append((time.perf_counter() - start) * 1000)
+                for product_id, delta in changes.items():
+                    expected[product_id] += delta
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(args.workers)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    for product_id, quantity in approved_returns.values():
+        expected[product_id] += quantity
+
+    total = sum(len(v) for v in latencies.values())
+    print(f'{total} operations in {elapsed:.2f}s ({total / elapsed:.0f} ops/s), {args.workers} workers')
+    for kind, samples in latencies.items():
+        if samples:
+            samples.sort()
+            print(f'  {kind:<7} n={len(samples):<5} p50={statistics.median(samples):.1f}ms '
+                  f'p99={samples[int(len(samples) * 0.99) - 1]:.1f}ms')
+
+    with app.app_context():
+        final = dict(db.session.execute(db.select(Stock.product_id, Stock.quantity - Stock.reserved)).all())
+        orders_after = db.session.scalar(db.select(db.func.count(OrderRequest.id)))
+        negative = db.session.scalar(db.select(db.func.count(Stock.id)).where(Stock.quantity < 0)) + \
+            db.session.scalar(db.select(db.func.count(ResellerStock.id)).where(ResellerStock.quantity < 0))
+        drift = reconcile(fix=False) + reservations.reconcile(fix=False) + availability.rebuild(fix=False)
+
+    wrong = {p: (final[p], expected[p]) for p in final if final[p] != expected[p]}
+    print(f'orders created: {orders_after - orders_before} (expected {len(created_orders)}), '
+          f'wrong balances: {len(wrong)}, ledger drift: {len(drift)}, negative: {negative}')
+    assert not wrong, f'warehouse balance != expected: {wrong}'
+    assert orders_after - orders_before == len(created_orders), 'retried order created twice'
+    assert not mismatched_replays, f'replay returned a different order: {mismatched_replays}'
+    assert not drift, f'ledger drift: {drift[:5]}'
+    assert not negative
+
+
+if __name__ == '__main__':
+    main()
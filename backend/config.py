@@ -3,22 +3,145 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+DATABASE_URI = os.getenv('DATABASE_URL') or f"mysql+pymysql://{os.getenv('DB_USER')}:{os.getenv('DB_PASSWORD')}@{os.getenv('DB_HOST')}/{os.getenv('DB_NAME')}"
+REPLICA_DATABASE_URI = os.getenv('REPLICA_DATABASE_URL')
+
+
+def engine_options(uri, pool_size, max_overflow):
+    # Pool hanya dituning untuk MySQL; SQLite (benchmark) memakai pool bawaan Flask-SQLAlchemy.
+    # Koneksi maksimum ke MySQL = (pool_size + max_overflow) x jumlah worker
+    if not uri or not uri.startswith('mysql'):
+        return {}
+    return {
+        'pool_size': int(os.getenv('DB_POOL_SIZE', pool_size)),
+        'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', max_overflow)),
+        # Gagal cepat saat pool habis daripada menumpuk request yang menunggu
+        'pool_timeout': float(os.getenv('DB_POOL_TIMEOUT', 5)),
+        # Di bawah wait_timeout MySQL, supaya koneksi idle tidak "gone away"
+        'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', 280)),
+        'pool_pre_ping': True,
+        # LIFO: koneksi yang jarang dipakai menua dan di-recycle, bukan semua sekaligus
+        'pool_use_lifo': True,
+        'connect_args': {
+            'connect_timeout': int(os.getenv('DB_CONNECT_TIMEOUT', 5)),
+            'read_timeout': int(os.getenv('DB_READ_TIMEOUT', 30)),
+            'write_timeout': int(os.getenv('DB_WRITE_TIMEOUT', 30)),
+        },
+    }
+
+
+def replica_binds(pool_size, max_overflow):
+    if not REPLICA_DATABASE_URI:
+        return {}
+    return {'replica': {'url': REPLICA_DATABASE_URI,
+                        **engine_options(REPLICA_DATABASE_URI, pool_size, max_overflow)}}
+
+
 class Config:
     SECRET_KEY = os.getenv('SECRET_KEY')
     JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY')
     
     # Database configuration
-    SQLALCHEMY_DATABASE_URI = f"mysql+pymysql://{os.getenv('DB_USER')}:{os.getenv('DB_PASSWORD')}@{os.getenv('DB_HOST')}/{os.getenv('DB_NAME')}"
+    SQLALCHEMY_DATABASE_URI = DATABASE_URI
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(DATABASE_URI, pool_size=10, max_overflow=10)
+    
+    # Read replica opsional (REPLICA_DATABASE_URL): request GET membaca dari sini
+    SQLALCHEMY_BINDS = replica_binds(pool_size=10, max_overflow=10)
+    # Endpoint GET yang tetap membaca dari primary (butuh data terbaru)
+    READ_REPLICA_EXCLUDE = ('admin.outbox_status', 'admin.job_status', 'profiler')
     
-    # SocketIO configuration
+    # SocketIO configuration; dengan beberapa instance (serve.py) Redis ini yang meneruskan
+    # emit dari satu instance ke client yang terhubung di instance lain
     SOCKETIO_MESSAGE_QUEUE = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
+    # Log setiap paket Socket.IO/Engine.IO (debugging); mati di produksi
+    SOCKETIO_LOGGER = os.getenv('SOCKETIO_LOGGER', '0') == '1'
+    SOCKETIO_ENGINEIO_LOGGER = os.getenv('SOCKETIO_ENGINEIO_LOGGER', '0') == '1'
+    
+    # Jumlah reverse proxy di depan app (nginx/haproxy, lihat deploy/); 0 = request langsung.
+    # Dipakai supaya remote_addr (rate limit login per IP) adalah IP client, bukan proxy
+    PROXY_FIX_X_FOR = int(os.getenv('PROXY_FIX_X_FOR', 0))
+    
+    # Cache (katalog produk, dll.) memakai Redis yang sama secara default
+    CACHE_REDIS_URL = os.getenv('CACHE_REDIS_URL', SOCKETIO_MESSAGE_QUEUE)
+    
+    # Response JSON di-encode dengan orjson kalau tersedia
+    JSON_USE_ORJSON = True
+    
+    # Hash password (pbkdf2) dijalankan di thread pool, bukan di worker request
+    PASSWORD_HASH_OFFLOAD = os.getenv('PASSWORD_HASH_OFFLOAD', '1') == '1'
+    PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', 4))
+    
+    # Rate limit login (per jendela waktu, dalam detik)
+    LOGIN_RATE_LIMIT_WINDOW = int(os.getenv('LOGIN_RATE_LIMIT_WINDOW', 60))
+    LOGIN_RATE_LIMIT_ACCOUNT = int(os.getenv('LOGIN_RATE_LIMIT_ACCOUNT', 10))
+    LOGIN_RATE_LIMIT_IP = int(os.getenv('LOGIN_RATE_LIMIT_IP', 50))
+    
+    # Outbox event Socket.IO: dispatcher background mempublish event setelah commit
+    OUTBOX_DISPATCHER = os.getenv('OUTBOX_DISPATCHER', '1') == '1'
+    OUTBOX_POLL_INTERVAL = float(os.getenv('OUTBOX_POLL_INTERVAL', 1.0))
+    OUTBOX_BATCH_SIZE = int(os.getenv('OUTBOX_BATCH_SIZE', 100))
+    OUTBOX_MAX_ATTEMPTS = int(os.getenv('OUTBOX_MAX_ATTEMPTS', 10))
+    OUTBOX_RETRY_BASE = float(os.getenv('OUTBOX_RETRY_BASE', 0.5))
+    OUTBOX_RETENTION = int(os.getenv('OUTBOX_RETENTION', 86400))
+    # SELECT ... FOR UPDATE SKIP LOCKED (MySQL 8+); matikan untuk MySQL 5.7
+    OUTBOX_LOCK_ROWS = os.getenv('OUTBOX_LOCK_ROWS', '1') == '1'
+    
+    # Listing stok reseller: batas low_stock default, dan seberapa jauh mode delta
+    # mengulang ke belakang dari watermark (commit yang terlambat, lag replica)
+    LOW_STOCK_THRESHOLD = int(os.getenv('LOW_STOCK_THRESHOLD', 5))
+    RESELLER_STOCK_DELTA_OVERLAP = int(os.getenv('RESELLER_STOCK_DELTA_OVERLAP', 30))
+    
+    # Antrian job background (app/jobs.py), mis. kredit stok reseller saat order delivered
+    JOBS_REDIS_URL = os.getenv('JOBS_REDIS_URL', SOCKETIO_MESSAGE_QUEUE)
+    JOBS_QUEUE = os.getenv('JOBS_QUEUE', 'jobs')
+    JOBS_WORKERS = int(os.getenv('JOBS_WORKERS', 2))
+    JOBS_POLL_TIMEOUT = int(os.getenv('JOBS_POLL_TIMEOUT', 1))
+    JOBS_MAX_ATTEMPTS = int(os.getenv('JOBS_MAX_ATTEMPTS', 5))
+    JOBS_RETRY_BASE = float(os.getenv('JOBS_RETRY_BASE', 1.0))
+    # Job yang lebih lama dari ini di list processing dianggap worker-nya mati
+    JOBS_VISIBILITY_TIMEOUT = int(os.getenv('JOBS_VISIBILITY_TIMEOUT', 300))
+    
+    # Counter dashboard global (app/analytics.py) dipecah ke sekian baris per bucket supaya
+    # order yang bersamaan tidak antre di row lock yang sama
+    ANALYTICS_COUNTER_SHARDS = int(os.getenv('ANALYTICS_COUNTER_SHARDS', 8))
+    
+    # Reservasi stok order pending (app/reservations.py); order yang tidak diproses sebelum
+    # TTL habis di-reject oleh sweeper dan stoknya kembali tersedia
+    RESERVATION_TTL = int(os.getenv('RESERVATION_TTL', 86400))
+    RESERVATION_SWEEPER = os.getenv('RESERVATION_SWEEPER', '1') == '1'
+    RESERVATION_SWEEP_INTERVAL = int(os.getenv('RESERVATION_SWEEP_INTERVAL', 30))
+    RESERVATION_SWEEP_BATCH = int(os.getenv('RESERVATION_SWEEP_BATCH', 500))
+    
+    # Ringkasan stok per produk (app/availability.py): produk low stock kalau tersedia <=
+    # threshold atau stoknya habis dalam <= COVER_DAYS hari dengan rata-rata penjualan 30 hari.
+    # Alert dikirim ke /admin per batch setiap STOCK_ALERT_INTERVAL detik
+    STOCK_ALERTS = os.getenv('STOCK_ALERTS', '1') == '1'
+    STOCK_ALERT_THRESHOLD = int(os.getenv('STOCK_ALERT_THRESHOLD', LOW_STOCK_THRESHOLD))
+    STOCK_ALERT_COVER_DAYS = float(os.getenv('STOCK_ALERT_COVER_DAYS', 7))
+    STOCK_ALERT_INTERVAL = int(os.getenv('STOCK_ALERT_INTERVAL', 60))
+    STOCK_ALERT_BATCH = int(os.getenv('STOCK_ALERT_BATCH', 200))
+    
+    # Instrumentasi opt-in: /metrics (Prometheus), statistik SQL per request, slow query log
+    INSTRUMENTATION = os.getenv('INSTRUMENTATION', '0') == '1'
+    SLOW_QUERY_MS = float(os.getenv('SLOW_QUERY_MS', 200))
+    # Tanpa METRICS_TOKEN, /metrics hanya dilayani ke loopback (bukan lewat proxy)
+    METRICS_TOKEN = os.getenv('METRICS_TOKEN')
+    # Sampling profiler untuk satu endpoint (mis. reseller.order_operations)
+    PROFILE_ENDPOINT = os.getenv('PROFILE_ENDPOINT')
+    PROFILE_INTERVAL = float(os.getenv('PROFILE_INTERVAL', 0.005))
     
 class DevelopmentConfig(Config):
     DEBUG = True
+    SOCKETIO_LOGGER = os.getenv('SOCKETIO_LOGGER', '1') == '1'
+    SOCKETIO_ENGINEIO_LOGGER = os.getenv('SOCKETIO_ENGINEIO_LOGGER', '1') == '1'
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(DATABASE_URI, pool_size=5, max_overflow=5)
+    SQLALCHEMY_BINDS = replica_binds(pool_size=5, max_overflow=5)
 
 class ProductionConfig(Config):
     DEBUG = False
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(DATABASE_URI, pool_size=10, max_overflow=20)
+    SQLALCHEMY_BINDS = replica_binds(pool_size=20, max_overflow=20)
 
 config = {
     'development': DevelopmentConfig,
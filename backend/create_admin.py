@@ -3,8 +3,8 @@ from app import create_app, db
 from app.models import Admin
 
 def create_admin(username, password, email, name="Administrator"):
-    # Membuat aplikasi Flask
-    app = create_app()
+    # Membuat aplikasi Flask (mode light: tanpa Socket.IO/Redis dan route HTTP)
+    app = create_app(light=True)
     
     # Push context aplikasi
     with app.app_context():
@@ -0,0 +1,22 @@
+# Konfigurasi gunicorn untuk wsgi:app, dibaca dengan `gunicorn -c gunicorn.conf.py wsgi:app`.
+# Semua nilai bisa di-override lewat environment (serve.py mengisi PORT per instance).
+import os
+
+bind = f"{os.getenv('HOST', '127.0.0.1')}:{os.getenv('PORT', '5000')}"
+
+# Socket.IO long-polling butuh sticky session dan gunicorn tidak bisa merutekan request
+# ke worker tertentu, jadi satu worker eventlet per instance. Scale-out = banyak instance
+# di port berbeda di belakang load balancer sticky (deploy/nginx.conf, deploy/haproxy.cfg)
+worker_class = 'eventlet'
+workers = 1
+worker_connections = int(os.getenv('WORKER_CONNECTIONS', 1000))
+
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 60))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', 5))
+
+# Access log mati secara default ('-' untuk stdout); error log ke stderr
+accesslog = os.getenv('GUNICORN_ACCESS_LOG')
+errorlog = '-'
+loglevel = os.getenv('GUNICORN_LOG_LEVEL', 'info')
+proc_name = f"wps-backend-{os.getenv('PORT', '5000')}"
@@ -1,9 +1,29 @@
 import os
+
+# Server development (python manage.py): eventlet harus di-monkeypatch sebelum import lain,
+# socket pymysql dan lock pool SQLAlchemy jadi green sehingga query tidak menahan seluruh
+# event loop. Command CLI (`flask --app manage db upgrade`) tidak butuh dan tidak di-patch:
+# flask sudah mengimpor modulnya lebih dulu, patch terlambat hanya mencetak traceback
+if __name__ == '__main__' and os.getenv('EVENTLET_MONKEY_PATCH', '1') == '1':
+    try:
+        import eventlet
+        eventlet.monkey_patch()
+    except ImportError:
+        pass
+
 from app import create_app, socketio
-from flask_migrate import Migrate
+from app.outbox import start_dispatcher
+from app.jobs import start_workers
+from app.reservations import start_sweeper
+from app.availability import start_stock_alerts
 
+# Flask-Migrate (`flask db ...`) sudah didaftarkan create_app
 app = create_app(os.getenv('FLASK_CONFIG') or 'development')
-migrate = Migrate(app)
 
+# Server development (satu proses, debug); produksi lewat gunicorn, lihat serve.py dan wsgi.py
 if __name__ == '__main__':
+    start_dispatcher(app)
+    start_workers(app)
+    start_sweeper(app)
+    start_stock_alerts(app)
     socketio.run(app, debug=True)
\ No newline at end of file
@@ -0,0 +1,54 @@
+"""add product availability
+
+Revision ID: a3c9e5d72b18
+Revises: f17b2c9d4e63
+Create Date: 2026-10-19 01:42:17.318604
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a3c9e5d72b18'
+down_revision = 'f17b2c9d4e63'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('product_availability',
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('on_hand', sa.Integer(), nullable=False),
+    sa.Column('reserved', sa.Integer(), nullable=False),
+    sa.Column('available', sa.Integer(), nullable=False),
+    sa.Column('sold_30d', sa.Integer(), nullable=False),
+    sa.Column('days_of_cover', sa.Float(), nullable=True),
+    sa.Column('low_stock', sa.Boolean(), nullable=False),
+    sa.Column('alert_pending', sa.Boolean(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['product_id'], ['products.id'], ),
+    sa.PrimaryKeyConstraint('product_id')
+    )
+    op.create_index('ix_product_availability_alert_pending', 'product_availability', ['alert_pending'], unique=False)
+    op.create_table('product_sales_daily',
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('product_id', 'day')
+    )
+    # Saldo awal dari stocks; sold_30d dan penjualan harian diisi `flask availability rebuild`
+    # dari ledger setelah upgrade. low_stock dihitung ulang di situ (dan saat task alert start),
+    # jadi produk yang sudah rendah dikirim sebagai stock_alert pertama
+    op.execute(
+        "INSERT INTO product_availability (product_id, on_hand, reserved, available, sold_30d, "
+        "low_stock, alert_pending, updated_at) "
+        "SELECT product_id, quantity, reserved, quantity - reserved, 0, false, false, CURRENT_TIMESTAMP "
+        "FROM stocks"
+    )
+
+
+def downgrade():
+    op.drop_table('product_sales_daily')
+    op.drop_index('ix_product_availability_alert_pending', table_name='product_availability')
+    op.drop_table('product_availability')
@@ -0,0 +1,34 @@
+"""add analytics counters
+
+Revision ID: a7d24e91c5f3
+Revises: 3f1a9c2e7b41
+Create Date: 2026-10-18 13:40:21.504117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7d24e91c5f3'
+down_revision = '3f1a9c2e7b41'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('analytics_counters',
+    sa.Column('metric', sa.String(length=32), nullable=False),
+    sa.Column('bucket', sa.String(length=32), nullable=False),
+    sa.Column('value', sa.Float(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=True),
+    sa.PrimaryKeyConstraint('metric', 'bucket')
+    )
+    op.create_index('ix_analytics_counters_metric_value', 'analytics_counters', ['metric', 'value'], unique=False)
+
+    # Isi awal counter: jalankan `flask analytics rebuild` setelah upgrade
+
+
+def downgrade():
+    op.drop_index('ix_analytics_counters_metric_value', table_name='analytics_counters')
+    op.drop_table('analytics_counters')
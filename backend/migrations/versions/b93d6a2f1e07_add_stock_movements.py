@@ -0,0 +1,48 @@
+"""add stock movements
+
+Revision ID: b93d6a2f1e07
+Revises: e5b71f0c4a28
+Create Date: 2026-10-18 20:47:13.559102
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b93d6a2f1e07'
+down_revision = 'e5b71f0c4a28'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('stock_movements',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('reseller_id', sa.Integer(), nullable=True),
+    sa.Column('delta', sa.Integer(), nullable=False),
+    sa.Column('balance', sa.Integer(), nullable=False),
+    sa.Column('reason', sa.String(length=20), nullable=False),
+    sa.Column('reference', sa.String(length=50), nullable=True),
+    sa.Column('idempotency_key', sa.String(length=160), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('idempotency_key')
+    )
+    op.create_index('ix_stock_movements_product_id_reseller_id_delta', 'stock_movements', ['product_id', 'reseller_id', 'delta'], unique=False)
+
+    # Saldo yang sudah ada menjadi movement pembuka, supaya SUM(delta) = saldo cache
+    op.execute(
+        "INSERT INTO stock_movements (product_id, reseller_id, delta, balance, reason, created_at) "
+        "SELECT product_id, NULL, quantity, quantity, 'opening', CURRENT_TIMESTAMP FROM stocks WHERE quantity <> 0"
+    )
+    op.execute(
+        "INSERT INTO stock_movements (product_id, reseller_id, delta, balance, reason, created_at) "
+        "SELECT product_id, reseller_id, quantity, quantity, 'opening', CURRENT_TIMESTAMP FROM reseller_stocks WHERE quantity <> 0"
+    )
+
+
+def downgrade():
+    op.drop_index('ix_stock_movements_product_id_reseller_id_delta', table_name='stock_movements')
+    op.drop_table('stock_movements')
@@ -0,0 +1,38 @@
+"""add outbox events
+
+Revision ID: c2e85b3f9d16
+Revises: a7d24e91c5f3
+Create Date: 2026-10-18 15:02:37.811649
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c2e85b3f9d16'
+down_revision = 'a7d24e91c5f3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('outbox_events',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('namespace', sa.String(length=32), nullable=False),
+    sa.Column('room', sa.String(length=64), nullable=True),
+    sa.Column('event', sa.String(length=64), nullable=False),
+    sa.Column('payload', sa.JSON(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('next_attempt_at', sa.DateTime(), nullable=True),
+    sa.Column('published_at', sa.DateTime(), nullable=True),
+    sa.Column('last_error', sa.String(length=255), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_outbox_events_published_at_next_attempt_at', 'outbox_events', ['published_at', 'next_attempt_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_outbox_events_published_at_next_attempt_at', table_name='outbox_events')
+    op.drop_table('outbox_events')
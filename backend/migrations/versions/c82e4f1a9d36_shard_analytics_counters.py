@@ -0,0 +1,37 @@
+"""shard analytics counters
+
+Revision ID: c82e4f1a9d36
+Revises: a3c9e5d72b18
+Create Date: 2026-10-19 03:12:45.208311
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c82e4f1a9d36'
+down_revision = 'a3c9e5d72b18'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Baris yang sudah ada menjadi shard 0; counter global berikutnya tersebar ke shard lain
+    op.add_column('analytics_counters', sa.Column('shard', sa.SmallInteger(), server_default='0', nullable=False))
+    op.drop_constraint('PRIMARY', 'analytics_counters', type_='primary')
+    op.create_primary_key('PRIMARY', 'analytics_counters', ['metric', 'bucket', 'shard'])
+
+
+def downgrade():
+    # Gabungkan shard kembali ke satu baris per (metric, bucket)
+    op.execute(
+        "UPDATE analytics_counters c JOIN ("
+        " SELECT metric, bucket, SUM(value) AS total FROM analytics_counters GROUP BY metric, bucket"
+        ") t ON t.metric = c.metric AND t.bucket = c.bucket"
+        " SET c.value = t.total WHERE c.shard = 0"
+    )
+    op.execute("DELETE FROM analytics_counters WHERE shard <> 0")
+    op.drop_constraint('PRIMARY', 'analytics_counters', type_='primary')
+    op.create_primary_key('PRIMARY', 'analytics_counters', ['metric', 'bucket'])
+    op.drop_column('analytics_counters', 'shard')
@@ -0,0 +1,49 @@
+"""add search indexes
+
+Revision ID: e5b71f0c4a28
+Revises: c2e85b3f9d16
+Create Date: 2026-10-18 18:21:06.402517
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5b71f0c4a28'
+down_revision = 'c2e85b3f9d16'
+branch_labels = None
+depends_on = None
+
+FULLTEXT = [
+    ('ft_products', 'products', ['name', 'description', 'brand', 'category']),
+    ('ft_order_requests', 'order_requests', ['notes']),
+    ('ft_shipping_info', 'shipping_info', ['tracking_number', 'carrier']),
+    ('ft_return_requests', 'return_requests', ['reason']),
+]
+
+
+def _is_mysql():
+    return op.get_bind().dialect.name in ('mysql', 'mariadb')
+
+
+def upgrade():
+    # Fast path pencarian nomor order / resi
+    op.create_index(op.f('ix_shipping_info_order_id'), 'shipping_info', ['order_id'], unique=False)
+    op.create_index(op.f('ix_shipping_info_tracking_number'), 'shipping_info', ['tracking_number'], unique=False)
+
+    # Index FULLTEXT hanya untuk MySQL; SQLite memakai tabel FTS5 (`flask search rebuild`)
+    if _is_mysql():
+        for name, table, columns in FULLTEXT:
+            op.create_index(name, table, columns, unique=False, mysql_prefix='FULLTEXT')
+
+
+def downgrade():
+    if _is_mysql():
+        for name, table, _ in reversed(FULLTEXT):
+            op.drop_index(name, table_name=table)
+
+    op.drop_index(op.f('ix_shipping_info_tracking_number'), table_name='shipping_info')
+    # MySQL memakai ix_shipping_info_order_id untuk foreign key, pasang index FK biasa dulu
+    op.create_index('fk_shipping_info_order_id', 'shipping_info', ['order_id'], unique=False)
+    op.drop_index(op.f('ix_shipping_info_order_id'), table_name='shipping_info')
@@ -0,0 +1,44 @@
+"""add stock reservations
+
+Revision ID: f17b2c9d4e63
+Revises: d4a83c6e2f95
+Create Date: 2026-10-18 23:18:02.734915
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f17b2c9d4e63'
+down_revision = 'd4a83c6e2f95'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Order pending yang sudah ada tetap memakai stok yang dipotong saat dibuat
+    # (tanpa baris reservasi); hanya order baru yang memakai reservasi
+    op.add_column('stocks', sa.Column('reserved', sa.Integer(), server_default='0', nullable=False))
+    op.create_table('stock_reservations',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('order_id', sa.Integer(), nullable=False),
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(length=10), nullable=False),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.Column('idempotency_key', sa.String(length=160), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['order_id'], ['order_requests.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('idempotency_key')
+    )
+    op.create_index(op.f('ix_stock_reservations_order_id'), 'stock_reservations', ['order_id'], unique=False)
+    op.create_index('ix_stock_reservations_status_expires_at', 'stock_reservations', ['status', 'expires_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_stock_reservations_status_expires_at', table_name='stock_reservations')
+    op.drop_index(op.f('ix_stock_reservations_order_id'), table_name='stock_reservations')
+    op.drop_table('stock_reservations')
+    op.drop_column('stocks', 'reserved')
@@ -0,0 +1,88 @@
+"""Jalankan N instance gunicorn (wsgi:app, satu worker eventlet) di port berurutan.
+
+    python serve.py --instances 4 --base-port 5001
+
+Load balancer sticky di depannya (deploy/nginx.conf atau deploy/haproxy.cfg) menjaga client
+Socket.IO tetap di instance yang sama; emit dari instance mana pun sampai ke client di
+instance lain lewat Redis (REDIS_URL / SOCKETIO_MESSAGE_QUEUE). Instance yang mati
+dijalankan ulang.
+"""
+import argparse
+import os
+import signal
+import subprocess
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+# Task background yang dimatikan di instance selain yang pertama (--background first)
+BACKGROUND_OFF = {'OUTBOX_DISPATCHER': '0', 'JOBS_WORKERS': '0', 'RESERVATION_SWEEPER': '0', 'STOCK_ALERTS': '0'}
+
+
+def redis_reachable(url):
+    try:
+        import redis
+    except ImportError:
+        return False
+    try:
+        return redis.Redis.from_url(url, socket_connect_timeout=1).ping()
+    except redis.RedisError:
+        return False
+
+
+def spawn(index, port, background='all', env=None, stdout=None):
+    env = {**os.environ, **(env or {}), 'PORT': str(port)}
+    env.setdefault('FLASK_CONFIG', 'production')
+    if background == 'none' or (background == 'first' and index > 0):
+        env.update(BACKGROUND_OFF)
+    return subprocess.Popen([sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'wsgi:app'],
+                            cwd=BACKEND_DIR, env=env, stdout=stdout, stderr=stdout)
+
+
+def start(instances, base_port, background='all', env=None, stdout=None):
+    """Mulai instance di base_port .. base_port + instances - 1; mengembalikan {port: Popen}."""
+    url = (env or {}).get('REDIS_URL') or os.getenv('REDIS_URL', 'redis://localhost:6379/0')
+    if instances > 1 and not redis_reachable(url):
+        raise RuntimeError(f'Redis at {url} is required to run more than one instance')
+    return {base_port + i: spawn(i, base_port + i, background, env, stdout) for i in range(instances)}
+
+
+def stop(processes, timeout=30):
+    for process in processes.values():
+        if process.poll() is None:
+            process.terminate()
+    deadline = time.monotonic() + timeout
+    for process in processes.values():
+        try:
+            process.wait(max(deadline - time.monotonic(), 0.1))
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--instances', type=int, default=int(os.getenv('INSTANCES', 2)))
+    parser.add_argument('--base-port', type=int, default=int(os.getenv('BASE_PORT', 5001)))
+    parser.add_argument('--background', choices=('all', 'first', 'none'), default='all',
+                        help='instance yang menjalankan outbox dispatcher, job worker, sweeper dan stock alert')
+    args = parser.parse_args()
+
+    processes = start(args.instances, args.base_port, args.background)
+    print(f'{args.instances} instances on ports {args.base_port}-{args.base_port + args.instances - 1}')
+
+    stopping = []
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda *_: stopping.append(True))
+    try:
+        while not stopping:
+            for index, (port, process) in enumerate(sorted(processes.items())):
+                if process.poll() is not None:
+                    print(f'instance on port {port} exited with {process.returncode}, restarting')
+                    processes[port] = spawn(index, port, args.background)
+            time.sleep(1)
+    finally:
+        stop(processes)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,11 @@
+# Regresi N+1: jumlah query listing order konstan dan tidak lebih dari MAX_QUERIES
+#
+#     cd backend && python -m pytest tests
+from benchmarks import order_listing_queries
+
+
+def test_order_listing_query_count_is_constant():
+    counts = order_listing_queries.measure(orders=200)
+    # Halaman terbesar harus benar-benar berisi banyak baris, kalau tidak N+1 tidak terlihat
+    assert counts[100][0] > 10
+    order_listing_queries.check(counts)
@@ -0,0 +1,27 @@
+import os
+
+# Entry point produksi: gunicorn -c gunicorn.conf.py wsgi:app (banyak instance lewat serve.py).
+# Worker eventlet gunicorn sudah me-monkeypatch sebelum app di-load, jadi default-nya mati;
+# EVENTLET_MONKEY_PATCH=1 hanya untuk server lain yang memuat modul ini sebelum import apa pun
+# (bukan CLI `flask --app wsgi ...`: patch yang terlambat hanya mencetak traceback)
+if os.getenv('EVENTLET_MONKEY_PATCH', '0') == '1':
+    try:
+        import eventlet
+        eventlet.monkey_patch()
+    except ImportError:
+        pass
+
+from app import create_app
+from app.outbox import start_dispatcher
+from app.jobs import start_workers
+from app.reservations import start_sweeper
+from app.availability import start_stock_alerts
+
+app = create_app(os.getenv('FLASK_CONFIG') or 'production')
+
+# Task background per instance; matikan lewat OUTBOX_DISPATCHER=0, JOBS_WORKERS=0,
+# RESERVATION_SWEEPER=0, STOCK_ALERTS=0 (serve.py --background first hanya menyalakannya di instance pertama)
+start_dispatcher(app)
+start_workers(app)
+start_sweeper(app)
+start_stock_alerts(app)
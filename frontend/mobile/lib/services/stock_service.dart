@@ -13,12 +13,18 @@ class StockService {
 
   Future<List<ResellerStock>> getStock() async {
     try {
-      final response = await ref.read(apiServiceProvider).get('/stock');
-      
-      // Backend returns array of objects with 'product' and 'quantity' fields
-      return (response.data as List)
-          .map((e) => ResellerStock.fromJson(e))
-          .toList();
+      // Backend returns array of objects with 'product' and 'quantity' fields,
+      // one page at a time; the next page number comes in the X-Next-Page header
+      final stocks = <ResellerStock>[];
+      String? page = '1';
+      while (page != null) {
+        final response = await ref
+            .read(apiServiceProvider)
+            .get('/stock', params: {'page': page, 'limit': 500});
+        stocks.addAll((response.data as List).map((e) => ResellerStock.fromJson(e)));
+        page = response.headers.value('x-next-page');
+      }
+      return stocks;
     } catch (e) {
       throw Exception('Failed to load stock: $e');
     }